@@ -1,9 +1,13 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import iterate_in_threadpool
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
-import requests
-import json
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+from contextlib import asynccontextmanager
+import httpx
+import io
+from itertools import islice
 import os
 from datetime import datetime, timezone, timedelta
 from dotenv import load_dotenv
@@ -11,8 +15,6 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 from utils.arbitrage import (
-    calculate_arbitrage_two_way,
-    calculate_arbitrage_three_way,
     convert_odds_to_decimal,
     calculate_stakes,
     normalize_odds_data,
@@ -21,8 +23,45 @@ from utils.arbitrage import (
     stake_split
 )
 from utils.filters import filter_prematch, is_game_started
+from utils.odds_client import OddsAPIClient
+from utils.concurrency import gather_bounded, SingleFlight
+from utils.cache import CacheConfig, TTLCache
+from utils.snapshot import (
+    ScanKey,
+    Snapshot,
+    SnapshotStore,
+    OddsPoller,
+    decode_cursor,
+    encode_cursor,
+    normalize_scan_key,
+    parse_poll_targets
+)
+from utils.topk import GroupedTopK, merge_top_k
+from utils.parallel import ScanPool
+from utils.incremental import IncrementalArbitrageEngine
 from utils.odds import to_decimal
-from utils.matching import same_market, is_valid_two_way_pairing
+from utils.matching import same_market, is_valid_two_way_pairing, build_line_index, game_key
+from utils.middles import build_player_prop_ladders, find_middles
+from utils.quotes import QuoteTable, parse_timestamp
+from utils.books import ALLOWED_SPORTSBOOKS, within
+from utils.quota import QuotaPlanner, QuotaTracker, degraded_keys, request_cost
+from utils.scheduler import EventScheduler
+from utils.deltas import RecordView, sse_message
+from utils.http_cache import cache_control, etag_matches, make_etag
+from utils.formats import MEDIA_TYPES, dumps_json, negotiate_format, orjson, render
+from utils.upload import batched, check_game, iter_csv_games, iter_json_games
+from utils.compression import CompressionMiddleware
+from utils.records import (
+    build_game_info,
+    build_opportunity_record,
+    find_upload_arbitrages,
+    merge_game_shards,
+    record_book_mask,
+    record_id,
+    scan_game_shard,
+    scan_line_index,
+    scan_middles
+)
 from utils.validations import (
     validate_odds,
     implied_sum,
@@ -31,17 +70,6 @@ from utils.validations import (
     get_confidence_tooltip
 )
 
-# Whitelist: Only include these major regulated US sportsbooks
-ALLOWED_SPORTSBOOKS = {
-    'DraftKings',
-    'FanDuel',
-    'ESPN BET',
-    'Bally Bet',
-    'BetMGM',
-    'Caesars Sportsbook',
-    'Fanatics Sportsbook'
-}
-
 PLAYER_PROP_MARKETS_BY_SPORT: Dict[str, List[str]] = {
     "basketball_nba": [
         "player_points",
@@ -94,11 +122,175 @@ SUPPORTED_PLAYER_PROP_MARKETS = {
     market for markets in PLAYER_PROP_MARKETS_BY_SPORT.values() for market in markets
 }
 
-PLAYER_PROP_CACHE_TTL_SECONDS = 120
-MAX_PLAYER_PROP_EVENTS = 8
-PLAYER_PROP_CACHE: Dict[str, Dict[str, Any]] = {}
+# Player prop fan-out: events are fetched concurrently, bounded by a
+# semaphore, a per-request deadline and an event/quota budget
+PLAYER_PROP_CONCURRENCY = int(os.getenv("PLAYER_PROP_CONCURRENCY", "8"))
+PLAYER_PROP_DEADLINE_SECONDS = float(os.getenv("PLAYER_PROP_DEADLINE_SECONDS", "8"))
+MAX_PLAYER_PROP_EVENTS = int(os.getenv("MAX_PLAYER_PROP_EVENTS", "60"))
+PLAYER_PROP_QUOTA_RESERVE = int(os.getenv("PLAYER_PROP_QUOTA_RESERVE", "50"))
+
+# Adaptive event refresh: events starting within the hour (or with moving
+# prices) are refreshed every PLAYER_PROP_REFRESH_SECONDS, events days out
+# up to every PLAYER_PROP_MAX_REFRESH_SECONDS. The fetch budget goes to the
+# most overdue events first.
+PLAYER_PROP_REFRESH_SECONDS = float(os.getenv("PLAYER_PROP_REFRESH_SECONDS", "60"))
+PLAYER_PROP_MAX_REFRESH_SECONDS = float(os.getenv("PLAYER_PROP_MAX_REFRESH_SECONDS", "1800"))
+prop_scheduler = EventScheduler(PLAYER_PROP_REFRESH_SECONDS, PLAYER_PROP_MAX_REFRESH_SECONDS)
+
+# Event odds cache: bounded by entries and raw response bytes, LRU + TTL.
+# Entries past their event's refresh interval (the TTL without one) are
+# served stale (and refreshed in the background) for up to
+# PLAYER_PROP_CACHE_MAX_STALE_SECONDS more; set it to 0 to disable. The cache
+# itself keeps entries long enough for the slowest adaptive interval.
+PLAYER_PROP_CACHE_MAX_STALE_SECONDS = float(os.getenv("PLAYER_PROP_CACHE_MAX_STALE_SECONDS", "180"))
+PLAYER_PROP_CACHE_TTL_SECONDS = float(os.getenv("PLAYER_PROP_CACHE_TTL_SECONDS", "120"))
+PLAYER_PROP_CACHE_CONFIG = CacheConfig(
+    ttl_seconds=PLAYER_PROP_CACHE_TTL_SECONDS,
+    max_entries=int(os.getenv("PLAYER_PROP_CACHE_MAX_ENTRIES", "512")),
+    max_bytes=int(os.getenv("PLAYER_PROP_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    max_stale_seconds=(
+        max(PLAYER_PROP_MAX_REFRESH_SECONDS - PLAYER_PROP_CACHE_TTL_SECONDS, 0.0) + PLAYER_PROP_CACHE_MAX_STALE_SECONDS
+    )
+)
+PLAYER_PROP_CACHE = TTLCache(PLAYER_PROP_CACHE_CONFIG)
+
+# One upstream fetch per event key, whether blocking or background refresh
+player_prop_refreshes = SingleFlight()
+
+# Middles: Over/Under pairs on different lines kept when 1/over + 1/under
+# is below this (1.0 means the pair cannot lose even if the middle misses)
+MIDDLE_MAX_IMPLIED = float(os.getenv("MIDDLE_MAX_IMPLIED", "1.0"))
+
+# Environment variable for API key
+ODDS_API_KEY = os.getenv("ODDS_API_KEY", "")
+ODDS_API_BASE_URL = "https://api.the-odds-api.com/v4"
+
+# Upstream HTTP settings (seconds)
+ODDS_API_TIMEOUT_SECONDS = float(os.getenv("ODDS_API_TIMEOUT_SECONDS", "10"))
+ODDS_API_MAX_RETRIES = int(os.getenv("ODDS_API_MAX_RETRIES", "2"))
+
+# Background polling: "sport:markets:regions[:props]" targets separated by ";"
+POLL_TARGETS = parse_poll_targets(os.getenv("POLL_TARGETS", ""))
+POLL_INTERVAL_SECONDS = float(os.getenv("POLL_INTERVAL_SECONDS", "60"))
+SNAPSHOT_MAX_AGE_SECONDS = float(os.getenv("SNAPSHOT_MAX_AGE_SECONDS", str(POLL_INTERVAL_SECONDS * 3)))
+# Scan results kept by version so paginated clients can fetch later pages:
+# up to SNAPSHOT_HISTORY_SIZE per query, each readable while it is current
+# and for SNAPSHOT_HISTORY_SECONDS after it is replaced
+SNAPSHOT_HISTORY_SIZE = int(os.getenv("SNAPSHOT_HISTORY_SIZE", "32"))
+SNAPSHOT_HISTORY_SECONDS = float(os.getenv("SNAPSHOT_HISTORY_SECONDS", str(SNAPSHOT_MAX_AGE_SECONDS)))
+
+# Records kept per scan, highest profit first (0 keeps everything)
+LIVE_SCAN_MAX_RESULTS = int(os.getenv("LIVE_SCAN_MAX_RESULTS", "1000"))
+
+# CPU-bound scans of large uploads and /arbitrage/all are split into shards
+# of this many games and run on SCAN_WORKERS processes (1 uses a thread)
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", str(os.cpu_count() or 1)))
+# How worker processes are started: spawn, forkserver or fork. Spawned
+# workers re-import the started script, so `python app.py` loads this module
+# once per worker; `uvicorn app:app` does not
+SCAN_START_METHOD = os.getenv("SCAN_START_METHOD", "spawn")
+SCAN_SHARD_GAMES = int(os.getenv("SCAN_SHARD_GAMES", "200"))
+# Uploaded games per shard (also bounds memory for large uploads)
+UPLOAD_BATCH_GAMES = int(os.getenv("UPLOAD_BATCH_GAMES", "500"))
+
+# /arbitrage/all: sports scanned per request (also limited by quota) and
+# how their odds are fetched
+ALL_SPORTS_MAX = int(os.getenv("ALL_SPORTS_MAX", "20"))
+ALL_SPORTS_CONCURRENCY = int(os.getenv("ALL_SPORTS_CONCURRENCY", "8"))
+ALL_SPORTS_DEADLINE_SECONDS = float(os.getenv("ALL_SPORTS_DEADLINE_SECONDS", "15"))
+
+# Response bodies at least this large are compressed (brotli or gzip)
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1000"))
+
+# Clients may reuse a /sports response for this long before revalidating
+SPORTS_MAX_AGE_SECONDS = float(os.getenv("SPORTS_MAX_AGE_SECONDS", "300"))
+
+# /arbitrage/stream sends a keep-alive comment after this long without changes
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+
+# Quota-aware polling: x-requests-* headers are tracked (and persisted to
+# QUOTA_STATE_PATH, empty to disable) and poll intervals are planned so the
+# quota above POLL_QUOTA_RESERVE lasts until the monthly reset. Targets
+# whose interval would pass POLL_MAX_INTERVAL_SECONDS shed markets first.
+QUOTA_STATE_PATH = os.getenv("QUOTA_STATE_PATH", ".odds_quota.json")
+POLL_QUOTA_RESERVE = int(os.getenv("POLL_QUOTA_RESERVE", "50"))
+POLL_MAX_INTERVAL_SECONDS = float(os.getenv("POLL_MAX_INTERVAL_SECONDS", "1800"))
+POLL_DAILY_BUDGET = float(os.getenv("POLL_DAILY_BUDGET", "0")) or None
+
+quota_tracker = QuotaTracker(QUOTA_STATE_PATH or None)
+quota_planner = QuotaPlanner(
+    quota_tracker,
+    min_interval_seconds=POLL_INTERVAL_SECONDS,
+    max_interval_seconds=POLL_MAX_INTERVAL_SECONDS,
+    reserve=POLL_QUOTA_RESERVE,
+    daily_budget=POLL_DAILY_BUDGET
+)
+
+# Shared pooled client for every upstream call
+odds_client = OddsAPIClient(
+    ODDS_API_BASE_URL,
+    api_key=ODDS_API_KEY,
+    timeout=ODDS_API_TIMEOUT_SECONDS,
+    max_retries=ODDS_API_MAX_RETRIES,
+    on_response=lambda response: quota_tracker.record(response.headers)
+)
+
+snapshot_store = SnapshotStore(history_size=SNAPSHOT_HISTORY_SIZE, history_seconds=SNAPSHOT_HISTORY_SECONDS)
+
+# Worker processes reused by every sharded scan (created at startup)
+scan_pool = ScanPool(SCAN_WORKERS, start_method=SCAN_START_METHOD)
+
+# Upstream /sports list, refetched at most every SPORTS_MAX_AGE_SECONDS and
+# shared by /sports and /arbitrage/all
+SPORTS_CACHE = TTLCache(CacheConfig(ttl_seconds=SPORTS_MAX_AGE_SECONDS, max_entries=1))
+sports_refreshes = SingleFlight()
+
+# Identical live scans issued concurrently share one upstream fetch and scan
+live_scans = SingleFlight()
+# Polled targets keep incremental engine state between refreshes, one
+# engine per target whichever variant of it the planner has scanned, so
+# "changes" always compare with the target's previous published result
+arbitrage_engines: Dict[ScanKey, IncrementalArbitrageEngine] = {}
+
+
+def poll_target_of(scan_key: ScanKey) -> ScanKey:
+    """The poll target that scan_key is (a degraded variant of)"""
+    if scan_key in POLL_TARGETS:
+        return scan_key
+    return next((target for target in POLL_TARGETS if scan_key in degraded_keys(target)), scan_key)
+
+
+def scan_poll_target(scan_key: ScanKey) -> Awaitable[Dict[str, Any]]:
+    engine = arbitrage_engines.setdefault(poll_target_of(scan_key), IncrementalArbitrageEngine())
+    return scan_live_odds(scan_key, engine=engine)
+
+
+odds_poller = OddsPoller(
+    POLL_TARGETS if ODDS_API_KEY else [],
+    scan=scan_poll_target,
+    store=snapshot_store,
+    interval_seconds=POLL_INTERVAL_SECONDS,
+    planner=quota_planner
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    scan_pool.start()
+    odds_poller.start()
+    yield
+    await odds_poller.stop()
+    await odds_client.aclose()
+    quota_tracker.flush()
+    scan_pool.shutdown()
+
 
-app = FastAPI(title="Sports Arbitrage API", version="1.0.0")
+app = FastAPI(
+    title="Sports Arbitrage API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse
+)
 
 # CORS middleware for frontend communication
 app.add_middleware(
@@ -108,6 +300,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=RESPONSE_COMPRESSION_MIN_BYTES)
 
 # Models
 class OddsData(BaseModel):
@@ -139,10 +332,6 @@ class ArbitrageResult(BaseModel):
     outcome_c: Optional[str] = None
     stake_c: Optional[float] = None
 
-# Environment variable for API key
-ODDS_API_KEY = os.getenv("ODDS_API_KEY", "")
-ODDS_API_BASE_URL = "https://api.the-odds-api.com/v4"
-
 
 def get_player_prop_markets_for_sport(sport: str, requested_markets: Optional[List[str]] = None) -> List[str]:
     """
@@ -164,161 +353,174 @@ def get_player_prop_markets_for_sport(sport: str, requested_markets: Optional[Li
     return PLAYER_PROP_MARKETS_BY_SPORT["default"]
 
 
-def fetch_player_prop_event_odds(
+def player_prop_event_budget(
+    event_count: int,
+    markets: List[str],
+    regions: str,
+    requests_remaining: Optional[str] = None,
+    max_events: Optional[int] = None
+) -> int:
+    """
+    Decide how many events to fetch player props for.
+    Each event call costs one credit per market per region, so the budget is
+    the event cap limited by what the remaining quota (minus a reserve) allows.
+    """
+    cap = MAX_PLAYER_PROP_EVENTS if max_events is None else max(0, min(max_events, MAX_PLAYER_PROP_EVENTS))
+    budget = min(event_count, cap)
+
+    try:
+        remaining = int(float(requests_remaining)) if requests_remaining is not None else None
+    except ValueError:
+        remaining = None
+
+    if remaining is not None:
+        region_count = len([r for r in regions.split(",") if r.strip()]) or 1
+        cost_per_event = max(1, len(markets) * region_count)
+        affordable = max(0, remaining - PLAYER_PROP_QUOTA_RESERVE) // cost_per_event
+        budget = min(budget, affordable)
+
+    return budget
+
+
+async def _download_player_prop_event_odds(
     sport: str,
     event_id: str,
     markets: List[str],
-    regions: str
+    regions: str,
+    cache_key: str
 ) -> Optional[Dict[str, Any]]:
     """
-    Fetch player prop odds for a specific event, with simple in-memory caching.
+    Fetch event odds upstream, store them in PLAYER_PROP_CACHE and record
+    the fetch (and how far prices moved) with prop_scheduler.
     """
-    cache_key = f"{sport}:{event_id}:{','.join(sorted(markets))}:{regions}"
-    cached = PLAYER_PROP_CACHE.get(cache_key)
-    now = datetime.now(timezone.utc)
-
-    if cached and (now - cached["timestamp"]).total_seconds() < PLAYER_PROP_CACHE_TTL_SECONDS:
-        return cached["data"]
-
     try:
-        response = requests.get(
-            f"{ODDS_API_BASE_URL}/sports/{sport}/events/{event_id}/odds",
+        response = await odds_client.get(
+            f"/sports/{sport}/events/{event_id}/odds",
             params={
-                "apiKey": ODDS_API_KEY,
                 "regions": regions,
                 "markets": ",".join(markets),
                 "oddsFormat": "decimal"
-            },
-            timeout=10
+            }
         )
-        response.raise_for_status()
         event_data = response.json()
-        PLAYER_PROP_CACHE[cache_key] = {
-            "timestamp": now,
-            "data": event_data
-        }
+        PLAYER_PROP_CACHE.set(cache_key, event_data, size=len(response.content))
+        prop_scheduler.observe(cache_key, QuoteTable().add_event_odds(event_data, markets).prices())
         return event_data
-    except requests.exceptions.RequestException:
+    except (httpx.HTTPError, ValueError):
+        # Unreachable or not JSON: this event is skipped, the rest still scanned
         return None
 
 
-def build_player_prop_arbitrages(
-    event_data: Dict[str, Any],
-    game_info: Dict[str, Any],
-    player_prop_markets: List[str],
-    min_profit: float
-) -> List[Dict[str, Any]]:
+def player_prop_cache_key(sport: str, event_id: str, markets: List[str], regions: str) -> str:
+    return f"{sport}:{event_id}:{','.join(sorted(markets))}:{regions}"
+
+
+async def fetch_player_prop_event_odds(
+    sport: str,
+    event_id: str,
+    markets: List[str],
+    regions: str,
+    max_age_seconds: Optional[float] = None,
+    fetch: bool = True
+) -> Optional[Tuple[Dict[str, Any], float]]:
     """
-    Generate player prop arbitrage opportunities for a single event.
+    Fetch player prop odds for a specific event, cached in PLAYER_PROP_CACHE.
+
+    Stale-while-revalidate: past the TTL (or max_age_seconds, the event's
+    adaptive refresh interval, when given), the cached payload is returned
+    immediately and a single background refresh is started. More than
+    PLAYER_PROP_CACHE_MAX_STALE_SECONDS past that, the payload is not used
+    and the caller waits for upstream. With fetch=False nothing is
+    requested upstream; only a cached payload within that bound can be
+    returned.
+    Returns (event_data, age_seconds), or None if nothing could be fetched.
     """
-    bookmakers = event_data.get("bookmakers", [])
-    if not bookmakers:
-        return []
+    cache_key = player_prop_cache_key(sport, event_id, markets, regions)
 
-    player_market_book_data: Dict[tuple, Dict[str, Dict[str, Any]]] = {}
+    def download():
+        return _download_player_prop_event_odds(sport, event_id, markets, regions, cache_key)
 
-    for bookmaker in bookmakers:
-        title = bookmaker.get("title")
-        if title not in ALLOWED_SPORTSBOOKS:
-            continue
+    refresh_after = PLAYER_PROP_CACHE_TTL_SECONDS if max_age_seconds is None else max_age_seconds
+    cached = PLAYER_PROP_CACHE.lookup(cache_key)
+    if cached is not None and cached.age_seconds <= refresh_after + PLAYER_PROP_CACHE_MAX_STALE_SECONDS:
+        if cached.age_seconds >= refresh_after and fetch:
+            player_prop_refreshes.start(cache_key, download)
+        return cached.value, cached.age_seconds
 
-        for market in bookmaker.get("markets", []):
-            market_key = market.get("key")
-            if market_key not in player_prop_markets:
-                continue
+    if not fetch:
+        return None
+    event_data = await player_prop_refreshes.do(cache_key, download)
+    if event_data is None:
+        return None
+    return event_data, 0.0
 
-            for outcome in market.get("outcomes", []):
-                outcome_name = (outcome.get("name") or "").lower()
-                if outcome_name not in {"over", "under"}:
-                    continue
 
-                player_name = (outcome.get("description") or outcome.get("player_name") or "").strip()
-                if not player_name:
-                    continue
+def build_player_prop_record(hit, player_name: str, market_key: str, game_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a player prop record from a MiddleHit (side A Over, side B Under)
 
-                price = outcome.get("price")
-                point = outcome.get("point")
-                if price is None or point is None:
-                    continue
+    Same-line hits are plain arbitrage. When the Under line is higher the
+    record also carries the middle window and the profit if both legs win.
+    """
+    over, under = hit.over, hit.under
+    stakes = calculate_stakes(over.price, under.price, total_stake=1000)
 
-                key = (player_name, market_key, round(float(point), 4))
-                entry = player_market_book_data.setdefault(key, {})
-                book_entry = entry.setdefault(title, {"point": point})
-                book_entry[outcome_name] = price
+    record = {
+        "match": game_info["match_name"],
+        "sport": game_info["sport_name"],
+        "market": market_key,
+        "market_type": "player_prop",
+        "player_name": player_name,
+        "prop_type": market_key.replace("player_", ""),
+        "prop_line": over.threshold,
+        "commence_time": game_info["commence_time"],
+        "sportsbook_a": over.book,
+        "odds_a": over.price,
+        "outcome_a": over.outcome,
+        "sportsbook_b": under.book,
+        "odds_b": under.price,
+        "outcome_b": under.outcome,
+        "profit_percentage": round((1 / hit.implied - 1) * 100, 2),
+        "implied_probability": round(hit.implied, 4),
+        "stake_a": stakes["stake_a"],
+        "stake_b": stakes["stake_b"],
+        "guaranteed_profit": round(stakes["profit"], 2),
+        "odds_age_seconds": game_info.get("odds_age_seconds", 0.0),
+        "timestamp": datetime.now().isoformat()
+    }
 
-    arbitrages: List[Dict[str, Any]] = []
+    if under.threshold > over.threshold:
+        record.update({
+            "middle_low": over.threshold,
+            "middle_high": under.threshold,
+            "middle_profit_percentage": round((2 / hit.implied - 1) * 100, 2),
+            "middle_profit": round(stakes["return_a"] + stakes["return_b"] - 1000, 2)
+        })
 
-    for (player_name, market_key, point), bookmaker_data in player_market_book_data.items():
-        book_titles = list(bookmaker_data.keys())
-        if len(book_titles) < 2:
-            continue
+    return record
+
+
+def build_player_prop_arbitrages(
+    event_data: Dict[str, Any],
+    game_info: Dict[str, Any],
+    player_prop_markets: List[str],
+    min_profit: float
+) -> List[Dict[str, Any]]:
+    """
+    Generate player prop arbitrage opportunities for a single event.
+    Each (player, market) gets one sorted Over/Under ladder, swept once for
+    same-line arbitrage and for middles across lines (e.g. Over 24.5 at
+    one book against Under 25.5 at another).
+    """
+    quotes = QuoteTable().add_event_odds(event_data, player_prop_markets, ALLOWED_SPORTSBOOKS)
+    ladders = build_player_prop_ladders(quotes)
 
-        for i in range(len(book_titles)):
-            book1 = book_titles[i]
-            data1 = bookmaker_data[book1]
-            for j in range(i + 1, len(book_titles)):
-                book2 = book_titles[j]
-                data2 = bookmaker_data[book2]
-
-                # Over (book1) vs Under (book2)
-                if "over" in data1 and "under" in data2:
-                    odds_a = data1["over"]
-                    odds_b = data2["under"]
-                    arb = calculate_arbitrage_two_way(odds_a, odds_b, validate=True)
-                    if arb.get("validation", {}).get("valid", True) and arb["exists"] and arb["profit_percentage"] >= min_profit:
-                        stakes = calculate_stakes(odds_a, odds_b, total_stake=1000)
-                        arbitrages.append({
-                            "match": game_info["match_name"],
-                            "sport": game_info["sport_name"],
-                            "market": market_key,
-                            "market_type": "player_prop",
-                            "player_name": player_name,
-                            "prop_type": market_key.replace("player_", ""),
-                            "prop_line": point,
-                            "commence_time": game_info["commence_time"],
-                            "sportsbook_a": book1,
-                            "odds_a": odds_a,
-                            "outcome_a": f"Over {point}",
-                            "sportsbook_b": book2,
-                            "odds_b": odds_b,
-                            "outcome_b": f"Under {point}",
-                            "profit_percentage": round(arb["profit_percentage"], 2),
-                            "implied_probability": round(arb["implied_probability"], 4),
-                            "stake_a": stakes["stake_a"],
-                            "stake_b": stakes["stake_b"],
-                            "guaranteed_profit": round(stakes["profit"], 2),
-                            "timestamp": datetime.now().isoformat()
-                        })
-
-                # Under (book1) vs Over (book2)
-                if "under" in data1 and "over" in data2:
-                    odds_a = data1["under"]
-                    odds_b = data2["over"]
-                    arb = calculate_arbitrage_two_way(odds_a, odds_b, validate=True)
-                    if arb.get("validation", {}).get("valid", True) and arb["exists"] and arb["profit_percentage"] >= min_profit:
-                        stakes = calculate_stakes(odds_a, odds_b, total_stake=1000)
-                        arbitrages.append({
-                            "match": game_info["match_name"],
-                            "sport": game_info["sport_name"],
-                            "market": market_key,
-                            "market_type": "player_prop",
-                            "player_name": player_name,
-                            "prop_type": market_key.replace("player_", ""),
-                            "prop_line": point,
-                            "commence_time": game_info["commence_time"],
-                            "sportsbook_a": book1,
-                            "odds_a": odds_a,
-                            "outcome_a": f"Under {point}",
-                            "sportsbook_b": book2,
-                            "odds_b": odds_b,
-                            "outcome_b": f"Over {point}",
-                            "profit_percentage": round(arb["profit_percentage"], 2),
-                            "implied_probability": round(arb["implied_probability"], 4),
-                            "stake_a": stakes["stake_a"],
-                            "stake_b": stakes["stake_b"],
-                            "guaranteed_profit": round(stakes["profit"], 2),
-                            "timestamp": datetime.now().isoformat()
-                        })
+    arbitrages: List[Dict[str, Any]] = []
+    for (player_name, market_key), player_ladders in ladders.items():
+        for hit in find_middles(player_ladders, max_implied=MIDDLE_MAX_IMPLIED, same_line=True):
+            record = build_player_prop_record(hit, player_name, market_key, game_info)
+            if record["profit_percentage"] >= min_profit:
+                arbitrages.append(record)
 
     return arbitrages
 
@@ -330,49 +532,415 @@ def read_root():
         "endpoints": {
             "/arbitrage": "Find all arbitrage opportunities",
             "/arbitrage/live": "Fetch live odds and find arbitrage",
+            "/arbitrage/stream": "Stream arbitrage changes for a polled target (SSE)",
+            "/arbitrage/all": "Find arbitrage across every in-season sport",
             "/upload": "Upload manual odds data",
             "/sports": "List available sports",
             "/convert-odds": "Convert odds between formats"
         }
     }
 
+async def fetch_sports() -> Tuple[httpx.Response, float]:
+    """
+    Upstream /sports response, cached for SPORTS_MAX_AGE_SECONDS
+
+    Returns (response, age_seconds); concurrent misses share one fetch.
+    """
+    cached = SPORTS_CACHE.lookup("sports")
+    if cached is not None and not cached.stale:
+        return cached.value, cached.age_seconds
+
+    async def download() -> httpx.Response:
+        response = await odds_client.get("/sports")
+        SPORTS_CACHE.set("sports", response, size=len(response.content))
+        return response
+
+    return await sports_refreshes.do("sports", download), 0.0
+
+
 @app.get("/sports")
-def get_available_sports():
-    """Get list of available sports from The Odds API"""
+async def get_available_sports(request: Request):
+    """
+    Get list of available sports from The Odds API
+
+    The upstream list is cached for SPORTS_MAX_AGE_SECONDS and its body
+    passed through without re-serializing, tagged with a hash of its
+    content so an unchanged list answers If-None-Match with 304. The tag
+    is weak since the compression middleware may re-encode the body.
+    """
     if not ODDS_API_KEY:
         return {"error": "API key not configured", "sports": []}
     
     try:
-        response = requests.get(
-            f"{ODDS_API_BASE_URL}/sports",
-            params={"apiKey": ODDS_API_KEY}
-        )
-        response.raise_for_status()
-        return {"sports": response.json()}
+        response, sports_age = await fetch_sports()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch sports: {str(e)}")
 
+    headers = {
+        "ETag": make_etag(response.content),
+        "Cache-Control": cache_control(SPORTS_MAX_AGE_SECONDS - sports_age)
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=b'{"sports":' + response.content + b"}",
+        media_type="application/json",
+        headers=headers
+    )
+
+async def scan_live_odds(
+    key: ScanKey,
+    max_prop_events: Optional[int] = None,
+    engine: Optional[IncrementalArbitrageEngine] = None
+) -> Dict[str, Any]:
+    """
+    Fetch odds for a scan key and find every arbitrage opportunity.
+    No profit threshold or bookmaker selection is applied, so one scan can
+    serve any min_profit and books; each record's bookmaker mask is
+    returned alongside it in book_masks. Records are kept per bookmaker
+    set (see build_live_response for how a query truncates them).
+    With an engine (kept across polls of one key), game markets are
+    maintained incrementally and the result reports what changed.
+    Raises httpx.HTTPError if the upstream odds fetch fails.
+    """
+    sport, regions, markets = key.sport, key.regions, key.markets
+    include_live, grace_minutes = key.include_live, key.grace_minutes
+
+    # Determine which markets to fetch
+    # The /sports/{sport}/odds endpoint does not return player props,
+    # so we filter them out of the initial request but keep track of what was requested.
+    incoming_markets = [m.strip() for m in markets.split(",") if m.strip()]
+    game_markets = [m for m in incoming_markets if m not in [
+        "player_points", "player_assists", "player_rebounds", "player_touchdowns",
+        "player_passing_yards", "player_receiving_yards", "player_rushing_yards"
+    ]]
+    player_prop_markets = [m for m in incoming_markets if m in [
+        "player_points", "player_assists", "player_rebounds", "player_touchdowns",
+        "player_passing_yards", "player_receiving_yards", "player_rushing_yards"
+    ]]
+    
+    # Only request game markets (player props are called via event endpoint)
+    all_markets = ",".join(game_markets) if game_markets else "h2h"
+    
+    # Fetch odds data
+    response = await odds_client.get(
+        f"/sports/{sport}/odds",
+        params={
+            "regions": regions,
+            "markets": all_markets,
+            "oddsFormat": "decimal"
+        }
+    )
+    data = response.json()
+    
+    # Filter to pre-match games only (unless include_live=True)
+    filtered_games = filter_prematch(data, include_live=include_live, grace_min=grace_minutes)
+    
+    # The best LIVE_SCAN_MAX_RESULTS records of every set of bookmakers are
+    # kept, so a books= subset truncates exactly as a scan of only those
+    # books would
+    arbitrages: GroupedTopK[Dict[str, Any]] = GroupedTopK(
+        LIVE_SCAN_MAX_RESULTS, key=lambda arb: arb["profit_percentage"], group=record_book_mask
+    )
+    event_lookup: Dict[str, Dict[str, Any]] = {}
+    
+    games_with_odds = [game for game in filtered_games if game.get("bookmakers")]
+    game_info_by_key: Dict[str, Dict[str, Any]] = {}
+    
+    for game in games_with_odds:
+        game_info = build_game_info(game, sport)
+        game_info_by_key[game_key(game)] = game_info
+        event_id = game.get("id")
+        if event_id:
+            event_lookup[event_id] = game_info
+    
+    # Flatten the payload into one columnar quote table, then bucket it by
+    # (event, market, signed point) so that spreads/totals are only
+    # compared between books on the same line
+    markets_to_process = game_markets if game_markets else markets.split(",")
+    quotes = QuoteTable().add_games(games_with_odds, markets_to_process, ALLOWED_SPORTSBOOKS)
+    line_index = build_line_index(quotes)
+    
+    player_props: Optional[Dict[str, Any]] = None
+    prop_records: List[Dict[str, Any]] = []
+    if key.include_player_props:
+        prop_markets_to_use = get_player_prop_markets_for_sport(sport, player_prop_markets)
+        # Events scanned, and how many of them may be refreshed upstream
+        event_cap = player_prop_event_budget(len(event_lookup), prop_markets_to_use, regions, None, max_prop_events)
+        fetch_budget = player_prop_event_budget(
+            len(event_lookup),
+            prop_markets_to_use,
+            regions,
+            response.headers.get("x-requests-remaining"),
+            max_prop_events
+        )
+
+        # Most overdue events first (by time to start and price movement).
+        # Events refreshed within their interval are served from cache for
+        # free; the fetch budget goes to the events that need it most.
+        events_by_cache_key = {
+            player_prop_cache_key(sport, event_id, prop_markets_to_use, regions): (event_id, game_info)
+            for event_id, game_info in event_lookup.items()
+        }
+        events_to_process: List[Tuple[str, Dict[str, Any], float, bool]] = []
+        fetches = 0
+        for scheduled in prop_scheduler.rank(
+            (cache_key, game_info["commence_time"])
+            for cache_key, (_, game_info) in events_by_cache_key.items()
+        ):
+            if len(events_to_process) >= event_cap:
+                break
+            cached = scheduled.event_id in PLAYER_PROP_CACHE
+            due = scheduled.due or not cached
+            fetch = due and fetches < fetch_budget
+            if not fetch and not cached:
+                continue
+            fetches += fetch
+            event_id, game_info = events_by_cache_key[scheduled.event_id]
+            events_to_process.append((event_id, game_info, scheduled.interval_seconds, fetch))
+        player_prop_events_processed = 0
+
+        # Fetch every event concurrently; slow events are dropped at the deadline
+        event_results = await gather_bounded(
+            [
+                lambda event_id=event_id, interval=interval, fetch=fetch: fetch_player_prop_event_odds(
+                    sport, event_id, prop_markets_to_use, regions, max_age_seconds=interval, fetch=fetch
+                )
+                for event_id, _, interval, fetch in events_to_process
+            ],
+            limit=PLAYER_PROP_CONCURRENCY,
+            deadline=PLAYER_PROP_DEADLINE_SECONDS
+        )
+
+        max_odds_age = 0.0
+        for (event_id, game_info, _, _), event_result in zip(events_to_process, event_results):
+            if not event_result:
+                continue
+            event_data, odds_age = event_result
+            max_odds_age = max(max_odds_age, odds_age)
+            player_prop_events_processed += 1
+            prop_records.extend(
+                build_player_prop_arbitrages(
+                    event_data,
+                    {**game_info, "odds_age_seconds": round(odds_age, 1)},
+                    prop_markets_to_use,
+                    min_profit=0.0
+                )
+            )
+
+        player_props = {
+            "events_processed": player_prop_events_processed,
+            # Fetched or cached events that yielded nothing (error, bad body, deadline)
+            "events_failed": len(events_to_process) - player_prop_events_processed,
+            "events_available": len(event_lookup),
+            "events_refresh_scheduled": fetches,
+            "markets": len(prop_markets_to_use),
+            "max_odds_age_seconds": round(max_odds_age, 1)
+        }
+
+    # Past the last await: a scan that fails or is cancelled above leaves
+    # the engine at the state of the last published result
+    if engine is not None:
+        # Persistent state from the previous refresh: only markets whose
+        # quotes changed are rescanned
+        changes = engine.sync(line_index)
+        arbitrages.extend(
+            build_opportunity_record(opp, game_info_by_key[opp.line.event_id])
+            for opp in engine.opportunities()
+        )
+    else:
+        arbitrages.extend(scan_line_index(line_index, game_info_by_key))
+
+    arbitrages.extend(scan_middles(quotes, markets_to_process, game_info_by_key, MIDDLE_MAX_IMPLIED))
+    arbitrages.extend(prop_records)
+
+    # Highest profit first
+    records = arbitrages.sorted()
+    for record in records:
+        record["id"] = record_id(record)
+    return {
+        "arbitrages": records,
+        "book_masks": [record_book_mask(record) for record in records],
+        "changes": changes.counts() if engine is not None else None,
+        "arbitrages_found": arbitrages.pushed,
+        # Opportunities found per bookmaker set, and how many a query keeps
+        "found_by_books": arbitrages.counts(),
+        "max_results": LIVE_SCAN_MAX_RESULTS,
+        "api_requests_remaining": response.headers.get("x-requests-remaining", "unknown"),
+        "player_props": player_props,
+        # Soonest game in this scan (drives quota-aware poll planning)
+        "next_commence_time": min(
+            (game["commence_time"] for game in filtered_games if game.get("commence_time")),
+            key=parse_timestamp,
+            default=None
+        )
+    }
+
+
+def poll_interval(key: ScanKey) -> Optional[float]:
+    """Seconds between polls of a target under its current plan (None while paused)"""
+    plan = odds_poller.plans.get(key)
+    if plan is None:
+        return POLL_INTERVAL_SECONDS
+    return plan.interval_seconds
+
+
+def snapshot_max_age(key: ScanKey) -> Optional[float]:
+    """
+    Age past which the current snapshot of `key` is rescanned (None: never)
+
+    A polled target's snapshot is accepted until a planned poll is overdue,
+    however long the quota stretches the interval; while polling is paused
+    the last snapshot is served rather than spending the reserve.
+    """
+    if key not in odds_poller.targets:
+        return SNAPSHOT_MAX_AGE_SECONDS
+    interval = poll_interval(key)
+    if interval is None:
+        return None
+    return max(SNAPSHOT_MAX_AGE_SECONDS, 2 * interval)
+
+
+def fresh_for(key: ScanKey, snapshot: Snapshot) -> Optional[float]:
+    """Seconds until the poller is expected to replace `snapshot` (None: unknown)"""
+    interval = poll_interval(key)
+    return None if interval is None else interval - snapshot.age_seconds()
+
+
+def build_live_response(
+    snapshot: Snapshot,
+    min_profit: float,
+    include_live: bool,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    book_mask: int = ALLOWED_SPORTSBOOKS.all_mask
+) -> Dict[str, Any]:
+    """
+    Apply per-request filters to a scan result and build the response body.
+    Games that have started since the scan are dropped unless include_live,
+    and records using a book outside book_mask are dropped.
+    Only the best max_results records using book_mask's books are
+    considered, as if the scan had only seen those books.
+    With a limit, only one page is materialized (records are already sorted
+    by profit) and next_cursor points at the rest of this same snapshot.
+    """
+    scan_result = snapshot.data
+    now = datetime.now(timezone.utc)
+    max_results = scan_result.get("max_results") or None
+    if book_mask != ALLOWED_SPORTSBOOKS.all_mask:
+        selected = [
+            arb for arb, mask in zip(scan_result["arbitrages"], scan_result["book_masks"])
+            if within(mask, book_mask)
+        ][:max_results]
+        found = sum(count for mask, count in scan_result["found_by_books"].items() if within(mask, book_mask))
+    else:
+        selected = scan_result["arbitrages"][:max_results]
+        found = scan_result["arbitrages_found"]
+    matching = (
+        arb for arb in selected
+        if arb["profit_percentage"] >= min_profit
+        and (include_live or not is_game_started(arb.get("commence_time", ""), now))
+    )
+
+    next_cursor = None
+    if limit is None:
+        arbitrages = list(islice(matching, offset, None))
+    else:
+        # One extra record tells whether another page exists
+        arbitrages = list(islice(matching, offset, offset + limit + 1))
+        if len(arbitrages) > limit:
+            arbitrages = arbitrages[:limit]
+            next_cursor = encode_cursor(snapshot.version, offset + limit)
+
+    result = {
+        "count": len(arbitrages),
+        "arbitrages": arbitrages,
+        "next_cursor": next_cursor,
+        "api_requests_remaining": scan_result.get("api_requests_remaining", "unknown")
+    }
+    if scan_result.get("changes") is not None:
+        # Opportunity changes since the previous poll of this target
+        result["changes"] = scan_result["changes"]
+    if found > len(selected):
+        result["arbitrages_found"] = found
+        result["truncated"] = True
+    if "scanned_markets" in scan_result:
+        # Polled with fewer markets to stretch a low API quota
+        result["quota_note"] = (
+            f"API quota is running low; currently scanning {scan_result['scanned_markets']} only"
+            + ("" if scan_result["scanned_player_props"] else " without player props")
+            + "."
+        )
+
+    # Include player prop note if applicable
+    player_props = scan_result.get("player_props")
+    if player_props is not None:
+        # Oldest event odds used (non-zero when served stale from cache)
+        result["player_props_odds_age_seconds"] = player_props.get("max_odds_age_seconds", 0.0)
+        if any(
+            arb.get("market_type") == "player_prop" and arb["profit_percentage"] >= min_profit
+            for arb in selected
+        ):
+            result["player_props_note"] = (
+                f"Player props analyzed for {player_props['events_processed']} of "
+                f"{player_props['events_available']} events ({player_props['markets']} markets)."
+            )
+        elif player_props["events_processed"] == 0:
+            result["player_props_note"] = (
+                "No player prop data was returned for the requested sport and regions. "
+                "Try again closer to game time or verify your Odds API plan includes player props."
+            )
+        else:
+            result["player_props_note"] = (
+                "Player props were fetched but no arbitrage opportunities met the minimum profit threshold."
+            )
+
+    return result
+
+
 @app.get("/arbitrage/live")
-def find_live_arbitrage(
+async def find_live_arbitrage(
+    request: Request,
     sport: str = "upcoming",
     regions: str = "us",
     markets: str = "h2h",
     min_profit: float = 0.0,
     include_live: bool = False,
     grace_minutes: int = 0,
-    include_player_props: bool = False
+    include_player_props: bool = False,
+    max_prop_events: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    books: Optional[str] = None,
+    response_format: Optional[str] = Query(None, alias="format")
 ):
     """
     Fetch live odds from The Odds API and calculate arbitrage opportunities
+
+    Answers from the background poller's snapshot when the query matches a
+    polled target, otherwise scans upstream in the request. Concurrent
+    identical queries share one scan and apply their own min_profit to it.
+    Later pages (cursor) are read from the snapshot the first page came
+    from, without rescanning.
     
     Parameters:
     - sport: Sport key (e.g., 'americanfootball_nfl', 'basketball_nba')
     - regions: Comma-separated regions (us, us2, uk, eu, au)
-    - markets: Comma-separated markets (h2h, spreads, totals, player_points, player_assists, etc.)
+    - markets: Comma-separated markets (h2h, spreads, totals, player_points, player_assists, etc.);
+      spreads/totals also report cross-line middles as market_type "middle"
     - min_profit: Minimum profit percentage to return
     - include_live: Include live/in-progress games (default: False)
     - grace_minutes: Exclude games starting within N minutes (default: 0)
     - include_player_props: Include player prop markets (default: False)
+    - max_prop_events: Cap on events scanned for player props (default: server budget; live scans only)
+    - limit: Page size, highest profit first (default: all results)
+    - cursor: next_cursor from the previous page; other parameters must match it
+    - books: Comma-separated bookmakers to use (default: all supported); every leg
+      of a returned opportunity is at one of these books. Served from the same scan
+      as the full list, so a selection never costs an extra upstream request
+    - format: json (rows, default), columnar (keys once, dictionary-encoded strings)
+      or msgpack (columnar layout in MessagePack); also chosen by the Accept header
+      (application/json, application/vnd.arbitrage.columnar+json, application/msgpack)
     """
     if not ODDS_API_KEY:
         return {
@@ -380,248 +948,319 @@ def find_live_arbitrage(
             "arbitrages": [],
             "message": "Get your free API key at https://the-odds-api.com"
         }
-    
+
+    key = normalize_scan_key(sport, regions, markets, include_live, grace_minutes, include_player_props)
     try:
-        # Determine which markets to fetch
-        # The /sports/{sport}/odds endpoint does not return player props,
-        # so we filter them out of the initial request but keep track of what was requested.
-        incoming_markets = [m.strip() for m in markets.split(",") if m.strip()]
-        game_markets = [m for m in incoming_markets if m not in [
-            "player_points", "player_assists", "player_rebounds", "player_touchdowns",
-            "player_passing_yards", "player_receiving_yards", "player_rushing_yards"
-        ]]
-        player_prop_markets = [m for m in incoming_markets if m in [
-            "player_points", "player_assists", "player_rebounds", "player_touchdowns",
-            "player_passing_yards", "player_receiving_yards", "player_rushing_yards"
-        ]]
-        
-        # Only request game markets (player props are called via event endpoint)
-        all_markets = ",".join(game_markets) if game_markets else "h2h"
-        
-        # Fetch odds data
-        response = requests.get(
-            f"{ODDS_API_BASE_URL}/sports/{sport}/odds",
-            params={
-                "apiKey": ODDS_API_KEY,
-                "regions": regions,
-                "markets": all_markets,
-                "oddsFormat": "decimal"
-            }
+        book_mask = ALLOWED_SPORTSBOOKS.parse(books)
+        fmt = negotiate_format(request.headers.get("accept"), response_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def respond(snapshot: Snapshot, offset: int, source: str, max_age_seconds: Optional[float]):
+        result = build_live_response(snapshot, min_profit, include_live, limit, offset, book_mask)
+        # The snapshot version pins each record's content; which records
+        # the page holds changes as games start, so their ids are tagged too
+        etag = make_etag(
+            snapshot.version, min_profit, include_live, limit, offset, book_mask, fmt,
+            tuple(arb["id"] for arb in result["arbitrages"]), result["next_cursor"]
         )
-        response.raise_for_status()
-        data = response.json()
-        
-        # Filter to pre-match games only (unless include_live=True)
-        filtered_games = filter_prematch(data, include_live=include_live, grace_min=grace_minutes)
-        
-        arbitrages = []
-        current_time = datetime.now(timezone.utc)
-        event_lookup: Dict[str, Dict[str, Any]] = {}
-        
-        for game in filtered_games:
-            if not game.get("bookmakers"):
+        headers = {"ETag": etag, "Cache-Control": cache_control(max_age_seconds), "Vary": "Accept"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        result["source"] = source
+        result["snapshot_version"] = snapshot.version
+        if source == "snapshot":
+            result["snapshot_age_seconds"] = round(snapshot.age_seconds(), 3)
+            # Past its planned refresh (poll overdue or paused for quota)
+            result["stale"] = max_age_seconds is None or max_age_seconds < 0
+        # Serialized here rather than by FastAPI, skipping its generic encoder
+        return Response(content=render(result, fmt), media_type=MEDIA_TYPES[fmt], headers=headers)
+
+    if cursor:
+        try:
+            version, offset = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        snapshot = snapshot_store.get_version(version)
+        if snapshot is None:
+            raise HTTPException(status_code=410, detail="Cursor expired; request the first page again")
+        if snapshot.key != key:
+            raise HTTPException(status_code=400, detail="Cursor does not match the query parameters")
+
+        # A page of a given version never changes until the cursor expires
+        readable_for = snapshot_store.readable_for(version)
+        if readable_for is None:
+            readable_for = fresh_for(key, snapshot)
+        return respond(snapshot, offset, "snapshot", readable_for)
+
+    snapshot = snapshot_store.get(key, max_age_seconds=snapshot_max_age(key))
+
+    if snapshot is not None:
+        # Fresh until the poller is expected to replace it
+        return respond(snapshot, 0, "snapshot", fresh_for(key, snapshot))
+
+    async def scan_for_pages() -> Snapshot:
+        # Kept in the version history only, so later pages can be served
+        # without making this on-demand result the key's current snapshot
+        return snapshot_store.publish(key, await scan_live_odds(key, max_prop_events), current=False)
+
+    try:
+        snapshot = await live_scans.do((key, max_prop_events), scan_for_pages)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch odds: {str(e)}")
+
+    return respond(snapshot, 0, "live", None)
+
+@app.get("/arbitrage/stream")
+async def stream_live_arbitrage(
+    request: Request,
+    sport: str = "upcoming",
+    regions: str = "us",
+    markets: str = "h2h",
+    min_profit: float = 0.0,
+    include_live: bool = False,
+    grace_minutes: int = 0,
+    include_player_props: bool = False,
+    books: Optional[str] = None,
+    since_version: Optional[int] = None
+):
+    """
+    Stream arbitrage changes for a polled target as Server-Sent Events
+
+    The first message is a "snapshot" event with the full (filtered) list.
+    Each later poll of the target sends a "delta" event with the records
+    added or changed (in full) and the ids of records removed, as seen
+    through this connection's min_profit, include_live and books. Every
+    message's id is the snapshot version it brings the client to.
+
+    Parameters are those of /arbitrage/live, plus:
+    - since_version: Resume from this snapshot version (the Last-Event-ID
+      header is used when absent). If that version is no longer kept, a
+      fresh "snapshot" event is sent instead.
+    """
+    if not ODDS_API_KEY:
+        return {
+            "error": "ODDS_API_KEY not configured. Please set your API key.",
+            "arbitrages": [],
+            "message": "Get your free API key at https://the-odds-api.com"
+        }
+
+    key = normalize_scan_key(sport, regions, markets, include_live, grace_minutes, include_player_props)
+    if key not in odds_poller.targets:
+        raise HTTPException(status_code=404, detail="Only targets in POLL_TARGETS can be streamed")
+    try:
+        book_mask = ALLOWED_SPORTSBOOKS.parse(books)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if since_version is None:
+        try:
+            since_version = int(request.headers.get("last-event-id", ""))
+        except ValueError:
+            since_version = None
+
+    def select(snapshot: Snapshot) -> List[Dict[str, Any]]:
+        return build_live_response(snapshot, min_profit, include_live, book_mask=book_mask)["arbitrages"]
+
+    async def events():
+        # What the client holds: rebuilt from the version it resumes from
+        view: Optional[RecordView] = None
+        version = 0
+        if since_version is not None:
+            base = snapshot_store.get_version(since_version)
+            if base is not None and base.key == key:
+                view = RecordView(select(base))
+                version = base.version
+
+        while True:
+            snapshot = await snapshot_store.wait(key, version, STREAM_HEARTBEAT_SECONDS)
+            if snapshot is None:
+                yield ": keep-alive\n\n"
                 continue
-                
-            match_name = f"{game['home_team']} vs {game['away_team']}"
-            sport_name = game.get("sport_title", sport)
-            commence_time = game.get("commence_time", "")
-            event_id = game.get("id")
-            if event_id:
-                event_lookup[event_id] = {
-                    "match_name": match_name,
-                    "sport_name": sport_name,
-                    "commence_time": commence_time
-                }
-            
-            # Process each market type
-            markets_to_process = game_markets if game_markets else markets.split(",")
-            for market_key in markets_to_process:
-                market_odds = {}
-                
-                # Collect odds from all bookmakers for this market (only allowed books)
-                for bookmaker in game["bookmakers"]:
-                    # Only include whitelisted sportsbooks
-                    if bookmaker["title"] not in ALLOWED_SPORTSBOOKS:
-                        continue
-                    for market in bookmaker.get("markets", []):
-                        if market["key"] == market_key:
-                            bookmaker_name = bookmaker["title"]
-                            outcomes = {}
-                            for outcome in market["outcomes"]:
-                                outcomes[outcome["name"]] = outcome["price"]
-                            market_odds[bookmaker_name] = outcomes
-                
-                if len(market_odds) < 2:
-                    continue
-                
-                # Find arbitrage opportunities
-                # Two-way markets (most common)
-                bookmaker_names = list(market_odds.keys())
-                outcome_names = list(next(iter(market_odds.values())).keys())
-                
-                if len(outcome_names) == 2:
-                    # Two-way arbitrage
-                    for i, book1 in enumerate(bookmaker_names):
-                        for book2 in bookmaker_names[i+1:]:
-                            for outcome_a in outcome_names:
-                                for outcome_b in outcome_names:
-                                    if outcome_a != outcome_b:
-                                        odds_a = market_odds[book1].get(outcome_a)
-                                        odds_b = market_odds[book2].get(outcome_b)
-                                        
-                                        if odds_a and odds_b:
-                                            arb = calculate_arbitrage_two_way(odds_a, odds_b, validate=True)
-                                            
-                                            # Skip if validation failed
-                                            if not arb.get("validation", {}).get("valid", True):
-                                                continue
-                                            
-                                            if arb["exists"] and arb["profit_percentage"] >= min_profit:
-                                                stakes = calculate_stakes(odds_a, odds_b, total_stake=1000)
-                                                
-                                                # Build arbitrage record with validation info
-                                                arb_record = {
-                                                    "match": match_name,
-                                                    "sport": sport_name,
-                                                    "market": market_key,
-                                                    "market_type": "game",
-                                                    "commence_time": commence_time,
-                                                    "sportsbook_a": book1,
-                                                    "odds_a": odds_a,
-                                                    "outcome_a": outcome_a,
-                                                    "sportsbook_b": book2,
-                                                    "odds_b": odds_b,
-                                                    "outcome_b": outcome_b,
-                                                    "profit_percentage": round(arb["profit_percentage"], 2),
-                                                    "implied_probability": round(arb["implied_probability"], 4),
-                                                    "stake_a": stakes["stake_a"],
-                                                    "stake_b": stakes["stake_b"],
-                                                    "guaranteed_profit": round(stakes["profit"], 2),
-                                                    "timestamp": datetime.now().isoformat()
-                                                }
-                                                
-                                                # Add warning if present
-                                                if arb.get("warning"):
-                                                    arb_record["warning"] = arb["warning"]
-                                                
-                                                arbitrages.append(arb_record)
-                
-                elif len(outcome_names) == 3:
-                    # Three-way arbitrage (e.g., soccer with draw)
-                    for i, book1 in enumerate(bookmaker_names):
-                        for j, book2 in enumerate(bookmaker_names):
-                            if i >= j:
-                                continue
-                            for book3 in bookmaker_names[j+1:]:
-                                outcomes = list(outcome_names)
-                                if len(outcomes) == 3:
-                                    odds = [
-                                        market_odds[book1].get(outcomes[0]),
-                                        market_odds[book2].get(outcomes[1]),
-                                        market_odds[book3].get(outcomes[2])
-                                    ]
-                                    
-                                    if all(odds):
-                                        arb = calculate_arbitrage_three_way(*odds, validate=True)
-                                        
-                                        # Skip if validation failed
-                                        if not arb.get("validation", {}).get("valid", True):
-                                            continue
-                                        
-                                        if arb["exists"] and arb["profit_percentage"] >= min_profit:
-                                            stakes = calculate_stakes(*odds, total_stake=1000)
-                                            
-                                            # Build arbitrage record with validation info
-                                            arb_record = {
-                                                "match": match_name,
-                                                "sport": sport_name,
-                                                "market": market_key,
-                                                "market_type": "game",
-                                                "commence_time": commence_time,
-                                                "sportsbook_a": book1,
-                                                "odds_a": odds[0],
-                                                "outcome_a": outcomes[0],
-                                                "sportsbook_b": book2,
-                                                "odds_b": odds[1],
-                                                "outcome_b": outcomes[1],
-                                                "sportsbook_c": book3,
-                                                "odds_c": odds[2],
-                                                "outcome_c": outcomes[2],
-                                                "profit_percentage": round(arb["profit_percentage"], 2),
-                                                "implied_probability": round(arb["implied_probability"], 4),
-                                                "stake_a": stakes["stake_a"],
-                                                "stake_b": stakes["stake_b"],
-                                                "stake_c": stakes.get("stake_c"),
-                                                "guaranteed_profit": round(stakes["profit"], 2),
-                                                "timestamp": datetime.now().isoformat()
-                                            }
-                                            
-                                            # Add warning if present
-                                            if arb.get("warning"):
-                                                arb_record["warning"] = arb["warning"]
-                                            
-                                            arbitrages.append(arb_record)
-            
-        player_props_note: Optional[str] = None
-        if include_player_props:
-            prop_markets_to_use = get_player_prop_markets_for_sport(sport, player_prop_markets)
-            events_to_process = list(event_lookup.items())[:MAX_PLAYER_PROP_EVENTS]
-            player_prop_events_processed = 0
-            player_prop_arbitrages: List[Dict[str, Any]] = []
-
-            for event_id, game_info in events_to_process:
-                event_data = fetch_player_prop_event_odds(sport, event_id, prop_markets_to_use, regions)
-                if not event_data:
-                    continue
-                player_prop_events_processed += 1
-                player_prop_arbitrages.extend(
-                    build_player_prop_arbitrages(
-                        event_data,
-                        game_info,
-                        prop_markets_to_use,
-                        min_profit
-                    )
-                )
 
-            if player_prop_arbitrages:
-                arbitrages.extend(player_prop_arbitrages)
-                player_props_note = (
-                    f"Player props analyzed for {player_prop_events_processed} events "
-                    f"({len(prop_markets_to_use)} markets)."
-                )
+            records = select(snapshot)
+            if view is None:
+                view = RecordView(records)
+                yield sse_message("snapshot", {
+                    "version": snapshot.version,
+                    "arbitrages": records,
+                    "api_requests_remaining": snapshot.data.get("api_requests_remaining", "unknown")
+                }, snapshot.version)
             else:
-                if player_prop_events_processed == 0:
-                    player_props_note = (
-                        "No player prop data was returned for the requested sport and regions. "
-                        "Try again closer to game time or verify your Odds API plan includes player props."
-                    )
+                delta = view.update(records)
+                if delta:
+                    yield sse_message("delta", {"version": snapshot.version, **delta.to_dict()}, snapshot.version)
                 else:
-                    player_props_note = (
-                        "Player props were fetched but no arbitrage opportunities met the minimum profit threshold."
-                    )
+                    # Nothing this client can see changed; just move its Last-Event-ID
+                    yield sse_message(event_id=snapshot.version)
+            version = snapshot.version
 
-        # Sort by profit percentage (highest first)
-        arbitrages.sort(key=lambda x: x["profit_percentage"], reverse=True)
-        
-        result = {
-            "count": len(arbitrages),
-            "arbitrages": arbitrages,
-            "api_requests_remaining": response.headers.get("x-requests-remaining", "unknown")
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def scan_all_sports(key: ScanKey, max_sports: Optional[int]) -> Dict[str, Any]:
+    """
+    Fetch and scan the game markets of every in-season sport for `key`
+
+    Returns a scan result shaped like scan_live_odds', so build_live_response
+    applies each request's filters to it, plus what was scanned.
+    """
+    market_list = key.markets.split(",")
+
+    try:
+        sports_response, _ = await fetch_sports()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch sports: {str(e)}")
+    # Outright (futures) sports have no game markets to scan
+    sports = [
+        sport["key"] for sport in sports_response.json()
+        if sport.get("active", True) and not sport.get("has_outrights")
+    ]
+
+    cap = ALL_SPORTS_MAX if max_sports is None else max(0, min(max_sports, ALL_SPORTS_MAX))
+    if quota_tracker.remaining is not None:
+        cost = request_cost(market_list, key.regions.split(","))
+        cap = min(cap, max(0, quota_tracker.remaining - POLL_QUOTA_RESERVE) // cost)
+    selected = sports[:cap]
+
+    responses = await gather_bounded(
+        [
+            lambda sport=sport: odds_client.get(
+                f"/sports/{sport}/odds",
+                params={"regions": key.regions, "markets": key.markets, "oddsFormat": "decimal"}
+            )
+            for sport in selected
+        ],
+        limit=ALL_SPORTS_CONCURRENCY,
+        deadline=ALL_SPORTS_DEADLINE_SECONDS
+    )
+
+    sports_scanned = []
+    games = []
+    for sport, response in zip(selected, responses):
+        if response is None:
+            continue
+        sports_scanned.append(sport)
+        games.extend(
+            game for game in filter_prematch(response.json(), include_live=key.include_live, grace_min=key.grace_minutes)
+            if game.get("bookmakers")
+        )
+
+    shards = list(batched(games, SCAN_SHARD_GAMES))
+    results = await scan_pool.map(scan_game_shard, shards, market_list, LIVE_SCAN_MAX_RESULTS, MIDDLE_MAX_IMPLIED)
+    records, found_by_books = merge_game_shards(results, LIVE_SCAN_MAX_RESULTS)
+
+    return {
+        "arbitrages": records,
+        "book_masks": [record_book_mask(record) for record in records],
+        "arbitrages_found": sum(found_by_books.values()),
+        "found_by_books": found_by_books,
+        "max_results": LIVE_SCAN_MAX_RESULTS,
+        "api_requests_remaining": quota_tracker.remaining if quota_tracker.remaining is not None else "unknown",
+        "sports_scanned": sports_scanned,
+        "sports_skipped": len(sports) - len(sports_scanned),
+        "games_scanned": len(games),
+        "shards": len(shards)
+    }
+
+
+@app.get("/arbitrage/all")
+async def find_all_sports_arbitrage(
+    regions: str = "us",
+    markets: str = "h2h",
+    min_profit: float = 0.0,
+    include_live: bool = False,
+    grace_minutes: int = 0,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    books: Optional[str] = None,
+    max_sports: Optional[int] = None
+):
+    """
+    Find arbitrage across every in-season sport listed by /sports
+
+    Each sport's odds are one upstream request (markets x regions credits),
+    so sports are capped by max_sports (at most ALL_SPORTS_MAX) and by the
+    quota left above POLL_QUOTA_RESERVE. The games are split into shards of
+    SCAN_SHARD_GAMES and scanned in parallel on the scan_pool workers; each
+    shard returns its own top results and those are merged. Like on-demand
+    /arbitrage/live scans, concurrent identical requests share one scan and
+    its result is reused for SNAPSHOT_MAX_AGE_SECONDS, with min_profit,
+    books and limit applied per request.
+
+    Parameters:
+    - regions, markets, min_profit, include_live, grace_minutes, books: as for /arbitrage/live
+      (game markets only; player props are not scanned)
+    - limit: Results to return, highest profit first (default LIVE_SCAN_MAX_RESULTS)
+    - max_sports: Cap on sports scanned
+    """
+    if not ODDS_API_KEY:
+        return {
+            "error": "ODDS_API_KEY not configured. Please set your API key.",
+            "arbitrages": [],
+            "message": "Get your free API key at https://the-odds-api.com"
         }
-        
-        # Include player prop note if applicable
-        if include_player_props and player_props_note:
-            result["player_props_note"] = player_props_note
-        
-        return result
-        
-    except requests.exceptions.RequestException as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch odds: {str(e)}")
+
+    try:
+        book_mask = ALLOWED_SPORTSBOOKS.parse(books)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Upstream sport keys never contain "*", so these keys are /arbitrage/all's own
+    key = normalize_scan_key(
+        "*" if max_sports is None else f"*:{max_sports}", regions, markets, include_live, grace_minutes
+    )
+
+    snapshot = snapshot_store.latest(key, max_age_seconds=SNAPSHOT_MAX_AGE_SECONDS)
+    source = "snapshot"
+    if snapshot is None:
+        async def scan_and_publish() -> Snapshot:
+            # Keys come from query parameters, so results are kept in the
+            # version history only and expire after SNAPSHOT_HISTORY_SECONDS
+            return snapshot_store.publish(key, await scan_all_sports(key, max_sports), current=False)
+
+        try:
+            snapshot = await live_scans.do(key, scan_and_publish)
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=500, detail=f"Failed to fetch odds: {str(e)}")
+        source = "live"
+
+    result = build_live_response(snapshot, min_profit, include_live, limit, book_mask=book_mask)
+    # A single page: more records pass the filters than limit returns
+    if result.pop("next_cursor") is not None:
+        result["truncated"] = True
+
+    scan_result = snapshot.data
+    return {
+        **result,
+        "sports_scanned": scan_result["sports_scanned"],
+        "sports_skipped": scan_result["sports_skipped"],
+        "games_scanned": scan_result["games_scanned"],
+        "shards": scan_result["shards"],
+        "source": source,
+        "snapshot_age_seconds": round(snapshot.age_seconds(), 3)
+    }
+
 
 @app.post("/upload")
-async def upload_manual_odds(file: UploadFile = File(...)):
+async def upload_manual_odds(request: Request, file: UploadFile = File(...), books: Optional[str] = None):
     """
     Upload CSV or JSON file with manual odds data
+
+    The file is parsed incrementally in a thread and scanned in shards of
+    UPLOAD_BATCH_GAMES games on the scan_pool workers, so memory stays
+    flat for large files and the event loop is never blocked. With `Accept: application/x-ndjson`
+    the response streams one opportunity per line as batches finish,
+    followed by a {"done": true, "count": ..., "games": ...} line (or an
+    {"error": ...} line if the file turns out to be malformed part-way).
+    Otherwise all opportunities are returned at once, highest profit first.
+
+    books: Comma-separated bookmakers to use (default: all supported)
     
     Expected JSON format:
     {
@@ -637,74 +1276,70 @@ async def upload_manual_odds(file: UploadFile = File(...)):
             }
         ]
     }
+
+    CSV format: one row per game and bookmaker, rows of a game together:
+    match,sport,date,bookmaker,home,away
     """
     try:
-        content = await file.read()
-        
-        if file.filename.endswith(".json"):
-            data = json.loads(content)
-        elif file.filename.endswith(".csv"):
-            # Parse CSV (simple implementation)
-            import csv
-            import io
-            csv_data = csv.DictReader(io.StringIO(content.decode()))
-            data = {"games": list(csv_data)}
-        else:
-            raise HTTPException(status_code=400, detail="Only JSON and CSV files are supported")
-        
-        # Process uploaded data and find arbitrages
-        arbitrages = []
-        
-        for game in data.get("games", []):
-            match_name = game.get("match", "Unknown Match")
-            sport_name = game.get("sport", "Unknown Sport")
-            bookmakers = game.get("bookmakers", [])
-            
-            # Only include whitelisted sportsbooks
-            bookmakers = [b for b in bookmakers if b.get("name") in ALLOWED_SPORTSBOOKS]
-            
-            if len(bookmakers) < 2:
-                continue
-            
-            # Find arbitrage opportunities
-            for i, book1 in enumerate(bookmakers):
-                for book2 in bookmakers[i+1:]:
-                    odds_a = book1.get("home") or book1.get("odds1")
-                    odds_b = book2.get("away") or book2.get("odds2")
-                    
-                    if odds_a and odds_b:
-                        arb = calculate_arbitrage_two_way(odds_a, odds_b)
-                        
-                        if arb["exists"]:
-                            stakes = calculate_stakes(odds_a, odds_b, total_stake=1000)
-                            
-                            arbitrages.append({
-                                "match": match_name,
-                                "sport": sport_name,
-                                "market": "h2h",
-                                "sportsbook_a": book1.get("name", "Unknown"),
-                                "odds_a": odds_a,
-                                "outcome_a": "Home/Team A",
-                                "sportsbook_b": book2.get("name", "Unknown"),
-                                "odds_b": odds_b,
-                                "outcome_b": "Away/Team B",
-                                "profit_percentage": round(arb["profit_percentage"], 2),
-                                "stake_a": stakes["stake_a"],
-                                "stake_b": stakes["stake_b"],
-                                "guaranteed_profit": round(stakes["profit"], 2)
-                            })
-        
-        arbitrages.sort(key=lambda x: x["profit_percentage"], reverse=True)
-        
-        return {
-            "success": True,
-            "count": len(arbitrages),
-            "arbitrages": arbitrages
-        }
-        
+        book_mask = ALLOWED_SPORTSBOOKS.parse(books)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if file.filename.endswith(".json"):
+        parse_games = iter_json_games
+    elif file.filename.endswith(".csv"):
+        parse_games = iter_csv_games
+    else:
+        raise HTTPException(status_code=400, detail="Only JSON and CSV files are supported")
+
+    # Spooled upload read as text in chunks; detached afterwards so the
+    # wrapper does not close the underlying file
+    text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    games_seen = 0
+
+    def parse_shards():
+        nonlocal games_seen
+        try:
+            games = (check_game(game, index) for index, game in enumerate(parse_games(text)))
+            for games in batched(games, UPLOAD_BATCH_GAMES):
+                games_seen += len(games)
+                yield games
+        finally:
+            text.detach()
+
+    def scan_shards():
+        return scan_pool.imap(find_upload_arbitrages, iterate_in_threadpool(parse_shards()), book_mask)
+
+    if "ndjson" in request.headers.get("accept", ""):
+        async def lines():
+            count = 0
+            try:
+                async for arbitrages in scan_shards():
+                    count += len(arbitrages)
+                    if arbitrages:
+                        yield b"".join(dumps_json(arb) + b"\n" for arb in arbitrages)
+            except Exception as e:
+                # The status line is already sent; the error goes in the stream
+                yield dumps_json({"error": f"Error processing file: {str(e)}"}) + b"\n"
+                return
+            yield dumps_json({"done": True, "count": count, "games": games_seen}) + b"\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    try:
+        runs = [arbitrages async for arbitrages in scan_shards()]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
+    # Each shard's list is sorted; merging keeps the overall order stable
+    arbitrages = merge_top_k(runs, None, key=lambda x: x["profit_percentage"])
+
+    return {
+        "success": True,
+        "count": len(arbitrages),
+        "arbitrages": arbitrages
+    }
+
 @app.post("/convert-odds")
 def convert_odds(odds_value: float, from_format: str, to_format: str = "decimal"):
     """
@@ -727,29 +1362,59 @@ def convert_odds(odds_value: float, from_format: str, to_format: str = "decimal"
 
 @app.get("/health")
 def health_check():
+    daily_budget = quota_planner.daily_budget()
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "api_key_configured": bool(ODDS_API_KEY)
+        "api_key_configured": bool(ODDS_API_KEY),
+        "poller": {
+            "running": odds_poller.running,
+            "targets": len(odds_poller.targets),
+            "snapshot_version": snapshot_store.version,
+            "last_error": odds_poller.last_error,
+            "plans": [
+                {
+                    "sport": plan.key.sport,
+                    "markets": plan.scan_key.markets,
+                    "player_props": plan.scan_key.include_player_props,
+                    "interval_seconds": None if plan.interval_seconds is None else round(plan.interval_seconds, 1),
+                    "cost": plan.cost,
+                    "degraded": plan.degraded
+                }
+                for plan in odds_poller.plans.values()
+            ]
+        },
+        "quota": {
+            **quota_tracker.stats(),
+            "daily_budget": None if daily_budget is None else round(daily_budget, 1)
+        }
+    }
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss/eviction counters and usage for in-memory caches"""
+    return {
+        "player_props": {
+            **PLAYER_PROP_CACHE.stats(),
+            "refreshes_in_flight": len(player_prop_refreshes)
+        }
     }
 
 @app.get("/debug/nba")
-def debug_nba():
+async def debug_nba():
     """Debug endpoint to see what NBA data is being processed"""
     if not ODDS_API_KEY:
         return {"error": "API key not configured"}
     
     try:
-        response = requests.get(
-            f"{ODDS_API_BASE_URL}/sports/basketball_nba/odds",
+        response = await odds_client.get(
+            "/sports/basketball_nba/odds",
             params={
-                "apiKey": ODDS_API_KEY,
                 "regions": "us,us2",
                 "markets": "h2h",
                 "oddsFormat": "decimal"
             }
         )
-        response.raise_for_status()
         data = response.json()
         
         filtered_games = filter_prematch(data, include_live=False, grace_min=0)
@@ -791,22 +1456,20 @@ def debug_nba():
         return {"error": str(e)}
 
 @app.get("/debug/player-props")
-def debug_player_props():
+async def debug_player_props():
     """Debug endpoint to check player prop data structure"""
     if not ODDS_API_KEY:
         return {"error": "API key not configured"}
     
     try:
-        response = requests.get(
-            f"{ODDS_API_BASE_URL}/sports/basketball_nba/odds",
+        response = await odds_client.get(
+            "/sports/basketball_nba/odds",
             params={
-                "apiKey": ODDS_API_KEY,
                 "regions": "us,us2",
                 "markets": "player_points",
                 "oddsFormat": "decimal"
             }
         )
-        response.raise_for_status()
         data = response.json()
         
         filtered_games = filter_prematch(data, include_live=False, grace_min=0)
@@ -0,0 +1,59 @@
+"""
+Micro-benchmark: per-pair cost of two-way arbitrage evaluation
+
+Compares the full calculate_arbitrage_two_way result with the
+check_arbitrage_two_way fast predicate on a realistic mix of pairs,
+where almost every pair is not an arbitrage. The predicate is what
+utils.scanner.evaluate_two_way runs on every live two-way candidate.
+
+Run from the backend directory: python bench_arbitrage.py
+"""
+import random
+import timeit
+
+from utils.arbitrage import calculate_arbitrage_two_way, check_arbitrage_two_way
+
+PAIRS = 20000
+REPEATS = 5
+
+rng = random.Random(42)
+pairs = []
+for _ in range(PAIRS):
+    # Typical two-way prices with a 3-6% bookmaker margin
+    odds_a = rng.uniform(1.3, 4.0)
+    margin = rng.uniform(1.03, 1.06)
+    odds_b = 1 / (margin - 1 / odds_a)
+    # Roughly 1 in 100 pairs is nudged into an arbitrage
+    if rng.random() < 0.01:
+        odds_b *= 1.08
+    pairs.append((round(odds_a, 2), round(odds_b, 2)))
+
+hits = sum(1 for a, b in pairs if check_arbitrage_two_way(a, b))
+
+
+def run_full():
+    return [arb for a, b in pairs if (arb := calculate_arbitrage_two_way(a, b, validate=True))["exists"]]
+
+
+def run_fast():
+    return [calculate_arbitrage_two_way(a, b, validate=True) for a, b in pairs if check_arbitrage_two_way(a, b)]
+
+
+assert len(run_full()) == len(run_fast()) == hits
+
+print("=" * 80)
+print("TWO-WAY ARBITRAGE EVALUATION BENCHMARK")
+print("=" * 80)
+print(f"Pairs: {PAIRS} | Arbitrages: {hits} ({hits / PAIRS:.2%})")
+print()
+
+results = {}
+for name, fn in (("calculate_arbitrage_two_way on every pair", run_full),
+                 ("check_arbitrage_two_way, full result for hits", run_fast)):
+    best = min(timeit.repeat(fn, number=1, repeat=REPEATS))
+    results[name] = best
+    print(f"{name:<50} {best * 1e9 / PAIRS:8.0f} ns/pair")
+
+before, after = results.values()
+print("-" * 80)
+print(f"Speedup: {before / after:.1f}x")
@@ -0,0 +1,476 @@
+"""
+Endpoint tests for the live arbitrage API against a fake upstream
+"""
+import asyncio
+import importlib
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Optional, Tuple
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import utils.snapshot
+from utils.snapshot import encode_cursor
+
+
+class FakeOddsAPI:
+    """Serves a fixed slate of two-book games, each with one h2h arbitrage"""
+
+    def __init__(self, games: int = 12, other_books_from: Optional[int] = None):
+        """
+        Args:
+            games: Games in the slate, profit falling with the game number
+            other_books_from: Games from this one on are priced by BetMGM and
+                Caesars Sportsbook instead of DraftKings and FanDuel
+        """
+        start = datetime.now(timezone.utc) + timedelta(hours=1)
+        self.games = [
+            {
+                "id": f"evt{i}",
+                "sport_key": "basketball_nba",
+                "commence_time": (start + timedelta(hours=i)).isoformat().replace("+00:00", "Z"),
+                "home_team": f"Home{i}",
+                "away_team": f"Away{i}",
+                "bookmakers": [
+                    {"title": self.books(i, other_books_from)[0], "markets": [{"key": "h2h", "outcomes": [
+                        {"name": f"Home{i}", "price": 2.10},
+                        {"name": f"Away{i}", "price": 1.80}
+                    ]}]},
+                    {"title": self.books(i, other_books_from)[1], "markets": [{"key": "h2h", "outcomes": [
+                        {"name": f"Home{i}", "price": 1.80},
+                        # Profit falls as i rises, so records sort by game
+                        {"name": f"Away{i}", "price": round(2.10 + 0.01 * (games - i), 2)}
+                    ]}]}
+                ]
+            }
+            for i in range(games)
+        ]
+        self.remaining = 500
+        self.odds_requests = 0
+        self.sports_requests = 0
+        # Event ids whose odds come back as a non-JSON body
+        self.bad_events = set()
+
+    @staticmethod
+    def books(game: int, other_books_from: Optional[int]) -> Tuple[str, str]:
+        if other_books_from is not None and game >= other_books_from:
+            return "BetMGM", "Caesars Sportsbook"
+        return "DraftKings", "FanDuel"
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/sports"):
+            self.sports_requests += 1
+            return httpx.Response(200, json=[{"key": "basketball_nba", "active": True}])
+        self.odds_requests += 1
+        self.remaining -= 1
+        if "/events/" in request.url.path:
+            event_id = request.url.path.split("/")[-2]
+            if event_id in self.bad_events:
+                return httpx.Response(200, content=b"<html>upstream error</html>")
+            body = next(game for game in self.games if game["id"] == event_id)
+        else:
+            body = self.games
+        return httpx.Response(
+            200,
+            json=body,
+            headers={
+                "x-requests-remaining": str(self.remaining),
+                "x-requests-used": str(500 - self.remaining),
+                "x-requests-last": "1"
+            }
+        )
+
+
+def load_app(monkeypatch, poll_targets: str = "", upstream: Optional[FakeOddsAPI] = None, **env: str):
+    """The app module, reloaded with test configuration, and its fake upstream"""
+    monkeypatch.setenv("SCAN_WORKERS", "1")
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setenv("ODDS_API_KEY", "test-key")
+    monkeypatch.setenv("QUOTA_STATE_PATH", "")
+    monkeypatch.setenv("POLL_TARGETS", poll_targets)
+    import app as app_module
+    app_module = importlib.reload(app_module)
+
+    upstream = upstream or FakeOddsAPI()
+    app_module.odds_client._transport = httpx.MockTransport(upstream.handle)
+    return app_module, upstream
+
+
+@pytest.fixture
+def api(monkeypatch):
+    return load_app(monkeypatch)
+
+
+def test_cursor_pages_through_one_scan(api):
+    """Test that limit/cursor pages partition one scan without rescanning"""
+    app_module, upstream = api
+    client = TestClient(app_module.app)
+    params = {"sport": "basketball_nba", "limit": 5}
+
+    first = client.get("/arbitrage/live", params=params).json()
+    pages = [first]
+    while pages[-1]["next_cursor"]:
+        pages.append(client.get("/arbitrage/live", params={**params, "cursor": pages[-1]["next_cursor"]}).json())
+
+    matches = [arb["match"] for page in pages for arb in page["arbitrages"]]
+    assert [page["count"] for page in pages] == [5, 5, 2]
+    assert matches == [f"Home{i} vs Away{i}" for i in range(12)]
+    assert {page["snapshot_version"] for page in pages} == {first["snapshot_version"]}
+    assert upstream.odds_requests == 1
+
+
+def test_cursor_survives_other_queries_and_errors(api):
+    """Test that other queries' scans do not evict a cursor, and bad cursors fail cleanly"""
+    app_module, _ = api
+    client = TestClient(app_module.app)
+    params = {"sport": "basketball_nba", "limit": 5}
+    cursor = client.get("/arbitrage/live", params=params).json()["next_cursor"]
+
+    # Far more on-demand scans of other queries than the per-query history holds
+    for grace in range(1, app_module.SNAPSHOT_HISTORY_SIZE + 5):
+        client.get("/arbitrage/live", params={"sport": "basketball_nba", "grace_minutes": grace})
+
+    page = client.get("/arbitrage/live", params={**params, "cursor": cursor})
+    assert page.status_code == 200
+    assert page.json()["arbitrages"][0]["match"] == "Home5 vs Away5"
+
+    mismatched = {"sport": "basketball_nba", "markets": "spreads", "cursor": cursor}
+    assert client.get("/arbitrage/live", params=mismatched).status_code == 400
+    expired = client.get("/arbitrage/live", params={**params, "cursor": encode_cursor(10_000, 5)})
+    assert expired.status_code == 410
+    assert client.get("/arbitrage/live", params={**params, "cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_degraded_polls_share_the_target_engine(monkeypatch):
+    """Test that changes after a degraded poll compare with the target's last result"""
+    app_module, _ = load_app(monkeypatch, "basketball_nba:h2h,spreads:us")
+    target = app_module.POLL_TARGETS[0]
+    cheaper = target._replace(markets="h2h")
+    assert app_module.poll_target_of(cheaper) == target
+
+    async def poll_full_then_cheaper():
+        for scan_key in (target, cheaper):
+            await app_module.odds_poller.poll_target(target, scan_key)
+
+    asyncio.run(poll_full_then_cheaper())
+
+    # The upstream only has h2h prices, so nothing changed between polls
+    data = app_module.snapshot_store.get(target).data
+    assert data["scanned_markets"] == "h2h"
+    assert data["changes"] == {"added": 0, "removed": 0, "changed": 0}
+    assert len(data["arbitrages"]) == 12
+
+
+def test_books_subset_is_truncated_like_a_subset_scan(monkeypatch):
+    """Test that a books= subset ranked below the scan's top K still returns its own top K"""
+    app_module, _ = load_app(monkeypatch, upstream=FakeOddsAPI(other_books_from=6), LIVE_SCAN_MAX_RESULTS="4")
+    client = TestClient(app_module.app)
+
+    everything = client.get("/arbitrage/live", params={"sport": "basketball_nba"}).json()
+    assert [arb["match"] for arb in everything["arbitrages"]] == [f"Home{i} vs Away{i}" for i in range(4)]
+    assert everything["arbitrages_found"] == 12 and everything["truncated"]
+
+    # All six BetMGM/Caesars Sportsbook games rank below the overall top 4
+    subset = client.get("/arbitrage/live", params={"sport": "basketball_nba", "books": "BetMGM,Caesars Sportsbook"}).json()
+    assert [arb["match"] for arb in subset["arbitrages"]] == [f"Home{i} vs Away{i}" for i in range(6, 10)]
+    assert subset["arbitrages_found"] == 6 and subset["truncated"]
+
+
+def test_low_quota_serves_polled_snapshot_instead_of_rescanning(monkeypatch):
+    """Test that a polled target stretched by a low quota is answered from its snapshot"""
+    monkeypatch.setattr("utils.quota.days_until_monthly_reset", lambda now: 15.0)
+    upstream = FakeOddsAPI()
+    upstream.remaining = 401
+    app_module, _ = load_app(monkeypatch, "basketball_nba:h2h:us", upstream=upstream)
+    client = TestClient(app_module.app)
+    poller = app_module.odds_poller
+    target = poller.targets[0]
+
+    def replan_and_get(age_seconds):
+        poller.plans = app_module.quota_planner.plan(poller.targets)
+        now = time.time()
+        monkeypatch.setattr(utils.snapshot, "time", SimpleNamespace(time=lambda: now + age_seconds))
+        return client.get("/arbitrage/live", params={"sport": "basketball_nba"})
+
+    asyncio.run(poller.poll_target(target))
+    # 350 credits over 15 days would mean one poll an hour; capped at the max
+    fresh = replan_and_get(1000)
+    assert poller.plans[target].interval_seconds == app_module.POLL_MAX_INTERVAL_SECONDS
+    assert fresh.json()["source"] == "snapshot" and not fresh.json()["stale"]
+    assert 790 < int(fresh.headers["cache-control"].removeprefix("max-age=")) <= 800
+
+    overdue = replan_and_get(3000).json()
+    assert overdue["source"] == "snapshot" and overdue["stale"]
+
+    # At the reserve polling pauses and the last snapshot keeps being served
+    app_module.quota_tracker.record({"x-requests-remaining": "50"})
+    paused = replan_and_get(86400)
+    assert poller.plans[target].interval_seconds is None
+    assert paused.json()["source"] == "snapshot" and paused.json()["stale"]
+    assert paused.headers["cache-control"] == "no-cache"
+    assert upstream.odds_requests == 1
+
+
+def test_near_start_prop_odds_past_max_stale_are_not_served(monkeypatch):
+    """Test that an event refreshed every minute is not answered from odds minutes past that"""
+    app_module, upstream = load_app(monkeypatch)
+    now = [1000.0]
+    app_module.PLAYER_PROP_CACHE._clock = lambda: now[0]
+    args = ("basketball_nba", "evt0", ["player_points"], "us")
+    app_module.PLAYER_PROP_CACHE.set(app_module.player_prop_cache_key(*args), {"id": "cached"}, size=1)
+    interval = app_module.PLAYER_PROP_REFRESH_SECONDS
+
+    def lookup(fetch):
+        return asyncio.run(app_module.fetch_player_prop_event_odds(*args, max_age_seconds=interval, fetch=fetch))
+
+    now[0] += interval + app_module.PLAYER_PROP_CACHE_MAX_STALE_SECONDS - 1
+    assert lookup(fetch=False)[0] == {"id": "cached"}
+
+    now[0] += 2
+    assert lookup(fetch=False) is None
+    event_data, age = lookup(fetch=True)
+    assert event_data["id"] == "evt0" and age == 0.0
+    assert upstream.odds_requests == 1
+
+
+class SSEConnection:
+    """A GET of /arbitrage/stream driven directly over ASGI, read one message at a time"""
+
+    def __init__(self, app, query: str, last_event_id: Optional[int] = None):
+        headers = [(b"host", b"testserver")]
+        if last_event_id is not None:
+            headers.append((b"last-event-id", str(last_event_id).encode()))
+        self.scope = {
+            "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+            "path": "/arbitrage/stream", "raw_path": b"/arbitrage/stream", "root_path": "",
+            "query_string": query.encode(), "headers": headers,
+            "client": ("testclient", 50000), "server": ("testserver", 80)
+        }
+        self.messages: asyncio.Queue = asyncio.Queue()
+        self.closed = asyncio.Event()
+        self.requested = False
+        self.task = asyncio.create_task(app(self.scope, self.receive, self.send))
+
+    async def receive(self):
+        if not self.requested:
+            self.requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self.closed.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            await self.messages.put(message["body"].decode())
+
+    async def next(self):
+        """(event, id, data) of the next message; event and data are None for id-only messages"""
+        fields = {}
+        for line in (await asyncio.wait_for(self.messages.get(), 5)).strip().split("\n"):
+            name, _, value = line.partition(": ")
+            fields[name] = value
+        data = json.loads(fields["data"]) if "data" in fields else None
+        return fields.get("event"), int(fields["id"]), data
+
+    async def close(self):
+        self.closed.set()
+        await asyncio.wait_for(self.task, 5)
+
+
+def test_stream_sends_snapshot_then_deltas_and_resumes(monkeypatch):
+    """Test the SSE sequence over poller publishes, and resuming from Last-Event-ID"""
+    app_module, upstream = load_app(monkeypatch, "basketball_nba:h2h:us")
+    poller = app_module.odds_poller
+    target = poller.targets[0]
+
+    async def scenario():
+        await poller.poll_target(target)
+        stream = SSEConnection(app_module.app, "sport=basketball_nba")
+
+        event, first_version, data = await stream.next()
+        assert event == "snapshot" and data["version"] == first_version
+        assert len(data["arbitrages"]) == 12
+        ids = [arb["id"] for arb in data["arbitrages"]]
+
+        # Same prices: the client only moves its Last-Event-ID forward
+        await poller.poll_target(target)
+        event, version, data = await stream.next()
+        assert (event, data) == (None, None) and version > first_version
+
+        # Game 0 stops being an arbitrage; game 1 is repriced
+        upstream.games[0]["bookmakers"][1]["markets"][0]["outcomes"][1]["price"] = 1.50
+        upstream.games[1]["bookmakers"][1]["markets"][0]["outcomes"][1]["price"] = 2.40
+        await poller.poll_target(target)
+        event, last_version, data = await stream.next()
+        assert event == "delta" and last_version > version
+        assert data["removed"] == [ids[0]] and data["added"] == []
+        assert [arb["id"] for arb in data["changed"]] == [ids[1]]
+        await stream.close()
+
+        # A client resuming from the first snapshot gets one catch-up delta
+        resumed = SSEConnection(app_module.app, "sport=basketball_nba", last_event_id=first_version)
+        event, version, data = await resumed.next()
+        assert event == "delta" and version == last_version
+        assert data["removed"] == [ids[0]] and [arb["id"] for arb in data["changed"]] == [ids[1]]
+        await resumed.close()
+
+    asyncio.run(scenario())
+
+
+def test_etag_changes_when_a_game_drops_out_of_the_page(monkeypatch):
+    """Test that a page whose records change within one snapshot is not answered 304"""
+    app_module, _ = load_app(monkeypatch, "basketball_nba:h2h:us")
+    asyncio.run(app_module.odds_poller.poll_target(app_module.odds_poller.targets[0]))
+    client = TestClient(app_module.app)
+    params = {"sport": "basketball_nba", "limit": 5}
+
+    first = client.get("/arbitrage/live", params=params)
+    assert client.get("/arbitrage/live", params=params, headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+    # Game 0 starts: the same snapshot now fills the page with games 1-5
+    started = (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat()
+    first_record = app_module.snapshot_store.get(app_module.odds_poller.targets[0]).data["arbitrages"][0]
+    monkeypatch.setitem(first_record, "commence_time", started)
+
+    again = client.get("/arbitrage/live", params=params, headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 200
+    assert again.json()["snapshot_version"] == first.json()["snapshot_version"]
+    assert [arb["match"] for arb in again.json()["arbitrages"]] == [f"Home{i} vs Away{i}" for i in range(1, 6)]
+
+
+def test_sports_list_is_cached_with_a_weak_etag(api):
+    """Test that /sports reuses the upstream list and revalidates across encodings"""
+    app_module, upstream = api
+    client = TestClient(app_module.app)
+
+    identity = client.get("/sports", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/sports", headers={"Accept-Encoding": "gzip"})
+    assert identity.json() == gzipped.json() == {"sports": [{"key": "basketball_nba", "active": True}]}
+    assert identity.headers["etag"].startswith("W/")
+    assert upstream.sports_requests == 1
+
+    revalidated = client.get("/sports", headers={"If-None-Match": gzipped.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert upstream.sports_requests == 1
+
+
+def test_upload_stream_reports_malformed_games(api):
+    """Test that a game of the wrong shape ends the NDJSON stream with an error line"""
+    app_module, _ = api
+    client = TestClient(app_module.app)
+    games = [
+        {"match": "A vs B", "bookmakers": [
+            {"name": "DraftKings", "home": 2.2, "away": 1.8},
+            {"name": "FanDuel", "home": 1.8, "away": 2.2}
+        ]},
+        {"match": "C vs D", "bookmakers": ["FanDuel"]}
+    ]
+    body = json.dumps({"games": games})
+
+    response = client.post(
+        "/upload",
+        files={"file": ("odds.json", body, "application/json")},
+        headers={"Accept": "application/x-ndjson"}
+    )
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert response.status_code == 200
+    assert "Game 1" in lines[-1]["error"]
+
+    whole = client.post("/upload", files={"file": ("odds.json", body, "application/json")})
+    assert whole.status_code == 500 and "Game 1" in whole.json()["detail"]
+
+
+def test_all_sports_scans_are_shared_and_reused(api):
+    """Test that concurrent and later /arbitrage/all requests share one upstream scan"""
+    app_module, upstream = api
+    params = dict(
+        regions="us", markets="h2h", min_profit=0.0, include_live=False, grace_minutes=0,
+        limit=None, books=None, max_sports=None
+    )
+
+    async def concurrent_requests():
+        return await asyncio.gather(*(app_module.find_all_sports_arbitrage(**params) for _ in range(3)))
+
+    results = asyncio.run(concurrent_requests())
+    assert upstream.odds_requests == 1
+    assert all(result["source"] == "live" and result["count"] == 12 for result in results)
+    assert results[0]["sports_scanned"] == ["basketball_nba"]
+
+    client = TestClient(app_module.app)
+    page = client.get("/arbitrage/all", params={"limit": 3, "books": "DraftKings,FanDuel"}).json()
+    assert page["source"] == "snapshot" and page["truncated"]
+    assert [arb["match"] for arb in page["arbitrages"]] == [f"Home{i} vs Away{i}" for i in range(3)]
+    assert upstream.odds_requests == 1
+
+
+def test_all_sports_snapshots_expire(monkeypatch):
+    """Test that an /arbitrage/all result is dropped once it is too old to reuse"""
+    app_module, upstream = load_app(monkeypatch, SNAPSHOT_MAX_AGE_SECONDS="60", SNAPSHOT_HISTORY_SECONDS="60")
+    clock = [time.time()]
+    monkeypatch.setattr("utils.snapshot.time.time", lambda: clock[0])
+    client = TestClient(app_module.app)
+    old_key = app_module.normalize_scan_key("*", grace_minutes=1)
+
+    assert client.get("/arbitrage/all", params={"grace_minutes": 1}).json()["source"] == "live"
+    assert old_key not in app_module.snapshot_store.keys()
+    assert client.get("/arbitrage/all", params={"grace_minutes": 1}).json()["source"] == "snapshot"
+
+    clock[0] += 61
+    assert client.get("/arbitrage/all", params={"grace_minutes": 2}).json()["source"] == "live"
+    assert app_module.snapshot_store.latest(old_key) is None
+    assert [snapshot.key for snapshot in app_module.snapshot_store._history.values()] == [
+        app_module.normalize_scan_key("*", grace_minutes=2)
+    ]
+    assert upstream.odds_requests == 2
+
+
+def test_upload_and_all_sports_scan_in_worker_processes(monkeypatch):
+    """Test that two spawned workers return what the single-worker thread path does"""
+    games = [
+        {"match": f"Home{i} vs Away{i}", "sport": "NBA", "bookmakers": [
+            {"name": "DraftKings", "home": 2.1 + 0.01 * i, "away": 1.8},
+            {"name": "FanDuel", "home": 1.8, "away": 2.1}
+        ]}
+        for i in range(12)
+    ]
+    body = json.dumps({"games": games})
+    # One fake for both runs, so commence times (and so record ids) match
+    upstream = FakeOddsAPI()
+
+    def scan_both(**env):
+        app_module, _ = load_app(monkeypatch, upstream=upstream, SCAN_SHARD_GAMES="5", UPLOAD_BATCH_GAMES="5", **env)
+        client = TestClient(app_module.app)
+        try:
+            uploaded = client.post("/upload", files={"file": ("odds.json", body, "application/json")}).json()
+            all_sports = client.get("/arbitrage/all").json()
+        finally:
+            app_module.scan_pool.shutdown()
+        return app_module.scan_pool.parallel, uploaded, all_sports
+
+    parallel, uploaded, all_sports = scan_both(SCAN_WORKERS="2", SCAN_START_METHOD="spawn")
+    serial, expected_upload, expected_all = scan_both()
+
+    assert parallel and not serial
+    assert len(uploaded["arbitrages"]) == 12
+    assert [(arb["match"], arb["profit_percentage"]) for arb in uploaded["arbitrages"]] == [
+        (arb["match"], arb["profit_percentage"]) for arb in expected_upload["arbitrages"]
+    ]
+    assert all_sports["shards"] == 3 and all_sports["count"] == 12
+    assert [arb["id"] for arb in all_sports["arbitrages"]] == [arb["id"] for arb in expected_all["arbitrages"]]
+
+
+def test_prop_event_with_invalid_body_is_skipped(api):
+    """Test that one event's non-JSON odds fail that event only"""
+    app_module, upstream = api
+    upstream.bad_events.add("evt3")
+    key = app_module.normalize_scan_key("basketball_nba", include_player_props=True)
+
+    data = asyncio.run(app_module.scan_live_odds(key))
+
+    assert data["player_props"]["events_failed"] == 1
+    assert data["player_props"]["events_processed"] == 11
+    assert len([arb for arb in data["arbitrages"] if arb["market_type"] == "game"]) == 12
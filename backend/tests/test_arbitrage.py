@@ -3,7 +3,26 @@ Unit tests for arbitrage calculation utilities
 """
 import pytest
 import math
-from utils.arbitrage import is_arbitrage, roi_percent, stake_split
+import random
+import numpy as np
+from utils.arbitrage import (
+    is_arbitrage,
+    roi_percent,
+    stake_split,
+    find_n_way_arbitrage,
+    calculate_stakes_n_way,
+    calculate_arbitrage_two_way,
+    calculate_arbitrage_three_way,
+    calculate_arbitrage_batch,
+    calculate_stakes,
+    calculate_stakes_batch,
+    check_arbitrage_two_way,
+    validate_odds_batch,
+    validate_odds_n_way,
+    MIN_ODDS,
+    MIN_IMPLIED_SUM
+)
+from utils.arbitrage import validate_odds as validate_odds_full
 from utils.odds import to_decimal
 from utils.validations import validate_odds, implied_sum, confidence_from_roi
 
@@ -219,3 +238,127 @@ def test_stake_split_guarantees_equal_return():
     profit2 = return2 - 1000
     assert math.isclose(profit1, profit2, abs_tol=0.01)
 
+
+
+def test_n_way_outright_arbitrage():
+    """Test best-price selection across books in a four-runner outright"""
+    market = {
+        "DraftKings": {"Scheffler": 4.5, "McIlroy": 6.0, "Rahm": 9.0, "Field": 2.6},
+        "FanDuel": {"Scheffler": 5.5, "McIlroy": 5.0, "Rahm": 10.0, "Field": 2.4},
+        "BetMGM": {"Scheffler": 4.8, "McIlroy": 7.0, "Rahm": 8.5, "Field": 2.5}
+    }
+
+    arb = find_n_way_arbitrage(market)
+
+    # 1/5.5 + 1/7.0 + 1/10.0 + 1/2.6 = 0.809 < 1
+    assert arb is not None
+    assert arb["outcomes"] == ["Scheffler", "McIlroy", "Rahm", "Field"]
+    assert arb["books"] == ["FanDuel", "BetMGM", "FanDuel", "DraftKings"]
+    assert arb["odds"] == [5.5, 7.0, 10.0, 2.6]
+    assert math.isclose(arb["profit_percentage"], (1 / arb["implied_probability"] - 1) * 100, rel_tol=1e-4)
+
+
+def test_n_way_no_arbitrage_or_uncovered_runner():
+    """Test that overround and missing runners are rejected"""
+    market = {
+        "DraftKings": {"A": 3.0, "B": 3.0, "C": 3.0, "D": 8.0},
+        "FanDuel": {"A": 3.1, "B": 2.9, "C": 3.0, "D": 7.5}
+    }
+    assert find_n_way_arbitrage(market) is None
+
+    # Runner "E" must be covered but nobody prices it
+    generous = {
+        "DraftKings": {"A": 5.0, "B": 5.0, "C": 5.0, "D": 5.0},
+        "FanDuel": {"A": 5.5, "B": 5.0, "C": 5.0, "D": 5.0}
+    }
+    assert find_n_way_arbitrage(generous, outcome_names=["A", "B", "C", "D", "E"]) is None
+
+
+def test_n_way_scales_to_large_fields():
+    """Test a 120-runner market with one longshot mispriced at one book"""
+    runners = [f"Runner{i}" for i in range(120)]
+    market = {
+        f"Book{b}": {name: 130.0 for name in runners}
+        for b in range(8)
+    }
+    # 120 / 130 = 0.923 implied at every book; only cross-book legs count
+    market["Book3"]["Runner0"] = 200.0
+
+    arb = find_n_way_arbitrage(market)
+
+    assert arb is not None
+    assert len(arb["odds"]) == 120
+    assert arb["books"][0] == "Book3"
+    assert arb["implied_probability"] < 1
+
+
+def test_n_way_validation_shares_bounds(monkeypatch):
+    """Test that the N-way validator uses the module-level sanity bounds"""
+    assert not validate_odds_n_way([MIN_ODDS - 0.005, 50.0])["valid"]
+    assert validate_odds_n_way([MIN_ODDS, 50.0])["valid"]
+
+    # 4 x 1/5.5 = 0.727 implied: too generous to be real prices
+    assert validate_odds_n_way([5.5] * 4)["implied_sum"] < MIN_IMPLIED_SUM
+    assert not validate_odds_n_way([5.5] * 4)["valid"]
+
+    monkeypatch.setattr("utils.arbitrage.MIN_IMPLIED_SUM", 0.70)
+    monkeypatch.setattr("utils.arbitrage.MIN_ODDS", 1.001)
+    assert validate_odds_n_way([5.5] * 4)["valid"]
+    assert validate_odds_n_way([1.005, 500.0])["valid"]
+
+
+def test_stakes_n_way_equalize_returns():
+    """Test that N-way stakes sum to the total and equalize returns"""
+    odds = [5.5, 7.0, 10.0, 2.6]
+    stakes = calculate_stakes_n_way(odds, total_stake=1000)
+
+    assert math.isclose(sum(stakes["stakes"]), 1000, abs_tol=0.05)
+    assert max(stakes["returns"]) - min(stakes["returns"]) < 0.5
+    assert stakes["profit"] > 0
+
+
+@pytest.mark.parametrize("width", [2, 3])
+def test_batch_matches_scalar(width):
+    """Test that batch evaluation agrees with the per-tuple functions"""
+    rng = random.Random(width)
+    rows = [
+        tuple(round(rng.uniform(1.0, 16.0 if width == 2 else 4.5), 2) for _ in range(width))
+        for _ in range(2000)
+    ]
+    scalar = calculate_arbitrage_two_way if width == 2 else calculate_arbitrage_three_way
+
+    batch = calculate_arbitrage_batch(np.array(rows))
+    valid = validate_odds_batch(np.array(rows))
+
+    for i, row in enumerate(rows):
+        expected = scalar(*row, validate=True)
+        assert valid[i] == validate_odds_full(*row)["valid"]
+        assert batch["exists"][i] == expected["exists"]
+        assert batch["profit_percentage"][i] == pytest.approx(expected["profit_percentage"], abs=1e-4)
+
+
+def test_stakes_batch_matches_scalar():
+    """Test that batch stakes match calculate_stakes row by row"""
+    rows = [(2.10, 2.05), (1.95, 2.12), (3.10, 3.60, 3.90)]
+
+    for row in rows:
+        batch = calculate_stakes_batch(np.array([row]))
+        expected = calculate_stakes(*row, total_stake=1000)
+        letters = "abc"[:len(row)]
+        assert batch["stakes"][0].tolist() == [expected[f"stake_{l}"] for l in letters]
+        assert batch["profit"][0] == expected["profit"]
+
+
+def test_fast_predicate_matches_full_result():
+    """Test that check_arbitrage_two_way agrees with calculate_arbitrage_two_way"""
+    rng = random.Random(14)
+    for _ in range(5000):
+        odds_a = round(rng.uniform(1.0, 16.0), 2)
+        odds_b = round(rng.uniform(1.0, 16.0), 2)
+        for validate in (True, False):
+            full = calculate_arbitrage_two_way(odds_a, odds_b, validate=validate)
+            fast = check_arbitrage_two_way(odds_a, odds_b, validate=validate)
+
+            assert (fast is not None) == full["exists"]
+            if fast:
+                assert round(fast[1], 4) == full["profit_percentage"]
@@ -0,0 +1,39 @@
+"""
+Unit tests for bookmaker bitmask selection
+"""
+import pytest
+
+from utils.books import BookRegistry, within
+
+BOOKS = BookRegistry(["DraftKings", "FanDuel", "BetMGM"])
+
+
+def test_registry_assigns_bits_in_order():
+    """Test fixed bits, membership and mask round-trips"""
+    assert BOOKS.bit("DraftKings") == 0b001
+    assert BOOKS.bit("BetMGM") == 0b100
+    assert BOOKS.bit("Offshore Book") == 0
+    assert BOOKS.all_mask == 0b111
+    assert "FanDuel" in BOOKS and "Offshore Book" not in BOOKS
+    assert BOOKS.mask(["BetMGM", "DraftKings", "Offshore Book"]) == 0b101
+    assert BOOKS.names_in(0b110) == ["FanDuel", "BetMGM"]
+    assert list(BOOKS) == ["DraftKings", "FanDuel", "BetMGM"]
+
+
+def test_parse_selection():
+    """Test comma-separated, case-insensitive book selection"""
+    assert BOOKS.parse(None) == BOOKS.all_mask
+    assert BOOKS.parse(" ") == BOOKS.all_mask
+    assert BOOKS.parse("draftkings, BETMGM,") == 0b101
+
+    with pytest.raises(ValueError, match="Offshore Book"):
+        BOOKS.parse("FanDuel,Offshore Book")
+
+
+def test_within_selection():
+    """Test that a record qualifies only if all its books are selected"""
+    record_mask = BOOKS.mask(["DraftKings", "FanDuel"])
+
+    assert within(record_mask, BOOKS.all_mask)
+    assert within(record_mask, BOOKS.parse("DraftKings,FanDuel"))
+    assert not within(record_mask, BOOKS.parse("DraftKings,BetMGM"))
@@ -0,0 +1,120 @@
+"""
+Unit tests for the bounded TTL/LRU cache
+"""
+from utils.cache import CacheConfig, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_expiry_counts_as_miss():
+    """Test that entries past their TTL are dropped on access"""
+    clock = FakeClock()
+    cache = TTLCache(CacheConfig(ttl_seconds=120), clock=clock)
+
+    cache.set("nba:event1", {"id": "event1"}, size=100)
+    clock.now = 119
+    assert cache.get("nba:event1") == {"id": "event1"}
+
+    clock.now = 120
+    assert cache.get("nba:event1") is None
+    assert len(cache) == 0
+    assert cache.total_bytes == 0
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["expirations"] == 1
+
+
+def test_lru_eviction_by_entry_count():
+    """Test that the least recently used entry is evicted first"""
+    cache = TTLCache(CacheConfig(max_entries=2, max_bytes=0), clock=FakeClock())
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.stats()["evictions"] == 1
+
+
+def test_eviction_by_total_bytes():
+    """Test that the byte budget is enforced across entries"""
+    cache = TTLCache(CacheConfig(max_entries=100, max_bytes=1000), clock=FakeClock())
+
+    cache.set("a", "x", size=400)
+    cache.set("b", "y", size=400)
+    cache.set("c", "z", size=400)
+
+    assert len(cache) == 2
+    assert cache.total_bytes == 800
+    assert "a" not in cache
+
+    # Oversized values are not cached at all
+    cache.set("huge", "!", size=5000)
+    assert "huge" not in cache
+    assert len(cache) == 2
+
+
+def test_replacing_key_updates_size():
+    """Test that overwriting an entry does not double count its size"""
+    cache = TTLCache(CacheConfig(max_bytes=1000), clock=FakeClock())
+
+    cache.set("a", 1, size=300)
+    cache.set("a", 2, size=500)
+
+    assert cache.get("a") == 2
+    assert cache.total_bytes == 500
+
+
+def test_purge_expired():
+    """Test bulk removal of expired entries"""
+    clock = FakeClock()
+    cache = TTLCache(CacheConfig(ttl_seconds=10), clock=clock)
+
+    cache.set("old", 1)
+    clock.now = 5
+    cache.set("new", 2)
+    clock.now = 11
+
+    assert cache.purge_expired() == 1
+    assert "new" in cache
+    assert "old" not in cache
+
+
+def test_lookup_serves_stale_until_hard_bound():
+    """Test stale-while-revalidate lookups between TTL and max-stale"""
+    clock = FakeClock()
+    cache = TTLCache(CacheConfig(ttl_seconds=120, max_stale_seconds=60), clock=clock)
+    cache.set("nba:event1", {"id": "event1"})
+
+    clock.now = 30
+    fresh = cache.lookup("nba:event1")
+    assert fresh.stale is False
+    assert fresh.age_seconds == 30
+
+    clock.now = 150
+    stale = cache.lookup("nba:event1")
+    assert stale.stale is True
+    assert stale.value == {"id": "event1"}
+    assert stale.age_seconds == 150
+    # Plain get only returns fresh values
+    assert cache.get("nba:event1") is None
+
+    clock.now = 180
+    assert cache.lookup("nba:event1") is None
+    assert len(cache) == 0
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["stale_hits"] == 1
+    assert stats["expirations"] == 1
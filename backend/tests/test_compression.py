@@ -0,0 +1,52 @@
+"""
+Unit tests for the response compression middleware
+"""
+import gzip
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from utils.compression import CompressionMiddleware, negotiate_encoding
+
+
+def make_client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse("odds " * 100)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("odds")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter(["data: 1\n\n" * 20, "data: 2\n\n"]), media_type="text/event-stream")
+
+    return TestClient(app)
+
+
+def test_negotiate_encoding():
+    """Test q-values and unsupported codings"""
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("deflate") is None
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("") is None
+
+
+def test_middleware_compresses_only_complete_large_bodies():
+    """Test that small and streamed bodies pass through unchanged"""
+    client = make_client()
+    headers = {"Accept-Encoding": "gzip"}
+
+    with client.stream("GET", "/large", headers=headers) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(b"".join(response.iter_raw())) == b"odds " * 100
+
+    assert "content-encoding" not in client.get("/small", headers=headers).headers
+    streamed = client.get("/stream", headers=headers)
+    assert "content-encoding" not in streamed.headers
+    assert streamed.text.endswith("data: 2\n\n")
@@ -0,0 +1,152 @@
+"""
+Unit tests for asyncio fan-out helpers
+"""
+import asyncio
+import time
+
+import pytest
+
+from utils.concurrency import gather_bounded, SingleFlight
+
+
+def test_gather_bounded_respects_limit():
+    """Test that no more than `limit` calls run at the same time"""
+    in_flight = 0
+    peak = 0
+
+    async def call(i):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return i * 2
+
+    results = asyncio.run(gather_bounded([lambda i=i: call(i) for i in range(10)], limit=3))
+
+    assert results == [i * 2 for i in range(10)]
+    assert peak == 3
+
+
+def test_gather_bounded_runs_concurrently():
+    """Test that a full fan-out takes about one call's latency"""
+    async def call():
+        await asyncio.sleep(0.05)
+        return True
+
+    start = time.perf_counter()
+    results = asyncio.run(gather_bounded([call for _ in range(20)], limit=20))
+    elapsed = time.perf_counter() - start
+
+    assert all(results)
+    assert elapsed < 0.5
+
+
+def test_gather_bounded_deadline_and_failures():
+    """Test that slow and failing calls yield None without aborting the rest"""
+    async def fast():
+        return "fast"
+
+    async def slow():
+        await asyncio.sleep(5)
+        return "slow"
+
+    async def broken():
+        raise RuntimeError("upstream error")
+
+    results = asyncio.run(gather_bounded([fast, slow, broken, fast], limit=4, deadline=0.1))
+
+    assert results == ["fast", None, None, "fast"]
+
+
+def test_gather_bounded_empty():
+    """Test that an empty fan-out returns immediately"""
+    assert asyncio.run(gather_bounded([], limit=4)) == []
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    """Test that concurrent callers with one key share a single computation"""
+    calls = []
+
+    async def scan(key):
+        calls.append(key)
+        await asyncio.sleep(0.02)
+        return {"key": key}
+
+    async def run():
+        flight = SingleFlight()
+        results = await asyncio.gather(
+            *[flight.do("nba:h2h", lambda: scan("nba:h2h")) for _ in range(10)],
+            flight.do("nfl:h2h", lambda: scan("nfl:h2h"))
+        )
+        assert len(flight) == 0
+        # A later call starts a fresh computation
+        await flight.do("nba:h2h", lambda: scan("nba:h2h"))
+        return results
+
+    results = asyncio.run(run())
+
+    assert calls == ["nba:h2h", "nfl:h2h", "nba:h2h"]
+    assert all(r is results[0] for r in results[:10])
+    assert results[10] == {"key": "nfl:h2h"}
+
+
+def test_single_flight_shares_exceptions():
+    """Test that every waiting caller sees the shared failure"""
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def run():
+        flight = SingleFlight()
+        return await asyncio.gather(
+            *[flight.do("k", failing) for _ in range(3)],
+            return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_single_flight_survives_caller_cancellation():
+    """Test that one cancelled caller does not cancel the shared work"""
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do("k", slow))
+        second = asyncio.ensure_future(flight.do("k", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_single_flight_start_runs_one_background_refresh():
+    """Test that repeated fire-and-forget starts share one task"""
+    calls = []
+
+    async def refresh():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "fresh"
+
+    async def run():
+        flight = SingleFlight()
+        first = flight.start("event1", refresh)
+        second = flight.start("event1", refresh)
+        assert first is second
+        assert "event1" in flight
+        # A blocking caller joins the running refresh
+        result = await flight.do("event1", refresh)
+        assert "event1" not in flight
+        return result
+
+    assert asyncio.run(run()) == "fresh"
+    assert len(calls) == 1
@@ -0,0 +1,40 @@
+"""
+Unit tests for opportunity deltas and Server-Sent Events formatting
+"""
+import json
+
+from utils.deltas import RecordView, sse_message, stable_id
+
+
+def record(record_id, profit, timestamp="t0"):
+    return {"id": record_id, "profit_percentage": profit, "timestamp": timestamp}
+
+
+def test_record_view_reports_added_changed_and_removed():
+    """Test diffing by id, ignoring fields rewritten on every scan"""
+    view = RecordView([record("a", 1.0), record("b", 2.0), record("c", 3.0)])
+
+    delta = view.update([record("a", 1.0, timestamp="t1"), record("b", 2.5), record("d", 4.0)])
+
+    assert [r["id"] for r in delta.added] == ["d"]
+    assert [r["id"] for r in delta.changed] == ["b"]
+    assert delta.removed == ["c"]
+    assert len(view) == 3
+
+    assert not view.update([record("a", 1.0), record("b", 2.5), record("d", 4.0)])
+
+
+def test_stable_id_is_deterministic():
+    """Test that ids are deterministic and distinguish identities"""
+    assert stable_id(("Lakers vs Celtics", "h2h")) == stable_id(("Lakers vs Celtics", "h2h"))
+    assert stable_id(("Lakers vs Celtics", "h2h")) != stable_id(("Lakers vs Celtics", "spreads"))
+    assert len(stable_id(("x",))) == 16
+
+
+def test_sse_message_format():
+    """Test event framing, including id-only messages"""
+    message = sse_message("delta", {"removed": ["a"]}, 7)
+
+    assert message == 'id: 7\nevent: delta\ndata: {"removed":["a"]}\n\n'
+    assert json.loads(message.split("data: ")[1]) == {"removed": ["a"]}
+    assert sse_message(event_id=8) == "id: 8\n\n"
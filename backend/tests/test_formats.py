@@ -0,0 +1,53 @@
+"""
+Unit tests for response format negotiation and the columnar layout
+"""
+import json
+
+import pytest
+
+from utils.formats import COLUMNAR, ROWS, negotiate_format, render, to_columnar
+
+
+def test_negotiate_format():
+    """Test that format= wins, then Accept by q, then rows"""
+    assert negotiate_format(None) == ROWS
+    assert negotiate_format("application/vnd.arbitrage.columnar+json") == COLUMNAR
+    assert negotiate_format("application/json;q=0.5, application/vnd.arbitrage.columnar+json") == COLUMNAR
+    assert negotiate_format("text/html, */*;q=0.8") == ROWS
+    assert negotiate_format("text/html") == ROWS
+    assert negotiate_format("application/json", "Columnar") == COLUMNAR
+
+    with pytest.raises(ValueError):
+        negotiate_format(None, "xml")
+
+
+def test_to_columnar_dictionary_encodes_repeated_strings():
+    """Test key-once columns, missing keys as None and string dictionaries"""
+    records = [
+        {"match": "A vs B", "book": "DraftKings", "odds": 2.1, "timestamp": "t1"},
+        {"match": "A vs B", "book": "FanDuel", "odds": 1.9, "timestamp": "t2", "player_name": "X"},
+        {"match": "A vs B", "book": "DraftKings", "odds": 2.0, "timestamp": "t3"},
+        {"match": "A vs B", "book": "DraftKings", "odds": 2.2, "timestamp": "t4"}
+    ]
+
+    layout = to_columnar(records)
+
+    assert layout["count"] == 4
+    assert list(layout["columns"]) == ["match", "book", "odds", "timestamp", "player_name"]
+    assert layout["columns"]["odds"] == [2.1, 1.9, 2.0, 2.2]
+    assert layout["dictionaries"]["book"] == ["DraftKings", "FanDuel"]
+    assert layout["columns"]["book"] == [0, 1, 0, 0]
+    assert layout["columns"]["player_name"] == [None, 0, None, None]
+    # Mostly-distinct strings are left as they are
+    assert "timestamp" not in layout["dictionaries"]
+
+
+def test_render_columnar_keeps_other_fields():
+    """Test that only the records field changes layout"""
+    result = {"count": 1, "arbitrages": [{"match": "A vs B"}], "next_cursor": None}
+
+    assert json.loads(render(result, ROWS)) == result
+    body = json.loads(render(result, COLUMNAR))
+    assert body["format"] == COLUMNAR
+    assert body["next_cursor"] is None
+    assert body["arbitrages"]["columns"] == {"match": ["A vs B"]}
@@ -0,0 +1,35 @@
+"""
+Unit tests for conditional GET helpers
+"""
+from utils.http_cache import cache_control, etag_matches, make_etag
+
+
+def test_make_etag_depends_on_every_part():
+    """Test that tags are deterministic, quoted and weak by default"""
+    etag = make_etag(12, 1.5, "DraftKings")
+
+    assert etag == make_etag(12, 1.5, "DraftKings")
+    assert etag != make_etag(13, 1.5, "DraftKings")
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert make_etag(b"[]", weak=False).startswith('"')
+
+
+def test_etag_matches_if_none_match_lists():
+    """Test weak comparison against single, listed and wildcard validators"""
+    etag = make_etag(1)
+    strong = etag[2:]
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(strong, etag)
+    assert etag_matches(f'"other", {strong}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_cache_control_from_remaining_freshness():
+    """Test max-age for fresh bodies and revalidation otherwise"""
+    assert cache_control(59.7) == "max-age=59"
+    assert cache_control(0.4) == "no-cache"
+    assert cache_control(-3) == "no-cache"
+    assert cache_control(None) == "no-cache"
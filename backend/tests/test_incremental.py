@@ -0,0 +1,126 @@
+"""
+Unit tests for incremental arbitrage maintenance
+"""
+import random
+
+from utils.incremental import IncrementalArbitrageEngine, QuoteUpdate
+from utils.matching import LineKey
+from utils.scanner import scan_three_way_market, scan_two_way_market
+
+H2H = LineKey("evt1", "h2h", None)
+
+
+def test_single_updates_emit_added_changed_removed():
+    """Test the lifecycle of one opportunity under quote updates"""
+    engine = IncrementalArbitrageEngine()
+    engine.apply([
+        QuoteUpdate(H2H, "DraftKings", "Lakers", 2.00),
+        QuoteUpdate(H2H, "DraftKings", "Celtics", 1.85),
+        QuoteUpdate(H2H, "FanDuel", "Lakers", 1.90),
+        QuoteUpdate(H2H, "FanDuel", "Celtics", 1.95)
+    ])
+    assert engine.opportunities() == []
+
+    added = engine.update(H2H, "DraftKings", "Lakers", 2.10)
+    assert len(added.added) == 1 and not added.removed and not added.changed
+    opp = added.added[0]
+    assert opp.books == ("DraftKings", "FanDuel")
+    assert opp.odds == (2.10, 1.95)
+
+    changed = engine.update(H2H, "FanDuel", "Celtics", 2.00)
+    assert [c.id for c in changed.changed] == [opp.id]
+    assert changed.changed[0].odds == (2.10, 2.00)
+
+    unchanged = engine.update(H2H, "FanDuel", "Celtics", 2.00)
+    assert not unchanged
+
+    removed = engine.update(H2H, "FanDuel", "Celtics", None)
+    assert [r.id for r in removed.removed] == [opp.id]
+    assert engine.opportunities() == []
+
+
+def test_sync_diffs_payload_indexes():
+    """Test that syncing successive indexes touches only what changed"""
+    totals = LineKey("evt1", "totals", 221.5)
+    first = {
+        H2H: {"DraftKings": {"Lakers": 2.10, "Celtics": 1.80}, "FanDuel": {"Lakers": 1.90, "Celtics": 1.95}},
+        totals: {"DraftKings": {"Over 221.5": 1.91, "Under 221.5": 1.91}}
+    }
+    engine = IncrementalArbitrageEngine()
+    assert len(engine.sync(first).added) == 1
+
+    second = {H2H: {"DraftKings": {"Lakers": 2.10, "Celtics": 1.80}, "FanDuel": {"Lakers": 1.90, "Celtics": 1.92}}}
+    assert engine.diff(second) == [
+        QuoteUpdate(H2H, "FanDuel", "Celtics", 1.92),
+        QuoteUpdate(totals, "DraftKings", "Over 221.5", None),
+        QuoteUpdate(totals, "DraftKings", "Under 221.5", None)
+    ]
+    changes = engine.sync(second)
+    assert len(changes.changed) == 1
+    assert len(engine) == 1
+
+
+def test_random_updates_match_full_rescan():
+    """Test that incremental state always equals scanning the market from scratch"""
+    rng = random.Random(16)
+    books = ["DraftKings", "FanDuel", "BetMGM", "Caesars", "ESPN BET"]
+    engine = IncrementalArbitrageEngine()
+    market = {}
+
+    for _ in range(2000):
+        book = rng.choice(books)
+        outcome = rng.choice(["Lakers", "Celtics"])
+        price = None if rng.random() < 0.1 else round(rng.uniform(1.8, 2.25), 2)
+        engine.update(H2H, book, outcome, price)
+
+        if price is None:
+            market.get(book, {}).pop(outcome, None)
+        else:
+            market.setdefault(book, {})[outcome] = price
+
+        quoted = {b: p for b, p in market.items() if p}
+        names = ["Lakers", "Celtics"]
+        expected = set()
+        if len(quoted) >= 2 and all(any(n in p for p in quoted.values()) for n in names):
+            expected = {
+                frozenset([(h.book_a, h.outcome_a, h.odds_a), (h.book_b, h.outcome_b, h.odds_b)])
+                for h in scan_two_way_market(quoted, names)
+            }
+        actual = {frozenset(zip(o.books, o.outcomes, o.odds)) for o in engine.opportunities()}
+        assert actual == expected
+
+
+def test_three_way_ladders_match_full_rescan():
+    """Test that ladder evaluation of a 1X2 market equals scanning it from scratch, legs in order"""
+    rng = random.Random(161)
+    books = ["DraftKings", "FanDuel", "BetMGM", "Caesars"]
+    names = ["Arsenal", "Draw", "Chelsea"]
+    line = LineKey("evt2", "h2h", None)
+    engine = IncrementalArbitrageEngine()
+    market = {}
+
+    for _ in range(1500):
+        book = rng.choice(books)
+        outcome = rng.choice(names)
+        price = None if rng.random() < 0.1 else round(rng.uniform(2.6, 3.9), 2)
+        if book not in market and price is not None:
+            # A new book quotes the full market in payload order
+            for name in names:
+                engine.update(line, book, name, price if name == outcome else 3.0)
+                market.setdefault(book, {})[name] = price if name == outcome else 3.0
+            continue
+        engine.update(line, book, outcome, price)
+        if price is None:
+            market.get(book, {}).pop(outcome, None)
+        else:
+            market.setdefault(book, {})[outcome] = price
+
+        # The engine ranks books in first-seen order (market's key order);
+        # a full scan lists outcomes in the order the books quote them
+        quoted = {b: p for b, p in market.items() if p}
+        order = list(dict.fromkeys(name for p in quoted.values() for name in p))
+        expected = []
+        if len(quoted) >= 2 and len(order) == 3:
+            expected = [(h.books, h.outcomes, h.odds) for h in scan_three_way_market(quoted, order)]
+        actual = [(o.books, o.outcomes, o.odds) for o in engine.opportunities()]
+        assert sorted(actual) == sorted(expected)
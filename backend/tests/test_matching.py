@@ -2,7 +2,15 @@
 Unit tests for market matching utilities
 """
 import pytest
-from utils.matching import same_market, get_market_identifier, is_valid_two_way_pairing
+from utils.matching import (
+    same_market,
+    get_market_identifier,
+    is_valid_two_way_pairing,
+    build_line_index,
+    signed_line,
+    LineKey
+)
+from utils.quotes import QuoteTable
 
 
 def test_same_market_h2h():
@@ -127,3 +135,84 @@ def test_spread_market_requires_exact_point_match():
     # Different spread = invalid
     assert is_valid_two_way_pairing(market1, "Dodgers", market3, "Phillies") is False
 
+
+
+def make_game(bookmakers):
+    return {
+        "id": "evt1",
+        "home_team": "Lakers",
+        "away_team": "Celtics",
+        "bookmakers": bookmakers
+    }
+
+
+def test_signed_line_spreads_use_home_perspective():
+    """Test that both sides of a spread map to the same line"""
+    assert signed_line("spreads", -3.5, True) == -3.5
+    assert signed_line("spreads", 3.5, False) == -3.5
+    assert signed_line("totals", 221.5, False) == 221.5
+    assert signed_line("spreads", float("nan"), True) is None
+    assert signed_line("h2h", float("nan"), True) is None
+
+
+def test_line_index_separates_books_on_different_lines():
+    """Test that spreads/totals on different points never share a bucket"""
+    game = make_game([
+        {"title": "DraftKings", "markets": [
+            {"key": "spreads", "outcomes": [
+                {"name": "Lakers", "price": 1.91, "point": -3.5},
+                {"name": "Celtics", "price": 1.91, "point": 3.5}
+            ]},
+            {"key": "totals", "outcomes": [
+                {"name": "Over", "price": 1.95, "point": 221.5},
+                {"name": "Under", "price": 1.87, "point": 221.5}
+            ]}
+        ]},
+        {"title": "FanDuel", "markets": [
+            {"key": "spreads", "outcomes": [
+                {"name": "Lakers", "price": 2.05, "point": -2.5},
+                {"name": "Celtics", "price": 1.80, "point": 2.5}
+            ]},
+            {"key": "totals", "outcomes": [
+                {"name": "Over", "price": 1.90, "point": 221.5},
+                {"name": "Under", "price": 1.92, "point": 221.5}
+            ]}
+        ]}
+    ])
+
+    index = build_line_index(QuoteTable().add_games([game], ["spreads", "totals"]))
+
+    assert index[LineKey("evt1", "spreads", -3.5)] == {
+        "DraftKings": {"Lakers -3.5": 1.91, "Celtics +3.5": 1.91}
+    }
+    assert index[LineKey("evt1", "spreads", -2.5)] == {
+        "FanDuel": {"Lakers -2.5": 2.05, "Celtics +2.5": 1.80}
+    }
+    assert index[LineKey("evt1", "totals", 221.5)] == {
+        "DraftKings": {"Over 221.5": 1.95, "Under 221.5": 1.87},
+        "FanDuel": {"Over 221.5": 1.90, "Under 221.5": 1.92}
+    }
+
+
+def test_line_index_h2h_and_book_filter():
+    """Test h2h buckets and bookmaker whitelisting"""
+    game = make_game([
+        {"title": "DraftKings", "markets": [
+            {"key": "h2h", "outcomes": [
+                {"name": "Lakers", "price": 2.10},
+                {"name": "Celtics", "price": 1.80}
+            ]}
+        ]},
+        {"title": "Offshore Book", "markets": [
+            {"key": "h2h", "outcomes": [
+                {"name": "Lakers", "price": 2.50},
+                {"name": "Celtics", "price": 1.60}
+            ]}
+        ]}
+    ])
+
+    index = build_line_index(QuoteTable().add_games([game], ["h2h"], allowed_books={"DraftKings"}))
+
+    assert index == {
+        LineKey("evt1", "h2h", None): {"DraftKings": {"Lakers": 2.10, "Celtics": 1.80}}
+    }
@@ -0,0 +1,196 @@
+"""
+Unit tests for cross-line middle detection
+"""
+import random
+
+from utils.arbitrage import validate_odds
+from utils.middles import (
+    OVER,
+    UNDER,
+    SideLadders,
+    SideQuote,
+    build_player_prop_ladders,
+    build_side_ladders,
+    find_middles,
+    side_threshold
+)
+from utils.quotes import QuoteTable
+
+
+def test_side_threshold_maps_spreads_to_home_margin():
+    """Test that spread sides become Over/Under on the home margin"""
+    assert side_threshold("spreads", "Lakers", -3.5, True) == (OVER, 3.5)
+    assert side_threshold("spreads", "Celtics", 5.5, False) == (UNDER, 5.5)
+    assert side_threshold("spreads", "Celtics", 0.0, False) == (UNDER, 0.0)
+    assert side_threshold("totals", "Under", 223.5, False) == (UNDER, 223.5)
+    assert side_threshold("totals", "Lakers", 223.5, True) is None
+    assert side_threshold("h2h", "Lakers", float("nan"), True) is None
+
+
+def test_build_side_ladders_keeps_two_best_books_per_line():
+    """Test ladder construction from an Odds API payload"""
+    game = {
+        "id": "evt1",
+        "home_team": "Lakers",
+        "away_team": "Celtics",
+        "bookmakers": [
+            {"title": "DraftKings", "markets": [
+                {"key": "totals", "outcomes": [
+                    {"name": "Over", "price": 1.91, "point": 221.5},
+                    {"name": "Under", "price": 1.91, "point": 221.5}
+                ]}
+            ]},
+            {"title": "FanDuel", "markets": [
+                {"key": "totals", "outcomes": [
+                    {"name": "Over", "price": 1.95, "point": 221.5},
+                    {"name": "Under", "price": 2.05, "point": 223.5}
+                ]}
+            ]}
+        ]
+    }
+
+    ladders = build_side_ladders(QuoteTable().add_games([game], ["totals"]))[("evt1", "totals")]
+
+    assert ladders.overs == [
+        SideQuote(221.5, 1.95, "FanDuel", "Over 221.5"),
+        SideQuote(221.5, 1.91, "DraftKings", "Over 221.5")
+    ]
+    assert ladders.unders == [
+        SideQuote(221.5, 1.91, "DraftKings", "Under 221.5"),
+        SideQuote(223.5, 2.05, "FanDuel", "Under 223.5")
+    ]
+
+
+def test_side_ladders_find_middle_behind_same_book_best_prices():
+    """Test that a middle against the runner-up book is found when one book leads both sides"""
+    def totals(title, over, under):
+        return {"title": title, "markets": [{"key": "totals", "outcomes": [
+            {"name": "Over", "price": over, "point": 221.5},
+            {"name": "Under", "price": under, "point": 223.5}
+        ]}]}
+
+    game = {
+        "id": "evt1",
+        "home_team": "Lakers",
+        "away_team": "Celtics",
+        "bookmakers": [
+            totals("BetMGM", 1.80, 1.85),
+            totals("DraftKings", 2.05, 2.05),
+            totals("FanDuel", 1.99, 1.90),
+            totals("DraftKings", 2.00, 2.00)
+        ]
+    }
+
+    ladders = build_side_ladders(QuoteTable().add_games([game], ["totals"]))[("evt1", "totals")]
+    hits = find_middles(ladders, best_per_pair=True)
+
+    # DraftKings has both best prices; FanDuel's Over 1.99 is the best cross-book leg
+    assert [(q.book, q.price) for q in ladders.overs] == [("DraftKings", 2.05), ("FanDuel", 1.99)]
+    assert len(hits) == 1
+    assert (hits[0].over.book, hits[0].under.book) == ("FanDuel", "DraftKings")
+    assert abs(hits[0].implied - (1 / 1.99 + 1 / 2.05)) < 1e-9
+
+
+def test_find_middles_totals():
+    """Test Over 221.5 at one book against Under 223.5 at another"""
+    ladders = SideLadders(
+        overs=[SideQuote(221.5, 2.02, "DraftKings", "Over 221.5")],
+        unders=[
+            SideQuote(220.5, 2.10, "FanDuel", "Under 220.5"),
+            SideQuote(223.5, 1.99, "FanDuel", "Under 223.5")
+        ]
+    )
+
+    hits = find_middles(ladders)
+
+    assert len(hits) == 1
+    assert hits[0].over.book == "DraftKings"
+    assert hits[0].under.threshold == 223.5
+    assert hits[0].implied < 1.0
+
+
+def test_find_middles_skips_same_book_and_same_line():
+    """Test that one book's own lines and same-line pairs are not middles"""
+    ladders = SideLadders(
+        overs=[SideQuote(221.5, 2.05, "DraftKings", "Over 221.5")],
+        unders=[
+            SideQuote(221.5, 2.05, "FanDuel", "Under 221.5"),
+            SideQuote(223.5, 2.05, "DraftKings", "Under 223.5")
+        ]
+    )
+
+    assert find_middles(ladders) == []
+
+
+def test_find_middles_matches_all_pairs():
+    """Test the sweep against checking every Over/Under pair"""
+    rng = random.Random(11)
+    books = ["DraftKings", "FanDuel", "BetMGM", "Caesars"]
+
+    for _ in range(200):
+        overs = sorted(
+            (SideQuote(t + 0.5, round(rng.uniform(1.7, 2.3), 2), rng.choice(books), f"Over {t + 0.5}")
+             for t in rng.sample(range(215, 230), 6)),
+            key=lambda q: q.threshold
+        )
+        unders = sorted(
+            (SideQuote(t + 0.5, round(rng.uniform(1.7, 2.3), 2), rng.choice(books), f"Under {t + 0.5}")
+             for t in rng.sample(range(215, 230), 6)),
+            key=lambda q: q.threshold
+        )
+        max_implied = rng.choice([0.98, 1.0, 1.03])
+
+        expected = {
+            (o, u) for o in overs for u in unders
+            if o.threshold < u.threshold and o.book != u.book
+            and 1 / o.price + 1 / u.price < max_implied
+            and validate_odds(o.price, u.price)["valid"]
+        }
+        hits = find_middles(SideLadders(overs, unders), max_implied=max_implied)
+
+        assert {(hit.over, hit.under) for hit in hits} == expected
+        assert [hit.implied for hit in hits] == sorted(hit.implied for hit in hits)
+
+
+def test_player_prop_ladders_pair_same_line_and_middles():
+    """Test that a player's quotes on 24.5 and 25.5 meet in one ladder"""
+    event = {
+        "bookmakers": [
+            {"title": "DraftKings", "markets": [
+                {"key": "player_points", "outcomes": [
+                    {"name": "Over", "description": "LeBron James", "price": 2.05, "point": 24.5},
+                    {"name": "Under", "description": "LeBron James", "price": 1.80, "point": 24.5}
+                ]}
+            ]},
+            {"title": "FanDuel", "markets": [
+                {"key": "player_points", "outcomes": [
+                    {"name": "Over", "description": "LeBron James", "price": 1.75, "point": 25.5},
+                    {"name": "Under", "description": "LeBron James", "price": 2.00, "point": 25.5}
+                ]}
+            ]},
+            {"title": "BetMGM", "markets": [
+                {"key": "player_points", "outcomes": [
+                    {"name": "Over", "description": "LeBron James", "price": 1.90, "point": 24.5},
+                    {"name": "Under", "description": "LeBron James", "price": 1.98, "point": 24.5}
+                ]}
+            ]}
+        ]
+    }
+
+    ladders = build_player_prop_ladders(QuoteTable().add_event_odds(event, ["player_points"]))
+    player_ladders = ladders[("LeBron James", "player_points")]
+
+    assert [q.book for q in player_ladders.overs] == ["DraftKings", "BetMGM", "FanDuel"]
+
+    pairs = {
+        (hit.over.book, hit.over.threshold, hit.under.book, hit.under.threshold)
+        for hit in find_middles(player_ladders, same_line=True)
+    }
+    assert pairs == {
+        ("DraftKings", 24.5, "BetMGM", 24.5),
+        ("DraftKings", 24.5, "FanDuel", 25.5)
+    }
+    assert find_middles(player_ladders) == [
+        hit for hit in find_middles(player_ladders, same_line=True)
+        if hit.under.threshold > hit.over.threshold
+    ]
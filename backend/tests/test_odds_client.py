@@ -0,0 +1,133 @@
+"""
+Unit tests for the async Odds API client against a local stub server
+"""
+import asyncio
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from utils.odds_client import OddsAPIClient
+
+
+class StubOddsHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for The Odds API"""
+    protocol_version = "HTTP/1.1"
+    fail_first = 0
+    calls = []
+
+    def do_GET(self):
+        StubOddsHandler.calls.append((self.path, self.client_address[1]))
+
+        if self.path.startswith("/v4/flaky") and StubOddsHandler.fail_first > 0:
+            StubOddsHandler.fail_first -= 1
+            self._send(503, b"{}")
+            return
+
+        if self.path.startswith("/v4/missing"):
+            self._send(404, b'{"message": "not found"}')
+            return
+
+        body = json.dumps([{"key": "basketball_nba"}]).encode()
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            self._send(200, gzip.compress(body), {"Content-Encoding": "gzip"})
+        else:
+            self._send(200, body)
+
+    def _send(self, status, body, extra_headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("x-requests-remaining", "499")
+        for key, value in (extra_headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    StubOddsHandler.calls = []
+    StubOddsHandler.fail_first = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOddsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v4"
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_decodes_gzip_and_sends_api_key(stub_server):
+    """Test that responses are gunzipped and the API key is attached"""
+    async def run():
+        client = OddsAPIClient(stub_server, api_key="secret")
+        try:
+            response = await client.get("/sports", params={"all": "true"})
+            return response
+        finally:
+            await client.aclose()
+
+    response = asyncio.run(run())
+
+    assert response.json() == [{"key": "basketball_nba"}]
+    assert response.headers["x-requests-remaining"] == "499"
+    path = StubOddsHandler.calls[0][0]
+    assert path.startswith("/v4/sports?")
+    assert "apiKey=secret" in path
+    assert "all=true" in path
+
+
+def test_connections_are_reused(stub_server):
+    """Test that sequential calls share one keep-alive connection"""
+    async def run():
+        client = OddsAPIClient(stub_server)
+        try:
+            for _ in range(3):
+                await client.get("/sports")
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+
+    client_ports = {port for _, port in StubOddsHandler.calls}
+    assert len(StubOddsHandler.calls) == 3
+    assert len(client_ports) == 1
+
+
+def test_retries_transient_errors(stub_server):
+    """Test that 5xx responses are retried with backoff"""
+    StubOddsHandler.fail_first = 2
+
+    async def run():
+        client = OddsAPIClient(stub_server, max_retries=2, backoff_base=0.001)
+        try:
+            return await client.get("/flaky")
+        finally:
+            await client.aclose()
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert len(StubOddsHandler.calls) == 3
+
+
+def test_non_retryable_error_raises(stub_server):
+    """Test that client errors surface immediately"""
+    async def run():
+        client = OddsAPIClient(stub_server, max_retries=3, backoff_base=0.001)
+        try:
+            await client.get("/missing")
+        finally:
+            await client.aclose()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(run())
+
+    assert len(StubOddsHandler.calls) == 1
@@ -0,0 +1,100 @@
+"""
+Unit tests for the shared scan worker pool
+"""
+import asyncio
+import sys
+import threading
+
+from utils.parallel import ScanPool
+from utils.records import merge_game_shards, scan_game_shard
+
+
+def scale(shard, factor):
+    return [value * factor for value in shard]
+
+
+def thread_name(_shard):
+    return threading.current_thread().name
+
+
+def app_imported(_shard):
+    return "app" in sys.modules
+
+
+def test_map_keeps_shard_order():
+    """Test that worker processes return results in shard order"""
+    pool = ScanPool(2)
+    try:
+        results = asyncio.run(pool.map(scale, [[1, 2], [3], [], [4, 5, 6]], 10))
+    finally:
+        pool.shutdown()
+
+    assert results == [[10, 20], [30], [], [40, 50, 60]]
+
+
+def test_imap_streams_in_order():
+    """Test that imap yields results in order while shards are still produced"""
+    async def shards():
+        for start in range(0, 20, 4):
+            await asyncio.sleep(0)
+            yield list(range(start, start + 4))
+
+    async def collect(pool):
+        return [result async for result in pool.imap(scale, shards(), 2)]
+
+    pool = ScanPool(2)
+    try:
+        results = asyncio.run(collect(pool))
+    finally:
+        pool.shutdown()
+
+    assert results == [[value * 2 for value in range(start, start + 4)] for start in range(0, 20, 4)]
+
+
+def test_single_worker_uses_thread():
+    """Test that one worker runs shards off the event loop without a process pool"""
+    pool = ScanPool(1)
+    names = asyncio.run(pool.map(thread_name, [None, None]))
+
+    assert not pool.parallel
+    assert pool._executor is None
+    assert all(name != threading.main_thread().name for name in names)
+
+
+def test_game_shards_scan_in_spawned_workers():
+    """Test that spawned workers scan shards without importing the app, merging like one shard"""
+    games = [
+        {
+            "id": f"evt{i}",
+            "sport_key": "basketball_nba",
+            "commence_time": "2030-01-01T00:00:00Z",
+            "home_team": f"Home{i}",
+            "away_team": f"Away{i}",
+            "bookmakers": [
+                {"title": "DraftKings", "markets": [{"key": "h2h", "outcomes": [
+                    {"name": f"Home{i}", "price": 2.10}, {"name": f"Away{i}", "price": 1.80}
+                ]}]},
+                {"title": "FanDuel" if i % 2 else "BetMGM", "markets": [{"key": "h2h", "outcomes": [
+                    {"name": f"Home{i}", "price": 1.80}, {"name": f"Away{i}", "price": 2.10 + 0.01 * i}
+                ]}]}
+            ]
+        }
+        for i in range(8)
+    ]
+
+    async def scan_then_check_imports(pool):
+        results = await pool.map(scan_game_shard, [games[:3], games[3:6], games[6:]], ["h2h"], 2, 1.0)
+        return results, await pool.map(app_imported, [None, None])
+
+    pool = ScanPool(2, start_method="spawn")
+    try:
+        results, imported = asyncio.run(scan_then_check_imports(pool))
+    finally:
+        pool.shutdown()
+    assert imported == [False, False]
+
+    records, counts = merge_game_shards(results, 2)
+    whole, whole_counts = scan_game_shard(games, ["h2h"], 2, 1.0)
+    assert [record["id"] for record in records] == [record["id"] for record in whole]
+    assert counts == whole_counts and sum(counts.values()) == 8
+    assert len(records) == 4
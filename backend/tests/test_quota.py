@@ -0,0 +1,152 @@
+"""
+Unit tests for quota tracking and quota-aware poll planning
+"""
+import asyncio
+from datetime import datetime, timezone
+
+from utils.quota import QuotaPlanner, QuotaTracker, degraded_keys, request_cost
+from utils.snapshot import OddsPoller, SnapshotStore, normalize_scan_key
+
+# 00:00 UTC on June 16th: 15 days until the monthly reset
+NOW = datetime(2025, 6, 16, tzinfo=timezone.utc).timestamp()
+
+
+def clock():
+    return NOW
+
+
+def make_planner(remaining, **kwargs):
+    tracker = QuotaTracker(clock=clock)
+    if remaining is not None:
+        tracker.record({"x-requests-remaining": str(remaining), "x-requests-used": "0"})
+    return QuotaPlanner(tracker, min_interval_seconds=60, max_interval_seconds=1800, reserve=50, clock=clock, **kwargs)
+
+
+def test_request_cost_is_markets_times_regions():
+    """Test the Odds API billing rule"""
+    assert request_cost(["h2h", "spreads"], ["us", "uk"]) == 4
+    assert request_cost([], ["us"]) == 1
+
+
+def test_tracker_persists_across_restarts(tmp_path):
+    """Test header parsing and that a new tracker resumes from disk"""
+    path = str(tmp_path / "quota.json")
+    tracker = QuotaTracker(path, clock=clock)
+    tracker.record({"content-type": "application/json"})
+    assert tracker.remaining is None
+
+    tracker.record({"x-requests-remaining": "480", "x-requests-used": "20", "x-requests-last": "3"})
+    tracker.flush()
+
+    restored = QuotaTracker(path, clock=clock)
+    assert restored.remaining == 480
+    assert restored.used == 20
+    assert restored.state.last_cost == 3
+
+
+def test_planner_without_quota_information_polls_at_minimum():
+    """Test that an unknown quota does not throttle"""
+    nba = normalize_scan_key("basketball_nba", "us", "h2h")
+    plans = make_planner(None).plan([nba])
+
+    assert plans[nba].interval_seconds == 60
+    assert not plans[nba].degraded
+
+
+def test_planner_favours_the_soonest_game():
+    """Test that a nearer game gets a shorter interval under a tight budget"""
+    soon = normalize_scan_key("basketball_nba", "us", "h2h")
+    later = normalize_scan_key("icehockey_nhl", "us", "h2h")
+    planner = make_planner(50 + 15 * 1500)
+    planner.observe_start(soon, "2025-06-16T01:00:00Z")
+    planner.observe_start(later, "2025-06-18T00:00:00Z")
+
+    plans = planner.plan([soon, later])
+
+    assert 60 <= plans[soon].interval_seconds < plans[later].interval_seconds
+    daily_spend = sum(86400 / plan.interval_seconds * plan.cost for plan in plans.values())
+    assert daily_spend <= 1500 + 1e-6
+
+
+def test_planner_never_plans_past_the_max_interval():
+    """Test that a budget too small even for the cheapest variant still polls at the cap"""
+    key = normalize_scan_key("basketball_nba", "us", "h2h,spreads")
+    plan = make_planner(400).plan([key])[key]
+
+    assert plan.scan_key.markets == "h2h"
+    assert plan.interval_seconds == 1800
+
+
+def test_planner_sheds_markets_before_slowing_down():
+    """Test degradation order and pausing at the reserve"""
+    key = normalize_scan_key("basketball_nba", "us,uk", "h2h,spreads,totals", include_player_props=True)
+    assert [(k.markets, k.include_player_props) for k in degraded_keys(key)] == [
+        ("h2h,spreads,totals", True),
+        ("h2h,spreads,totals", False),
+        ("h2h", False)
+    ]
+
+    plan = make_planner(50 + 15 * 100).plan([key])[key]
+    assert plan.scan_key.markets == "h2h"
+    assert plan.cost == 2
+    assert plan.interval_seconds <= 1800
+
+    assert make_planner(50).plan([key])[key].interval_seconds is None
+
+
+def test_planner_ignores_quota_from_before_the_reset():
+    """Test that a count saved last month is treated as unknown"""
+    tracker = QuotaTracker(clock=lambda: NOW - 30 * 86400)
+    tracker.record({"x-requests-remaining": "0"})
+
+    assert QuotaPlanner(tracker, clock=clock).daily_budget() is None
+
+
+def test_poller_publishes_degraded_scan_under_target_key():
+    """Test that poll_target scans the variant and learns its cost"""
+    key = normalize_scan_key("basketball_nba", "us", "h2h,spreads")
+    cheaper = key._replace(markets="h2h")
+    planner = make_planner(1000)
+    scanned = []
+
+    async def scan(scan_key):
+        scanned.append(scan_key)
+        planner.tracker.record({"x-requests-remaining": "999", "x-requests-used": "1", "x-requests-last": "1"})
+        return {"arbitrages": [], "next_commence_time": "2025-06-16T02:00:00Z"}
+
+    store = SnapshotStore()
+    poller = OddsPoller([key], scan, store, planner=planner)
+    assert asyncio.run(poller.poll_target(key, cheaper))
+
+    assert scanned == [cheaper]
+    assert store.get(key).data["scanned_markets"] == "h2h"
+    assert planner.estimate_cost(cheaper) == 1
+    assert planner.urgency(key, NOW) == 1 / 2
+
+
+def test_poll_cost_excludes_concurrent_requests():
+    """Test that credits spent by other requests during a poll are not charged to it"""
+    key = normalize_scan_key("basketball_nba", "us", "h2h")
+    planner = make_planner(1000)
+    tracker = planner.tracker
+
+    async def fetch(cost, used, delay=0.0):
+        await asyncio.sleep(delay)
+        tracker.record({"x-requests-remaining": str(1000 - used), "x-requests-used": str(used), "x-requests-last": str(cost)})
+
+    async def scan(scan_key):
+        # The scan's own fetch runs in a task it starts
+        await asyncio.gather(fetch(1, 1))
+        await asyncio.sleep(0.01)
+        return {"arbitrages": []}
+
+    async def poll_alongside_on_demand_scans():
+        poller = OddsPoller([key], scan, SnapshotStore(), planner=planner)
+        on_demand = [asyncio.create_task(fetch(3, 4 + 3 * i, 0.005)) for i in range(3)]
+        assert await poller.poll_target(key)
+        await asyncio.gather(*on_demand)
+
+    asyncio.run(poll_alongside_on_demand_scans())
+
+    assert tracker.used == 10
+    assert planner.estimate_cost(key) == 1
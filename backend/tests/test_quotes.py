@@ -0,0 +1,94 @@
+"""
+Unit tests for the columnar quote table
+"""
+import math
+
+from utils.quotes import NO_ID, Interner, QuoteTable, parse_timestamp
+
+
+def test_interner_assigns_dense_ids():
+    """Test that names get stable IDs in first-seen order"""
+    books = Interner()
+
+    assert books("DraftKings") == 0
+    assert books("FanDuel") == 1
+    assert books("DraftKings") == 0
+    assert books.get("BetMGM") is None
+    assert books.names == ["DraftKings", "FanDuel"]
+    assert len(books) == 2
+
+
+def test_add_games_flattens_payload_into_rows():
+    """Test one row per quote with interned IDs, filters applied at ingest"""
+    game = {
+        "id": "evt1",
+        "home_team": "Lakers",
+        "away_team": "Celtics",
+        "bookmakers": [
+            {"title": "DraftKings", "last_update": "2024-01-01T00:00:00Z", "markets": [
+                {"key": "spreads", "outcomes": [
+                    {"name": "Lakers", "price": 1.91, "point": -3.5},
+                    {"name": "Celtics", "price": 1.91, "point": 3.5}
+                ]},
+                {"key": "h2h", "outcomes": [
+                    {"name": "Lakers", "price": 1.50},
+                    {"name": "Celtics", "price": None}
+                ]},
+                {"key": "player_points", "outcomes": [
+                    {"name": "Over", "price": 1.90, "point": 24.5}
+                ]}
+            ]},
+            {"title": "Offshore Book", "markets": [
+                {"key": "h2h", "outcomes": [
+                    {"name": "Lakers", "price": 2.50}
+                ]}
+            ]}
+        ]
+    }
+
+    quotes = QuoteTable().add_games([game], ["h2h", "spreads"], allowed_books={"DraftKings"})
+
+    assert len(quotes) == 3
+    assert quotes.events.names == ["evt1"]
+    assert quotes.books.names == ["DraftKings"]
+    assert quotes.outcomes.names[quotes.event_home[0]] == "Lakers"
+    assert list(quotes.price) == [1.91, 1.91, 1.50]
+    assert list(quotes.point[:2]) == [-3.5, 3.5]
+    assert math.isnan(quotes.point[2])
+    assert set(quotes.player) == {NO_ID}
+    assert set(quotes.last_update) == {parse_timestamp("2024-01-01T00:00:00Z")}
+    assert quotes.nbytes() == 3 * (5 * quotes.event.itemsize + 3 * quotes.price.itemsize)
+
+
+def test_add_event_odds_interns_players():
+    """Test that prop quotes carry a player and nameless outcomes are skipped"""
+    event = {
+        "id": "evt1",
+        "bookmakers": [
+            {"title": "FanDuel", "markets": [
+                {"key": "player_points", "outcomes": [
+                    {"name": "Over", "description": "LeBron James", "price": 1.90, "point": 24.5},
+                    {"name": "Under", "player_name": "LeBron James", "price": 1.90, "point": 24.5},
+                    {"name": "Over", "price": 1.90, "point": 9.5}
+                ]}
+            ]}
+        ]
+    }
+
+    quotes = QuoteTable().add_event_odds(event, ["player_points"])
+
+    assert len(quotes) == 2
+    assert quotes.players.names == ["LeBron James"]
+    assert list(quotes.player) == [0, 0]
+    assert math.isnan(quotes.last_update[0])
+    assert quotes.prices() == {
+        ("player_points", "LeBron James", "FanDuel", "Over", 24.5): 1.90,
+        ("player_points", "LeBron James", "FanDuel", "Under", 24.5): 1.90
+    }
+
+
+def test_parse_timestamp_handles_bad_input():
+    """Test that missing or malformed timestamps become NaN"""
+    assert parse_timestamp("1970-01-01T00:01:00Z") == 60.0
+    assert math.isnan(parse_timestamp(None))
+    assert math.isnan(parse_timestamp("yesterday"))
@@ -0,0 +1,177 @@
+"""
+Unit tests for market scan engines
+"""
+import itertools
+import random
+
+from utils.arbitrage import calculate_arbitrage_two_way, calculate_arbitrage_three_way
+from utils.scanner import best_prices, evaluate_two_way, scan_two_way_market, scan_three_way_market
+
+
+def brute_force_two_way(market_odds, outcome_names):
+    """Reference: every book pair and outcome ordering"""
+    books = list(market_odds)
+    hits = set()
+    for i, book1 in enumerate(books):
+        for book2 in books[i + 1:]:
+            for outcome_a in outcome_names:
+                for outcome_b in outcome_names:
+                    if outcome_a == outcome_b:
+                        continue
+                    odds_a = market_odds[book1].get(outcome_a)
+                    odds_b = market_odds[book2].get(outcome_b)
+                    if not (odds_a and odds_b):
+                        continue
+                    arb = calculate_arbitrage_two_way(odds_a, odds_b, validate=True)
+                    if arb["validation"]["valid"] and arb["exists"]:
+                        hits.add((book1, outcome_a, odds_a, book2, outcome_b, odds_b))
+    return hits
+
+
+def test_best_prices():
+    """Test single-pass best price per outcome"""
+    market = {
+        "DraftKings": {"Lakers": 2.05, "Celtics": 1.80},
+        "FanDuel": {"Lakers": 1.95, "Celtics": 1.92},
+        "BetMGM": {"Lakers": 2.10}
+    }
+
+    best = best_prices(market, ["Lakers", "Celtics"])
+
+    assert best["Lakers"] == (2.10, "BetMGM")
+    assert best["Celtics"] == (1.92, "FanDuel")
+
+
+def test_two_way_no_arbitrage_exits_early():
+    """Test that a normal vig market returns nothing"""
+    market = {
+        "DraftKings": {"Over": 1.91, "Under": 1.91},
+        "FanDuel": {"Over": 1.87, "Under": 1.95},
+        "BetMGM": {"Over": 1.90, "Under": 1.92}
+    }
+
+    assert scan_two_way_market(market, ["Over", "Under"]) == []
+
+
+def test_two_way_same_book_is_not_an_arbitrage():
+    """Test that both best prices at one book do not produce a hit"""
+    market = {
+        "DraftKings": {"Over": 2.10, "Under": 2.05},
+        "FanDuel": {"Over": 1.80, "Under": 1.80}
+    }
+
+    assert scan_two_way_market(market, ["Over", "Under"]) == []
+
+
+def test_two_way_orientation_and_ranking():
+    """Test that hits follow bookmaker order and come best first"""
+    market = {
+        "DraftKings": {"Lakers": 2.08, "Celtics": 1.80},
+        "FanDuel": {"Lakers": 1.85, "Celtics": 2.06},
+        "BetMGM": {"Lakers": 1.90, "Celtics": 2.02}
+    }
+
+    hits = scan_two_way_market(market, ["Lakers", "Celtics"])
+
+    assert [(h.book_a, h.outcome_a, h.book_b, h.outcome_b) for h in hits] == [
+        ("DraftKings", "Lakers", "FanDuel", "Celtics"),
+        ("DraftKings", "Lakers", "BetMGM", "Celtics")
+    ]
+    assert hits[0].arb["profit_percentage"] > hits[1].arb["profit_percentage"]
+
+
+def test_two_way_matches_brute_force():
+    """Test that the best-first scan finds exactly the all-pairs hits"""
+    rng = random.Random(7)
+    for _ in range(300):
+        books = [f"Book{i}" for i in range(rng.randint(2, 12))]
+        market = {}
+        for book in books:
+            prices = {}
+            for name in ("Home", "Away"):
+                if rng.random() < 0.9:
+                    prices[name] = round(rng.uniform(1.6, 2.4), 2)
+            market[book] = prices
+
+        hits = scan_two_way_market(market, ["Home", "Away"])
+        found = {(h.book_a, h.outcome_a, h.odds_a, h.book_b, h.outcome_b, h.odds_b) for h in hits}
+
+        assert found == brute_force_two_way(market, ["Home", "Away"])
+        assert len(found) == len(hits)
+        profits = [h.arb["profit_percentage"] for h in hits]
+        assert profits == sorted(profits, reverse=True)
+
+
+def test_evaluate_two_way_matches_scalar_result():
+    """Test that evaluated hits carry calculate_arbitrage_two_way's numbers"""
+    rng = random.Random(11)
+    candidates = [
+        ("A", "Home", round(rng.uniform(1.01, 16.0), 2), "B", "Away", round(rng.uniform(1.01, 16.0), 2))
+        for _ in range(2000)
+    ]
+    for validate in (True, False):
+        for candidate, hit in zip(candidates, evaluate_two_way(candidates, validate)):
+            arb = calculate_arbitrage_two_way(candidate[2], candidate[5], validate=validate)
+            assert (hit is not None) == arb["exists"]
+            if hit:
+                assert hit.arb["profit_percentage"] == arb["profit_percentage"]
+                assert hit.arb["warning"]["level"] == arb["warning"]["level"]
+
+
+def test_three_way_finds_draw_at_first_book():
+    """Test permutations the old i<j<k triple loop could never produce"""
+    market = {
+        "Bet365": {"Home": 2.40, "Draw": 3.90, "Away": 2.90},
+        "Unibet": {"Home": 2.80, "Draw": 3.30, "Away": 2.60},
+        "William Hill": {"Home": 2.50, "Draw": 3.20, "Away": 3.40}
+    }
+
+    hits = scan_three_way_market(market, ["Home", "Draw", "Away"])
+
+    assert hits[0].books == ("Unibet", "Bet365", "William Hill")
+    assert hits[0].odds == (2.80, 3.90, 3.40)
+    assert hits[0].outcomes == ("Home", "Draw", "Away")
+
+
+def test_three_way_allows_two_outcomes_from_one_book():
+    """Test that one book can supply two legs, but not all three"""
+    market = {
+        "Bet365": {"Home": 2.90, "Draw": 3.80, "Away": 2.20},
+        "Unibet": {"Home": 2.10, "Draw": 2.50, "Away": 3.50}
+    }
+
+    hits = scan_three_way_market(market, ["Home", "Draw", "Away"])
+
+    assert [h.books for h in hits] == [("Bet365", "Bet365", "Unibet")]
+
+
+def test_three_way_matches_brute_force():
+    """Test that best-first enumeration finds every profitable assignment"""
+    rng = random.Random(11)
+    names = ["Home", "Draw", "Away"]
+    for _ in range(200):
+        books = [f"Book{i}" for i in range(rng.randint(2, 7))]
+        market = {
+            book: {
+                "Home": round(rng.uniform(2.2, 3.1), 2),
+                "Draw": round(rng.uniform(3.0, 3.9), 2),
+                "Away": round(rng.uniform(2.2, 3.1), 2)
+            }
+            for book in books
+        }
+
+        expected = set()
+        for assignment in itertools.product(books, repeat=3):
+            if len(set(assignment)) == 1:
+                continue
+            odds = tuple(market[book][name] for book, name in zip(assignment, names))
+            arb = calculate_arbitrage_three_way(*odds, validate=True)
+            if arb["validation"]["valid"] and arb["exists"]:
+                expected.add(assignment)
+
+        hits = scan_three_way_market(market, names)
+
+        assert {h.books for h in hits} == expected
+        assert len(hits) == len(expected)
+        profits = [h.arb["profit_percentage"] for h in hits]
+        assert profits == sorted(profits, reverse=True)
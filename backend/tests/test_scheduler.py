@@ -0,0 +1,78 @@
+"""
+Unit tests for adaptive per-event refresh scheduling
+"""
+from datetime import datetime, timezone
+
+from utils.scheduler import EventScheduler
+
+NOW = datetime(2025, 6, 16, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_scheduler(clock=None):
+    return EventScheduler(base_interval_seconds=60, max_interval_seconds=1800, clock=clock or FakeClock())
+
+
+def test_interval_grows_with_time_to_start():
+    """Test that near events refresh often and far ones rarely"""
+    scheduler = make_scheduler()
+
+    assert scheduler.interval("a", "2025-06-16T12:30:00Z", NOW) == 60
+    assert scheduler.interval("a", "2025-06-16T15:00:00Z", NOW) == 120
+    assert scheduler.interval("a", "2025-06-17T06:00:00Z", NOW) == 300
+    assert scheduler.interval("a", "2025-06-25T12:00:00Z", NOW) == 1800
+    assert scheduler.interval("a", "", NOW) == 1800
+
+
+def test_price_movement_shortens_interval():
+    """Test that volatility is measured between fetches and speeds refreshes up"""
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+    far = "2025-06-17T06:00:00Z"
+
+    scheduler.observe("quiet", {"q": 2.0})
+    scheduler.observe("moving", {"q": 2.0})
+    clock.now += 60
+    scheduler.observe("quiet", {"q": 2.0})
+    scheduler.observe("moving", {"q": 2.5})
+
+    assert scheduler.volatility("quiet") == 0
+    assert abs(scheduler.volatility("moving") - 0.1) < 1e-9
+    assert scheduler.interval("quiet", far, NOW) == 300
+    assert scheduler.interval("moving", far, NOW) == 60
+
+
+def test_rank_puts_unseen_then_most_overdue_first():
+    """Test refresh ordering across fetched and never-fetched events"""
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+    scheduler.observe("soon", {})
+    scheduler.observe("later", {})
+    clock.now += 100
+
+    ranked = scheduler.rank([
+        ("later", "2025-06-17T06:00:00Z"),
+        ("soon", "2025-06-16T12:30:00Z"),
+        ("new", "2025-06-20T00:00:00Z")
+    ], NOW)
+
+    assert [event.event_id for event in ranked] == ["new", "soon", "later"]
+    assert [event.due for event in ranked] == [True, True, False]
+    assert ranked[1].age_seconds == 100
+
+
+def test_observed_events_are_bounded():
+    """Test that the oldest events are forgotten past max_events"""
+    scheduler = EventScheduler(max_events=2, clock=FakeClock())
+    for event_id in ("a", "b", "c"):
+        scheduler.observe(event_id, {})
+
+    assert len(scheduler) == 2
+    assert scheduler.age("a") is None
@@ -0,0 +1,173 @@
+"""
+Unit tests for scan snapshots and the background poller
+"""
+import asyncio
+
+import pytest
+
+from utils.snapshot import (
+    OddsPoller,
+    SnapshotStore,
+    decode_cursor,
+    encode_cursor,
+    normalize_scan_key,
+    parse_poll_targets
+)
+
+
+def test_normalize_scan_key_is_order_insensitive():
+    """Test that equivalent queries map to the same key"""
+    key1 = normalize_scan_key("basketball_nba", "us,us2", "h2h,spreads")
+    key2 = normalize_scan_key("basketball_nba", "us2, us", " spreads,h2h,h2h")
+
+    assert key1 == key2
+    assert key1.markets == "h2h,spreads"
+
+    # Different flags are different scans
+    assert normalize_scan_key("basketball_nba", "us", "h2h", include_live=True) != \
+        normalize_scan_key("basketball_nba", "us", "h2h")
+
+
+def test_parse_poll_targets():
+    """Test parsing of the POLL_TARGETS configuration string"""
+    targets = parse_poll_targets("basketball_nba:h2h,totals:us; soccer_epl::uk:props ;")
+
+    assert len(targets) == 2
+    assert targets[0] == normalize_scan_key("basketball_nba", "us", "h2h,totals")
+    assert targets[1].sport == "soccer_epl"
+    assert targets[1].markets == "h2h"
+    assert targets[1].regions == "uk"
+    assert targets[1].include_player_props is True
+
+    assert parse_poll_targets("") == []
+
+
+def test_snapshot_store_versions_and_max_age():
+    """Test that snapshots are versioned and stale ones are ignored"""
+    store = SnapshotStore()
+    key = normalize_scan_key("basketball_nba")
+
+    first = store.publish(key, {"arbitrages": []})
+    second = store.publish(key, {"arbitrages": [{"profit_percentage": 1.0}]})
+
+    assert second.version == first.version + 1
+    assert store.get(key) is second
+    assert store.version == second.version
+
+    second.created_at -= 100
+    assert store.get(key, max_age_seconds=60) is None
+    assert store.get(key, max_age_seconds=600) is second
+
+
+def test_poller_publishes_and_survives_errors():
+    """Test that one failing target does not block the others"""
+    good = normalize_scan_key("basketball_nba")
+    bad = normalize_scan_key("icehockey_nhl")
+
+    async def scan(key):
+        if key == bad:
+            raise RuntimeError("upstream down")
+        return {"arbitrages": [], "sport": key.sport}
+
+    store = SnapshotStore()
+    poller = OddsPoller([bad, good], scan, store, interval_seconds=60)
+    asyncio.run(poller.poll_once())
+
+    assert store.get(good).data["sport"] == "basketball_nba"
+    assert store.get(bad) is None
+    assert "upstream down" in poller.last_error
+
+
+def test_poller_start_and_stop():
+    """Test that the poller runs in the background until stopped"""
+    key = normalize_scan_key("basketball_nba")
+    scans = []
+
+    async def scan(k):
+        scans.append(k)
+        return {"arbitrages": []}
+
+    async def run():
+        store = SnapshotStore()
+        poller = OddsPoller([key], scan, store, interval_seconds=0.01)
+        poller.start()
+        await asyncio.sleep(0.05)
+        assert poller.running
+        await poller.stop()
+        assert not poller.running
+        return store
+
+    store = asyncio.run(run())
+    assert len(scans) >= 2
+    assert store.get(key) is not None
+
+
+def test_snapshot_history_by_version():
+    """Test that non-current snapshots are kept for paging and bounded"""
+    store = SnapshotStore(history_size=2)
+    key = normalize_scan_key("basketball_nba")
+
+    first = store.publish(key, {"arbitrages": [1]}, current=False)
+    assert store.get(key) is None
+    assert store.get_version(first.version) is first
+
+    store.publish(key, {"arbitrages": [2]})
+    store.publish(key, {"arbitrages": [3]})
+    assert store.get_version(first.version) is None
+    assert store.get(key).data == {"arbitrages": [3]}
+
+
+def test_snapshot_history_is_per_key_and_age_bound(monkeypatch):
+    """Test that one key's scans cannot evict another's, and replaced snapshots expire"""
+    clock = [1000.0]
+    monkeypatch.setattr("utils.snapshot.time.time", lambda: clock[0])
+    store = SnapshotStore(history_size=2, history_seconds=60)
+    polled = normalize_scan_key("basketball_nba")
+    other = normalize_scan_key("soccer_epl")
+
+    current = store.publish(polled, {"arbitrages": [1]})
+    for _ in range(10):
+        store.publish(other, {"arbitrages": []}, current=False)
+
+    # The current snapshot stays readable however old it gets
+    clock[0] += 3600
+    assert store.get_version(current.version) is current
+    assert store.readable_for(current.version) is None
+
+    replacement = store.publish(polled, {"arbitrages": [2]})
+    clock[0] += 30
+    assert store.get_version(current.version) is current
+    assert store.readable_for(current.version) == 30
+    clock[0] += 31
+    assert store.get_version(current.version) is None
+    assert store.get_version(replacement.version) is replacement
+
+
+def test_wait_returns_the_next_current_snapshot():
+    """Test that waiters wake on a publish for their key and time out otherwise"""
+    store = SnapshotStore()
+    nba = normalize_scan_key("basketball_nba")
+    nhl = normalize_scan_key("icehockey_nhl")
+
+    async def run():
+        waiter = asyncio.create_task(store.wait(nba, 0, timeout=1))
+        await asyncio.sleep(0)
+        store.publish(nhl, {"arbitrages": []})
+        store.publish(nba, {"arbitrages": []}, current=False)
+        published = store.publish(nba, {"arbitrages": [1]})
+        assert await waiter is published
+
+        # Already newer than the caller's version: no wait
+        assert await store.wait(nba, 0) is published
+        assert await store.wait(nba, published.version, timeout=0.01) is None
+
+    asyncio.run(run())
+
+
+def test_cursor_round_trip():
+    """Test cursor encoding and rejection of malformed cursors"""
+    assert decode_cursor(encode_cursor(42, 120)) == (42, 120)
+
+    for bad in ("", "not-a-cursor", encode_cursor(0, 5)):
+        with pytest.raises(ValueError):
+            decode_cursor(bad)
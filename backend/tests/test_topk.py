@@ -0,0 +1,69 @@
+"""
+Unit tests for bounded top-K selection
+"""
+import random
+
+from utils.topk import GroupedTopK, merge_top_k, TopK
+
+
+def test_topk_matches_stable_sort():
+    """Test that TopK equals a stable descending sort truncated to K"""
+    rng = random.Random(15)
+    items = [{"id": i, "profit": rng.choice([0.5, 1.0, 1.5, 2.0, 2.5])} for i in range(500)]
+
+    for k in (1, 20, 499, 500, 1000):
+        top = TopK(k, key=lambda item: item["profit"])
+        top.extend(items)
+
+        expected = sorted(items, key=lambda item: item["profit"], reverse=True)[:k]
+        assert top.sorted() == expected
+        assert len(top) == min(k, len(items))
+        assert top.pushed == len(items)
+        assert top.truncated == (k < len(items))
+
+
+def test_topk_unbounded():
+    """Test that k=None keeps everything"""
+    top = TopK(None, key=lambda value: value)
+    top.extend([3, 1, 2])
+
+    assert top.sorted() == [3, 2, 1]
+    assert not top.truncated
+
+
+def test_merge_top_k_matches_global_sort():
+    """Test that merging per-shard top-K runs equals top-K over all items"""
+    rng = random.Random(25)
+    items = [{"id": i, "profit": rng.randint(0, 40) / 10} for i in range(600)]
+    shards = [items[start:start + 70] for start in range(0, len(items), 70)]
+
+    for k in (1, 25, 600, None):
+        runs = []
+        for shard in shards:
+            top = TopK(k, key=lambda item: item["profit"])
+            top.extend(shard)
+            runs.append(top.sorted())
+
+        merged = merge_top_k(runs, k, key=lambda item: item["profit"])
+        expected = sorted(items, key=lambda item: item["profit"], reverse=True)[:k]
+        assert [item["profit"] for item in merged] == [item["profit"] for item in expected]
+
+
+def test_grouped_topk_filters_whole_groups_exactly():
+    """Test that filtering kept items by group matches filtering before truncation"""
+    rng = random.Random(18)
+    items = [{"id": i, "books": rng.choice("AB BC AC ABC".split()), "profit": rng.randint(0, 30) / 10} for i in range(400)]
+    top = GroupedTopK(10, key=lambda item: item["profit"], group=lambda item: item["books"])
+    top.extend(items)
+
+    kept = top.sorted()
+    for allowed in ("AB", "BC", "ABC"):
+        def fits(item):
+            return set(item["books"]) <= set(allowed)
+
+        expected = sorted((item for item in items if fits(item)), key=lambda item: item["profit"], reverse=True)[:10]
+        assert [item for item in kept if fits(item)][:10] == expected
+
+    assert top.pushed == 400
+    assert sum(top.counts().values()) == 400
+    assert len(top) == 40
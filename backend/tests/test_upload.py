@@ -0,0 +1,76 @@
+"""
+Unit tests for incremental parsing of uploaded odds files
+"""
+import io
+import json
+
+import pytest
+
+from utils.upload import batched, check_game, iter_csv_games, iter_json_games
+
+GAMES = [
+    {"match": "A vs B", "bookmakers": [{"name": "DraftKings", "home": 2.1, "away": 1.8}]},
+    {"match": "C vs D", "bookmakers": [{"name": "FanDuel", "home": 1.95, "away": 1.95}]}
+]
+
+
+def test_json_games_across_chunk_boundaries():
+    """Test that values split between reads are reassembled, other keys skipped"""
+    text = json.dumps({"meta": {"rows": 12345, "note": "x"}, "games": GAMES, "trailer": [1, 2]}, indent=1)
+
+    for chunk_size in (1, 7, 64, 1 << 16):
+        assert list(iter_json_games(io.StringIO(text), chunk_size=chunk_size)) == GAMES
+
+    assert list(iter_json_games(io.StringIO(json.dumps(GAMES)), chunk_size=5)) == GAMES
+    assert list(iter_json_games(io.StringIO('{"games": []}'))) == []
+    assert list(iter_json_games(io.StringIO('{"other": 1}'))) == []
+
+
+def test_json_games_rejects_malformed_input():
+    """Test that truncated or invalid documents raise ValueError"""
+    for text in ('{"games": [{"match": "A"}', '{"games": [1 2]}', "", "nope"):
+        with pytest.raises(ValueError):
+            list(iter_json_games(io.StringIO(text), chunk_size=4))
+
+
+def test_json_games_fail_fast_on_malformed_values():
+    """Test that a malformed game raises without reading the rest of the upload"""
+    text = '{"games": [{"match": "A" "sport": "B"}, ' + ", ".join(['{"match": "C"}'] * 10000) + "]}"
+    stream = io.StringIO(text)
+
+    with pytest.raises(ValueError):
+        list(iter_json_games(stream, chunk_size=64))
+    assert stream.tell() <= 256
+
+
+def test_check_game_rejects_wrong_shapes():
+    """Test that games and bookmakers the scan cannot read raise ValueError"""
+    assert check_game(GAMES[0], 0) is GAMES[0]
+    assert check_game({"match": "A", "bookmakers": [{"name": "FanDuel", "home": "2.1"}]}, 0)
+
+    for game in (["A vs B"], {"bookmakers": {"name": "FanDuel"}}, {"bookmakers": ["FanDuel"]},
+                 {"bookmakers": [{"name": ["FanDuel"]}]}, {"bookmakers": [{"name": "FanDuel", "home": [2.1]}]}):
+        with pytest.raises(ValueError, match="Game 3"):
+            check_game(game, 3)
+
+
+def test_csv_games_group_consecutive_rows():
+    """Test one game per run of rows, with alternate column names"""
+    text = (
+        "match,sport,date,sportsbook,odds1,odds2\n"
+        '"A vs B, late",NBA,2025-10-15,DraftKings,2.10,1.80\n'
+        '"A vs B, late",NBA,2025-10-15,FanDuel,1.95,1.95\n'
+        "C vs D,NHL,2025-10-16,BetMGM,2.00,\n"
+    )
+
+    games = list(iter_csv_games(io.StringIO(text)))
+
+    assert [game["match"] for game in games] == ["A vs B, late", "C vs D"]
+    assert games[0]["bookmakers"][1] == {"name": "FanDuel", "home": "1.95", "away": "1.95"}
+    assert games[1]["bookmakers"] == [{"name": "BetMGM", "home": "2.00", "away": None}]
+
+
+def test_batched():
+    """Test fixed-size batches with a short final batch"""
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(batched([], 3)) == []
@@ -2,10 +2,18 @@
 Arbitrage calculation utilities for sports betting
 Enhanced with validation, sanity checks, and warning systems
 """
-from typing import Dict, List, Tuple, Union, Optional
+from typing import Dict, List, Sequence, Tuple, Union, Optional
 from datetime import datetime, timedelta
 import re
 
+import numpy as np
+
+# Sanity bounds shared by validate_odds and the batch evaluators
+MIN_ODDS = 1.01
+MAX_ODDS = 15.0
+MIN_IMPLIED_SUM = 0.80
+MAX_IMPLIED_SUM = 1.10
+
 
 def is_arbitrage(o1: float, o2: float) -> bool:
     """
@@ -133,9 +141,6 @@ def validate_odds(odds_a: float, odds_b: float, odds_c: Optional[float] = None)
         Dictionary with validation results
     """
     # Check odds range (realistic bounds)
-    MIN_ODDS = 1.01
-    MAX_ODDS = 15.0
-    
     all_odds = [odds_a, odds_b]
     if odds_c is not None:
         all_odds.append(odds_c)
@@ -156,7 +161,7 @@ def validate_odds(odds_a: float, odds_b: float, odds_c: Optional[float] = None)
     # Normal markets: 0.97 - 1.10 (with bookmaker margin)
     # Arbitrage: < 1.0
     # Too low: likely data error
-    if implied_sum < 0.80:
+    if implied_sum < MIN_IMPLIED_SUM:
         return {
             "valid": False,
             "error": f"Implied probability sum too low ({implied_sum:.3f}). Likely stale or mismatched odds.",
@@ -164,7 +169,7 @@ def validate_odds(odds_a: float, odds_b: float, odds_c: Optional[float] = None)
             "implied_sum": implied_sum
         }
     
-    if implied_sum > 1.10:
+    if implied_sum > MAX_IMPLIED_SUM:
         return {
             "valid": False,
             "error": f"Implied probability sum too high ({implied_sum:.3f}). Check for data errors.",
@@ -242,6 +247,40 @@ def get_warning_level(roi: float) -> Dict[str, str]:
         }
 
 
+def check_arbitrage_two_way(
+    odds_a: float,
+    odds_b: float,
+    validate: bool = True
+) -> Optional[Tuple[float, float]]:
+    """
+    Fast predicate for two-way arbitrage
+
+    Rejects non-arbs with one implied-probability sum and no allocations,
+    so callers that evaluate many pairs can build the full
+    calculate_arbitrage_two_way result only for hits.
+
+    Args:
+        odds_a: Decimal odds for outcome A
+        odds_b: Decimal odds for outcome B
+        validate: Apply the validate_odds range and implied-sum rules
+
+    Returns:
+        (implied_probability, profit_percentage) if a valid arbitrage
+        exists, otherwise None
+    """
+    implied_prob = 1 / odds_a + 1 / odds_b
+    if implied_prob >= 1.0:
+        return None
+    # An arbitrage is always under MAX_IMPLIED_SUM, so only the low bound matters
+    if validate and not (
+        MIN_ODDS <= odds_a <= MAX_ODDS
+        and MIN_ODDS <= odds_b <= MAX_ODDS
+        and implied_prob >= MIN_IMPLIED_SUM
+    ):
+        return None
+    return implied_prob, (1 / implied_prob - 1) * 100
+
+
 def calculate_arbitrage_two_way(
     odds_a: float, 
     odds_b: float,
@@ -427,7 +466,217 @@ def calculate_stakes(*odds: float, total_stake: float = 1000) -> Dict[str, float
         }
     
     else:
-        raise ValueError("Stakes calculation supports only 2-way or 3-way markets")
+        raise ValueError("Stakes calculation supports only 2-way or 3-way markets (use calculate_stakes_n_way)")
+
+
+def implied_sums(odds: np.ndarray) -> np.ndarray:
+    """
+    Implied probability sum per row
+
+    Args:
+        odds: Decimal odds, shape [n, k] (one k-outcome combination per row)
+
+    Returns:
+        Array of shape [n]
+    """
+    return (1.0 / np.asarray(odds, dtype=float)).sum(axis=1)
+
+
+def validate_odds_batch(odds: np.ndarray) -> np.ndarray:
+    """
+    Vectorized validate_odds: same range and implied-sum rules for every row
+
+    Args:
+        odds: Decimal odds, shape [n, k]
+
+    Returns:
+        Boolean mask of shape [n], True where the row passes validate_odds
+    """
+    odds = np.asarray(odds, dtype=float)
+    implied = implied_sums(odds)
+    in_range = ((odds >= MIN_ODDS) & (odds <= MAX_ODDS)).all(axis=1)
+    return in_range & (implied >= MIN_IMPLIED_SUM) & (implied <= MAX_IMPLIED_SUM)
+
+
+def calculate_arbitrage_batch(odds: np.ndarray, validate: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Vectorized calculate_arbitrage_two_way / calculate_arbitrage_three_way
+
+    Args:
+        odds: Decimal odds, shape [n, k]
+        validate: Apply validate_odds rules (invalid rows never exist)
+
+    Returns:
+        Dictionary of arrays of shape [n]: implied_probability, valid,
+        exists and profit_percentage (0 where no arbitrage, rounded to 4
+        decimals like the scalar functions)
+    """
+    odds = np.asarray(odds, dtype=float)
+    implied = implied_sums(odds)
+    valid = validate_odds_batch(odds) if validate else np.ones(len(odds), dtype=bool)
+    exists = valid & (implied < 1.0)
+
+    with np.errstate(divide="ignore"):
+        profit = np.where(exists, (1.0 / implied - 1.0) * 100, 0.0)
+
+    return {
+        "implied_probability": implied,
+        "valid": valid,
+        "exists": exists,
+        "profit_percentage": np.round(profit, 4)
+    }
+
+
+def calculate_stakes_batch(odds: np.ndarray, total_stake: float = 1000) -> Dict[str, np.ndarray]:
+    """
+    Vectorized calculate_stakes for any number of outcomes
+
+    Args:
+        odds: Decimal odds, shape [n, k]
+        total_stake: Total amount to bet per row
+
+    Returns:
+        Dictionary with stakes and returns (shape [n, k]) and profit
+        (shape [n]), rounded to cents
+    """
+    odds = np.asarray(odds, dtype=float)
+    inverse = 1.0 / odds
+    stakes = inverse / inverse.sum(axis=1, keepdims=True) * total_stake
+    returns = stakes * odds
+    return {
+        "stakes": np.round(stakes, 2),
+        "returns": np.round(returns, 2),
+        "profit": np.round(returns.min(axis=1) - total_stake, 2)
+    }
+
+
+def validate_odds_n_way(odds: Sequence[float], max_odds: float = 1000.0) -> Dict[str, Union[bool, str, float]]:
+    """
+    Validate odds for a market with any number of outcomes
+    
+    Outright and futures prices routinely exceed the 15.0 cap used for
+    two/three-way markets, so the upper bound is configurable. Only the
+    lower implied-sum bound is checked: a wide field legitimately carries
+    a large overround.
+    
+    Args:
+        odds: Decimal odds, one per outcome
+        max_odds: Highest plausible price
+    
+    Returns:
+        Dictionary with validation results
+    """
+    for o in odds:
+        if not (MIN_ODDS <= o <= max_odds):
+            return {
+                "valid": False,
+                "error": f"Odds {o} outside valid range [{MIN_ODDS}, {max_odds}]",
+                "warning_level": "critical"
+            }
+    
+    implied_sum = sum(1/o for o in odds)
+    
+    if implied_sum < MIN_IMPLIED_SUM:
+        return {
+            "valid": False,
+            "error": f"Implied probability sum too low ({implied_sum:.3f}). Likely stale or mismatched odds.",
+            "warning_level": "critical",
+            "implied_sum": implied_sum
+        }
+    
+    return {
+        "valid": True,
+        "implied_sum": implied_sum,
+        "warning_level": "none"
+    }
+
+
+def find_n_way_arbitrage(
+    market_odds: Dict[str, Dict[str, float]],
+    outcome_names: Optional[Sequence[str]] = None,
+    validate: bool = True
+) -> Optional[Dict]:
+    """
+    Detect arbitrage in a market with any number of outcomes
+    
+    One pass over books x outcomes keeps the best price (argmax) per
+    outcome; arbitrage exists if the sum of the best inverse prices is
+    below 1. Cost is linear in books x outcomes, so a 100+ runner outright
+    scans in well under a millisecond.
+    
+    Args:
+        market_odds: {bookmaker: {outcome: decimal_odds}}
+        outcome_names: Outcomes that must all be covered
+            (defaults to every outcome any bookmaker prices)
+        validate: Apply validate_odds_n_way to the best prices
+    
+    Returns:
+        Dictionary with the best book/odds per outcome, implied probability,
+        profit percentage and warning, or None if no arbitrage exists
+    """
+    best: Dict[str, Tuple[float, str]] = {}
+    for book, prices in market_odds.items():
+        for outcome, price in prices.items():
+            if price and (outcome not in best or price > best[outcome][0]):
+                best[outcome] = (price, book)
+    
+    names = list(outcome_names) if outcome_names is not None else list(best)
+    if len(names) < 2 or any(name not in best for name in names):
+        return None
+    
+    odds = [best[name][0] for name in names]
+    implied_prob = sum(1/o for o in odds)
+    if implied_prob >= 1.0:
+        return None
+    
+    books = [best[name][1] for name in names]
+    if len(set(books)) == 1:
+        # Every leg at one book is a pricing error, not an arbitrage
+        return None
+    
+    validation = validate_odds_n_way(odds) if validate else {"valid": True}
+    if not validation["valid"]:
+        return None
+    
+    profit_pct = ((1 / implied_prob) - 1) * 100
+    
+    return {
+        "outcomes": names,
+        "books": books,
+        "odds": odds,
+        "implied_probability": round(implied_prob, 6),
+        "profit_percentage": round(profit_pct, 4),
+        "validation": validation,
+        "warning": get_warning_level(profit_pct)
+    }
+
+
+def calculate_stakes_n_way(odds: Sequence[float], total_stake: float = 1000) -> Dict[str, Union[float, List[float]]]:
+    """
+    Calculate stake distribution for any number of outcomes
+    
+    Each stake is proportional to the inverse of its odds, normalized
+    before rounding, so every outcome returns the same amount.
+    
+    Args:
+        odds: Decimal odds, one per outcome
+        total_stake: Total amount to bet
+    
+    Returns:
+        Dictionary with per-outcome stakes and returns plus guaranteed profit
+    """
+    inverse = [1/o for o in odds]
+    total_inv = sum(inverse)
+    
+    stakes = [(inv / total_inv) * total_stake for inv in inverse]
+    returns = [stake * o for stake, o in zip(stakes, odds)]
+    profit = min(returns) - total_stake
+    
+    return {
+        "stakes": [round(stake, 2) for stake in stakes],
+        "returns": [round(ret, 2) for ret in returns],
+        "profit": round(profit, 2)
+    }
 
 
 def normalize_odds_data(raw_data: List[Dict]) -> List[Dict]:
@@ -490,9 +739,10 @@ def find_best_arbitrage_combinations(games_data: List[Dict]) -> List[Dict]:
                     odds_a = book1["home"]
                     odds_b = book2["away"]
                     
-                    arb = calculate_arbitrage_two_way(odds_a, odds_b)
+                    hit = check_arbitrage_two_way(odds_a, odds_b)
                     
-                    if arb["exists"]:
+                    if hit:
+                        arb = calculate_arbitrage_two_way(odds_a, odds_b)
                         stakes = calculate_stakes(odds_a, odds_b)
                         
                         arbitrages.append({
@@ -0,0 +1,99 @@
+"""
+Bookmaker IDs and bitmask selection
+
+Each supported bookmaker gets a fixed bit, so "does this opportunity only
+use books the user has accounts at" is one AND against a precomputed mask
+instead of string set lookups per leg.
+"""
+from typing import Iterable, List, Optional
+
+
+class BookRegistry:
+    """
+    Fixed, ordered set of bookmakers; book i is bit 1 << i
+
+    Supports `in` like the set of titles it replaces.
+    """
+    __slots__ = ("names", "_bits", "_by_lower", "all_mask")
+
+    def __init__(self, names: Iterable[str]):
+        self.names = tuple(dict.fromkeys(names))
+        self._bits = {name: 1 << i for i, name in enumerate(self.names)}
+        self._by_lower = {name.lower(): name for name in self.names}
+        self.all_mask = (1 << len(self.names)) - 1
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._bits
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def bit(self, name: str) -> int:
+        """Bit for a bookmaker title (0 if unsupported)"""
+        return self._bits.get(name, 0)
+
+    def mask(self, names: Iterable[str]) -> int:
+        """OR of the bits of the given titles; unsupported titles add nothing"""
+        mask = 0
+        for name in names:
+            mask |= self._bits.get(name, 0)
+        return mask
+
+    def names_in(self, mask: int) -> List[str]:
+        """Titles whose bits are set, in registry order"""
+        return [name for name, bit in self._bits.items() if mask & bit]
+
+    def parse(self, spec: Optional[str]) -> int:
+        """
+        Parse a comma-separated, case-insensitive list of titles into a mask
+
+        Args:
+            spec: e.g. "DraftKings,fanduel"; None or blank selects every book
+
+        Returns:
+            Selection mask
+
+        Raises:
+            ValueError: If a title is not a supported bookmaker
+        """
+        if spec is None or not spec.strip():
+            return self.all_mask
+
+        mask = 0
+        unknown = []
+        for raw in spec.split(","):
+            name = raw.strip()
+            if not name:
+                continue
+            title = self._by_lower.get(name.lower())
+            if title is None:
+                unknown.append(name)
+            else:
+                mask |= self._bits[title]
+
+        if unknown:
+            raise ValueError(f"Unknown bookmaker(s): {', '.join(unknown)}. Supported: {', '.join(self.names)}")
+        if not mask:
+            return self.all_mask
+        return mask
+
+
+def within(mask: int, selection: int) -> bool:
+    """True if every book in mask is also in selection"""
+    return not mask & ~selection
+
+
+# Whitelist: Only include these major regulated US sportsbooks.
+# Each book has a fixed bit so per-request selections (books=) are masks.
+ALLOWED_SPORTSBOOKS = BookRegistry([
+    'DraftKings',
+    'FanDuel',
+    'ESPN BET',
+    'Bally Bet',
+    'BetMGM',
+    'Caesars Sportsbook',
+    'Fanatics Sportsbook'
+])
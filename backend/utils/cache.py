@@ -0,0 +1,206 @@
+"""
+Bounded in-memory cache with TTL expiry, LRU eviction, stale-while-revalidate
+and hit/miss metrics
+"""
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+@dataclass
+class CacheConfig:
+    """
+    Limits for a TTLCache
+
+    Entries are fresh for `ttl_seconds`. With `max_stale_seconds` > 0 they
+    are kept for that much longer and can still be served (flagged stale)
+    while the caller refreshes them; past that hard bound they are gone.
+    """
+    ttl_seconds: float = 120.0
+    max_entries: int = 512
+    max_bytes: int = 64 * 1024 * 1024
+    max_stale_seconds: float = 0.0
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    size: int
+    stored_at: float
+
+
+@dataclass
+class CacheLookup:
+    """Result of TTLCache.lookup"""
+    value: Any
+    age_seconds: float
+    stale: bool
+
+
+class TTLCache:
+    """
+    LRU cache bounded by entry count and total payload size
+
+    Entries older than `ttl_seconds` are misses for `get`; `lookup` can still
+    return them (flagged stale) until `ttl_seconds + max_stale_seconds`, after
+    which they are dropped on access. When either size bound is exceeded the
+    least recently used entries are evicted. Sizes are supplied by the
+    caller (e.g. the length of the raw response body) so no deep size
+    estimation is needed.
+    """
+
+    def __init__(self, config: Optional[CacheConfig] = None, clock: Callable[[], float] = time.monotonic):
+        self.config = config or CacheConfig()
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and not self._expired(entry)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a fresh value and mark it most recently used
+
+        Args:
+            key: Cache key
+            default: Returned on miss, expiry or when only a stale copy exists
+
+        Returns:
+            Cached value or default
+        """
+        entry = self._find(key)
+        if entry is None or self._age(entry) >= self.config.ttl_seconds:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        return entry.value
+
+    def lookup(self, key: Hashable) -> Optional[CacheLookup]:
+        """
+        Get a fresh or stale entry along with its age
+
+        Stale entries (past the TTL but within max_stale_seconds) are
+        returned with `stale=True` so the caller can serve them immediately
+        and refresh in the background.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            CacheLookup or None on miss/hard expiry
+        """
+        entry = self._find(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        age = self._age(entry)
+        stale = age >= self.config.ttl_seconds
+        if stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        return CacheLookup(value=entry.value, age_seconds=age, stale=stale)
+
+    def set(self, key: Hashable, value: Any, size: int = 0) -> None:
+        """
+        Store a value, evicting least recently used entries to fit
+
+        Args:
+            key: Cache key
+            value: Value to store
+            size: Approximate size in bytes counted against max_bytes
+        """
+        if key in self._entries:
+            self._remove(key)
+
+        # A single value larger than the whole budget is not worth caching
+        if self.config.max_bytes and size > self.config.max_bytes:
+            return
+
+        self._entries[key] = CacheEntry(value=value, size=size, stored_at=self._clock())
+        self._bytes += size
+        self._evict()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._remove(key)
+        return entry.value
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry; returns how many were removed"""
+        expired = [key for key, entry in self._entries.items() if self._expired(entry)]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and current usage for monitoring"""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_hits": self.stale_hits,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "config": asdict(self.config)
+        }
+
+    def _find(self, key: Hashable) -> Optional[CacheEntry]:
+        """Entry within the hard expiry bound, marked most recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry):
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _age(self, entry: CacheEntry) -> float:
+        return self._clock() - entry.stored_at
+
+    def _expired(self, entry: CacheEntry) -> bool:
+        return self._age(entry) >= self.config.ttl_seconds + self.config.max_stale_seconds
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _evict(self) -> None:
+        max_entries = self.config.max_entries
+        max_bytes = self.config.max_bytes
+        while self._entries and (
+            (max_entries and len(self._entries) > max_entries)
+            or (max_bytes and self._bytes > max_bytes)
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
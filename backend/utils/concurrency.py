@@ -0,0 +1,107 @@
+"""
+Asyncio helpers for fanning out upstream calls
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+async def gather_bounded(
+    factories: Sequence[Callable[[], Awaitable[T]]],
+    limit: int,
+    deadline: Optional[float] = None
+) -> List[Optional[T]]:
+    """
+    Run coroutine factories concurrently with bounded parallelism
+
+    At most `limit` coroutines run at once. Anything still pending when the
+    deadline passes is cancelled. Failed, cancelled and timed-out calls yield
+    None so results stay aligned with the input order.
+
+    Args:
+        factories: Zero-argument callables returning awaitables
+        limit: Maximum number of calls in flight
+        deadline: Overall time budget in seconds (None waits for all)
+
+    Returns:
+        Results in input order, None where a call did not complete
+    """
+    if not factories:
+        return []
+
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(factory: Callable[[], Awaitable[T]]) -> T:
+        async with semaphore:
+            return await factory()
+
+    tasks = [asyncio.ensure_future(run(factory)) for factory in factories]
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    results: List[Optional[T]] = []
+    for task in tasks:
+        if task in done and not task.cancelled() and task.exception() is None:
+            results.append(task.result())
+        else:
+            results.append(None)
+    return results
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one computation
+
+    The first caller for a key starts the work; callers arriving while it is
+    in flight await the same result (or exception). Nothing is cached once
+    the call completes.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._in_flight
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `factory()` once per key among concurrent callers
+
+        Args:
+            key: Hashable identity of the computation
+            factory: Zero-argument callable returning an awaitable
+
+        Returns:
+            The shared result
+        """
+        # Shield so one caller disconnecting does not cancel the shared work
+        return await asyncio.shield(self.start(key, factory))
+
+    def start(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> asyncio.Future:
+        """
+        Start `factory()` for key unless it is already running
+
+        Useful for fire-and-forget background refreshes; the returned future
+        can be awaited later or ignored.
+        """
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done, key=key: self._forget(key, done))
+        return future
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        if not future.cancelled():
+            # Mark the exception as retrieved even if every caller went away
+            future.exception()
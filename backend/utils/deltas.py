@@ -0,0 +1,95 @@
+"""
+Opportunity deltas between scan results, for clients that keep their own copy
+
+Records are matched by their "id" (stable while an opportunity's market and
+legs stay the same), so a client holding the previous result only needs
+what was added, removed or repriced.
+"""
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+# Fields rewritten on every scan that do not make an opportunity "changed"
+VOLATILE_FIELDS = frozenset({"timestamp", "odds_age_seconds"})
+
+
+def stable_id(identity: Any) -> str:
+    """Short hex digest of a repr-able identity tuple"""
+    return hashlib.blake2b(repr(identity).encode(), digest_size=8).hexdigest()
+
+
+def _content(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: value for name, value in record.items() if name not in VOLATILE_FIELDS}
+
+
+@dataclass
+class RecordDelta:
+    """Records added or changed (in full) and removed (by id)"""
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    changed: List[Dict[str, Any]] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"added": self.added, "changed": self.changed, "removed": self.removed}
+
+
+class RecordView:
+    """
+    The records one client currently holds, by id
+
+    `update` replaces the view with a newer result and returns the delta
+    that brings the client from the old view to the new one.
+    """
+    __slots__ = ("_records",)
+
+    def __init__(self, records: Iterable[Dict[str, Any]] = ()):
+        self._records: Dict[str, Dict[str, Any]] = {record["id"]: record for record in records}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def update(self, records: Iterable[Dict[str, Any]]) -> RecordDelta:
+        """
+        Diff against a newer result and adopt it
+
+        Args:
+            records: Full new result (each record carrying an "id")
+
+        Returns:
+            RecordDelta from the previous view to `records`
+        """
+        delta = RecordDelta()
+        current: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            record_id = record["id"]
+            current[record_id] = record
+            previous = self._records.get(record_id)
+            if previous is None:
+                delta.added.append(record)
+            elif _content(previous) != _content(record):
+                delta.changed.append(record)
+        delta.removed.extend(record_id for record_id in self._records if record_id not in current)
+        self._records = current
+        return delta
+
+
+def sse_message(event: Optional[str] = None, data: Any = None, event_id: Optional[int] = None) -> str:
+    """
+    Format one Server-Sent Events message
+
+    A message with only an id is not dispatched by EventSource but still
+    moves its Last-Event-ID forward, so a client that saw nothing change
+    resumes from the latest version.
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    if data is not None:
+        lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
@@ -0,0 +1,135 @@
+"""
+Response formats for opportunity lists: rows, columnar JSON and MessagePack
+
+Row JSON repeats every key (and the same match, sport and bookmaker
+strings) in every record. The columnar layout writes each key once with
+an array of values, and string columns with repeats are dictionary
+encoded. MessagePack carries the columnar layout in binary. orjson and
+msgpack are optional: without orjson the standard library encoder is
+used, and without msgpack that format is not offered.
+"""
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encoding
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional: MessagePack responses
+    msgpack = None
+
+ROWS = "json"
+COLUMNAR = "columnar"
+MSGPACK = "msgpack"
+
+MEDIA_TYPES = {
+    ROWS: "application/json",
+    COLUMNAR: "application/vnd.arbitrage.columnar+json",
+    MSGPACK: "application/msgpack"
+}
+# Other media types clients use for the same formats
+MEDIA_TYPE_ALIASES = {"application/x-msgpack": MSGPACK, "application/*": ROWS, "*/*": ROWS}
+
+
+def available_formats() -> List[str]:
+    return [fmt for fmt in MEDIA_TYPES if fmt != MSGPACK or msgpack is not None]
+
+
+def negotiate_format(accept: Optional[str], requested: Optional[str] = None) -> str:
+    """
+    Pick a response format
+
+    An explicit `requested` format (e.g. a format= query parameter) wins;
+    otherwise the Accept header's highest-q supported media type; otherwise
+    row JSON (also when Accept names nothing this server can produce).
+
+    Raises:
+        ValueError: If the requested format is unknown or unavailable
+    """
+    formats = available_formats()
+    if requested:
+        fmt = requested.strip().lower()
+        if fmt not in formats:
+            raise ValueError(f"Unsupported format {requested!r}; use one of {', '.join(formats)}")
+        return fmt
+    if not accept:
+        return ROWS
+
+    by_media_type = {media_type: fmt for fmt, media_type in MEDIA_TYPES.items()}
+    by_media_type.update(MEDIA_TYPE_ALIASES)
+    choices = []
+    for position, item in enumerate(accept.split(",")):
+        media_type, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        fmt = by_media_type.get(media_type.lower())
+        if fmt in formats and quality > 0:
+            choices.append((-quality, position, fmt))
+    return min(choices)[2] if choices else ROWS
+
+
+def to_columnar(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Columnar layout of a list of records
+
+    Returns:
+        {"count": n, "columns": {key: [value per record]},
+         "dictionaries": {key: [distinct strings]}}. Keys appear in
+        first-seen order; a record without a key has None in that column.
+        Columns listed in "dictionaries" hold indices into it (None stays
+        None); a column is encoded when it holds only strings, at most
+        half of them distinct.
+    """
+    records = list(records)
+    columns: Dict[str, List[Any]] = {}
+    for row, record in enumerate(records):
+        for key, value in record.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [None] * len(records)
+            column[row] = value
+
+    dictionaries: Dict[str, List[str]] = {}
+    for key, column in columns.items():
+        if not all(value is None or isinstance(value, str) for value in column):
+            continue
+        codes: Dict[str, int] = {}
+        for value in column:
+            if value is not None and value not in codes:
+                codes[value] = len(codes)
+        if not codes or len(codes) * 2 > len(column):
+            continue
+        dictionaries[key] = list(codes)
+        columns[key] = [None if value is None else codes[value] for value in column]
+
+    return {"count": len(records), "columns": columns, "dictionaries": dictionaries}
+
+
+def dumps_json(data: Any) -> bytes:
+    """Serialize to compact JSON, with orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def render(result: Dict[str, Any], fmt: str, records_field: str = "arbitrages") -> bytes:
+    """
+    Serialize a response body in `fmt`
+
+    For the columnar formats, result[records_field] is replaced by its
+    columnar layout and "format" names the layout.
+    """
+    if fmt == ROWS:
+        return dumps_json(result)
+    body = {**result, records_field: to_columnar(result[records_field]), "format": COLUMNAR}
+    if fmt == MSGPACK:
+        return msgpack.packb(body)
+    return dumps_json(body)
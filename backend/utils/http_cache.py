@@ -0,0 +1,52 @@
+"""
+HTTP validators and freshness for conditional GETs (ETag / If-None-Match)
+"""
+from typing import Any, Optional
+
+from utils.deltas import stable_id
+
+
+def make_etag(*parts: Any, weak: bool = True) -> str:
+    """
+    Entity tag derived from everything that determines a response body
+
+    Weak by default: bodies with the same tag are equivalent but may differ
+    in incidental fields (e.g. snapshot_age_seconds).
+    """
+    tag = f'"{stable_id(parts)}"'
+    return f"W/{tag}" if weak else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches `etag` (weak comparison)
+
+    Args:
+        if_none_match: Raw header value (None if absent)
+        etag: Current entity tag
+
+    Returns:
+        True if the client's copy is current and a 304 can be sent
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+
+def cache_control(max_age_seconds: Optional[float]) -> str:
+    """
+    Cache-Control value for a body that stays valid for `max_age_seconds`
+
+    None (or no time left) asks clients to revalidate on every use, which
+    with an ETag costs a 304 rather than a full body.
+    """
+    if max_age_seconds is None or max_age_seconds < 1:
+        return "no-cache"
+    return f"max-age={int(max_age_seconds)}"
@@ -0,0 +1,293 @@
+"""
+Incremental arbitrage maintenance from per-quote price updates
+
+Instead of rescanning every market on each refresh, the engine keeps per
+market state and re-evaluates only markets whose quotes changed, emitting
+the opportunities that were added, removed or changed.
+"""
+import bisect
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from utils.arbitrage import find_n_way_arbitrage
+from utils.matching import LineKey
+from utils.scanner import (
+    Ladder,
+    MarketOdds,
+    evaluate_three_way,
+    evaluate_two_way,
+    ladder_three_way_candidates,
+    ladder_two_way_candidates
+)
+
+
+class QuoteUpdate(NamedTuple):
+    """New price for one quote; price None removes the quote"""
+    line: LineKey
+    book: str
+    outcome: str
+    price: Optional[float]
+
+
+class Opportunity(NamedTuple):
+    """
+    One arbitrage within one market
+
+    `id` depends only on the market, books and outcomes, so it stays the
+    same while prices move and the combination remains profitable.
+    """
+    id: str
+    line: LineKey
+    books: Tuple[str, ...]
+    outcomes: Tuple[str, ...]
+    odds: Tuple[float, ...]
+    arb: Dict[str, Any]
+
+
+@dataclass
+class ArbitrageChanges:
+    """Opportunities that appeared, disappeared or changed price"""
+    added: List[Opportunity] = field(default_factory=list)
+    removed: List[Opportunity] = field(default_factory=list)
+    changed: List[Opportunity] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def extend(self, other: "ArbitrageChanges") -> None:
+        self.added.extend(other.added)
+        self.removed.extend(other.removed)
+        self.changed.extend(other.changed)
+
+    def counts(self) -> Dict[str, int]:
+        return {"added": len(self.added), "removed": len(self.removed), "changed": len(self.changed)}
+
+
+def opportunity_id(line: LineKey, books: Tuple[str, ...], outcomes: Tuple[str, ...]) -> str:
+    """Stable short identifier for an opportunity's market and legs (in any leg order)"""
+    identity = repr((tuple(line), sorted(zip(books, outcomes)))).encode()
+    return hashlib.blake2b(identity, digest_size=8).hexdigest()
+
+
+class MarketState:
+    """
+    Quotes for one market (event, market key, line)
+
+    `odds` mirrors the {bookmaker: {outcome: price}} shape the scanners
+    take. Each outcome also has a Ladder of (-price, book rank, book) kept
+    sorted with bisect, so the best price per outcome is always at index 0.
+    Evaluation walks the ladders directly: a repriced quote costs an
+    O(log B) search plus the list shift to move it, and re-evaluating the
+    market costs O(outcomes) when the best prices rule out an arbitrage,
+    otherwise O(hits log hits). Only quotes appearing or disappearing
+    reorder the outcomes, which is O(B log B).
+    """
+    __slots__ = ("line", "odds", "ladders", "opportunities", "_outcome_names")
+
+    def __init__(self, line: LineKey):
+        self.line = line
+        self.odds: MarketOdds = {}
+        self.ladders: Dict[str, Ladder] = {}
+        self.opportunities: Dict[str, Opportunity] = {}
+        self._outcome_names: Optional[List[str]] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.odds)
+
+    def update(self, book: str, outcome: str, price: Optional[float], rank: int) -> bool:
+        """
+        Apply one quote update
+
+        Args:
+            book: Bookmaker
+            outcome: Outcome label
+            price: New decimal price, None to remove the quote
+            rank: The bookmaker's stable position (ties go to the lower rank)
+
+        Returns:
+            True if the market's quotes changed
+        """
+        prices = self.odds.get(book)
+        old = prices.get(outcome) if prices else None
+        if old == price:
+            return False
+        if old is None or price is None:
+            self._outcome_names = None
+
+        ladder = self.ladders.setdefault(outcome, [])
+        if old is not None:
+            del ladder[bisect.bisect_left(ladder, (-old, rank, book))]
+
+        if price is None:
+            del prices[outcome]
+            if not prices:
+                del self.odds[book]
+            if not ladder:
+                del self.ladders[outcome]
+        else:
+            bisect.insort(ladder, (-price, rank, book))
+            # Repriced in place, so outcomes keep the order the book quotes them in
+            self.odds.setdefault(book, {})[outcome] = price
+        return True
+
+    def may_have_arbitrage(self) -> bool:
+        """Cheap necessary condition: best prices across books imply under 100%"""
+        if len(self.odds) < 2 or len(self.ladders) < 2:
+            return False
+        # Ladder entries are (-price, rank, book), so the best price is -ladder[0][0]
+        return sum(-1 / ladder[0][0] for ladder in self.ladders.values()) < 1.0
+
+    def outcome_names(self, book_rank: Dict[str, int]) -> List[str]:
+        """Outcomes in the order a full scan of this market lists them (cached)"""
+        if self._outcome_names is None:
+            books = sorted(self.odds, key=book_rank.__getitem__)
+            self._outcome_names = list(dict.fromkeys(name for book in books for name in self.odds[book]))
+        return self._outcome_names
+
+    def evaluate(self, book_rank: Dict[str, int]) -> Dict[str, Opportunity]:
+        """
+        Current opportunities, as a full scan of the market would find them
+
+        Args:
+            book_rank: Stable bookmaker order, so legs are oriented the same
+                way on every refresh regardless of update arrival order
+        """
+        if not self.may_have_arbitrage():
+            return {}
+
+        outcome_names = self.outcome_names(book_rank)
+        ladders = [self.ladders[name] for name in outcome_names]
+        found: List[Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[float, ...], Dict[str, Any]]] = []
+
+        if len(outcome_names) == 2:
+            hits = [hit for hit in evaluate_two_way(ladder_two_way_candidates(outcome_names, ladders)) if hit]
+            hits.sort(key=lambda hit: hit.arb["profit_percentage"], reverse=True)
+            for hit in hits:
+                found.append(((hit.book_a, hit.book_b), (hit.outcome_a, hit.outcome_b), (hit.odds_a, hit.odds_b), hit.arb))
+        elif len(outcome_names) == 3:
+            hits = [hit for hit in evaluate_three_way(ladder_three_way_candidates(outcome_names, ladders)) if hit]
+            hits.sort(key=lambda hit: hit.arb["profit_percentage"], reverse=True)
+            for hit in hits:
+                found.append((hit.books, hit.outcomes, hit.odds, hit.arb))
+        else:
+            market_odds = {book: self.odds[book] for book in sorted(self.odds, key=book_rank.__getitem__)}
+            arb = find_n_way_arbitrage(market_odds)
+            if arb:
+                found.append((tuple(arb["books"]), tuple(arb["outcomes"]), tuple(arb["odds"]), arb))
+
+        opportunities = {}
+        for books, outcomes, odds, arb in found:
+            opp_id = opportunity_id(self.line, books, outcomes)
+            opportunities[opp_id] = Opportunity(opp_id, self.line, books, outcomes, odds, arb)
+        return opportunities
+
+
+class IncrementalArbitrageEngine:
+    """
+    Maintains arbitrage opportunities across many markets under quote updates
+
+    Updates are applied to their market's state, then each touched market
+    is re-evaluated once from its price ladders. Markets whose best prices
+    cannot form an arbitrage (the common case) are settled by the
+    best-price check; for the rest only the profitable combinations are
+    walked.
+    """
+
+    def __init__(self):
+        self._markets: Dict[LineKey, MarketState] = {}
+        # Bookmakers in first-seen order
+        self._book_rank: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._markets)
+
+    def apply(self, updates: Iterable[QuoteUpdate]) -> ArbitrageChanges:
+        """
+        Apply quote updates and re-evaluate the affected markets
+
+        Args:
+            updates: Quote updates in any order
+
+        Returns:
+            Opportunity changes caused by the updates
+        """
+        touched: Dict[LineKey, None] = {}
+        for update in updates:
+            state = self._markets.get(update.line)
+            if state is None:
+                if update.price is None:
+                    continue
+                state = self._markets[update.line] = MarketState(update.line)
+            rank = self._book_rank.setdefault(update.book, len(self._book_rank))
+            if state.update(update.book, update.outcome, update.price, rank):
+                touched[update.line] = None
+
+        changes = ArbitrageChanges()
+        for line in touched:
+            changes.extend(self._reevaluate(line))
+        return changes
+
+    def update(self, line: LineKey, book: str, outcome: str, price: Optional[float]) -> ArbitrageChanges:
+        """Apply a single quote update"""
+        return self.apply([QuoteUpdate(line, book, outcome, price)])
+
+    def diff(self, index: Dict[LineKey, MarketOdds]) -> List[QuoteUpdate]:
+        """
+        Quote updates that turn the current state into `index`
+
+        Args:
+            index: Full snapshot as built by build_line_index
+
+        Returns:
+            Updates for new, repriced and vanished quotes
+        """
+        updates: List[QuoteUpdate] = []
+
+        for line, market_odds in index.items():
+            state = self._markets.get(line)
+            current = state.odds if state else {}
+            for book, prices in market_odds.items():
+                held = current.get(book, {})
+                for outcome, price in prices.items():
+                    if held.get(outcome) != price:
+                        updates.append(QuoteUpdate(line, book, outcome, price))
+                for outcome in held:
+                    if outcome not in prices:
+                        updates.append(QuoteUpdate(line, book, outcome, None))
+            for book, held in current.items():
+                if book not in market_odds:
+                    updates.extend(QuoteUpdate(line, book, outcome, None) for outcome in held)
+
+        for line, state in self._markets.items():
+            if line not in index:
+                for book, held in state.odds.items():
+                    updates.extend(QuoteUpdate(line, book, outcome, None) for outcome in held)
+
+        return updates
+
+    def sync(self, index: Dict[LineKey, MarketOdds]) -> ArbitrageChanges:
+        """Bring the engine in line with a new payload index; only changed markets are rescanned"""
+        return self.apply(self.diff(index))
+
+    def opportunities(self) -> List[Opportunity]:
+        """All current opportunities, market by market"""
+        return [opp for state in self._markets.values() for opp in state.opportunities.values()]
+
+    def _reevaluate(self, line: LineKey) -> ArbitrageChanges:
+        state = self._markets[line]
+        before = state.opportunities
+        after = state.evaluate(self._book_rank)
+        state.opportunities = after
+        if not state:
+            del self._markets[line]
+
+        changes = ArbitrageChanges()
+        for opp_id, opp in after.items():
+            previous = before.get(opp_id)
+            if previous is None:
+                changes.added.append(opp)
+            elif previous.odds != opp.odds:
+                changes.changed.append(opp)
+        changes.removed.extend(opp for opp_id, opp in before.items() if opp_id not in after)
+        return changes
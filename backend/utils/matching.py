@@ -1,7 +1,12 @@
 """
 Market matching utilities to ensure odds are from the same market
 """
-from typing import Dict, Optional
+import math
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from utils.quotes import QuoteTable, event_key
+
+LINE_MARKETS = ("spreads", "totals")
 
 
 def same_market(market1: Dict, market2: Dict) -> bool:
@@ -116,3 +121,91 @@ def is_valid_two_way_pairing(
     
     return True
 
+
+
+class LineKey(NamedTuple):
+    """Identity of one priced line: event, market and signed point"""
+    event_id: str
+    market: str
+    point: Optional[float]
+
+
+def signed_line(market_key: str, point: float, is_home: bool) -> Optional[float]:
+    """
+    Get the line an outcome belongs to, signed consistently for both sides
+
+    Spreads are expressed from the home team's perspective (home -3.5 and
+    away +3.5 are the same line, -3.5). Totals use the point as-is, and
+    markets without lines (or a NaN point) return None.
+
+    Args:
+        market_key: Market key (e.g. "spreads")
+        point: The outcome's point
+        is_home: Whether the outcome is the home team
+
+    Returns:
+        Line value rounded to 2 decimals, or None
+    """
+    if market_key not in LINE_MARKETS or point != point:
+        return None
+    if market_key == "spreads" and not is_home:
+        point = -point
+    return round(point, 2) + 0.0
+
+
+def format_outcome(market_key: str, name: str, point: Optional[float]) -> str:
+    """Outcome label from its parts; a None or NaN point leaves the name as-is"""
+    if market_key not in LINE_MARKETS or point is None or math.isnan(point):
+        return name
+    if market_key == "spreads":
+        return f"{name} {point:+g}"
+    return f"{name} {point:g}"
+
+
+def build_line_index(quotes: QuoteTable) -> Dict[LineKey, Dict[str, Dict[str, float]]]:
+    """
+    Bucket the quotes of a QuoteTable by (event, market, signed point) in one pass
+
+    Each bucket holds only quotes for the same line, so arbitrage computed
+    within a bucket never mixes books on different spreads or totals. h2h
+    style markets get a single bucket per event with point None. Outcome
+    keys include the point (see format_outcome). Market and bookmaker
+    filtering happens when the table is built.
+
+    Args:
+        quotes: Game market quotes (QuoteTable.add_games)
+
+    Returns:
+        {LineKey: {bookmaker: {outcome label: decimal_odds}}}, with buckets
+        and bookmakers in payload order
+    """
+    events, markets = quotes.events.names, quotes.markets.names
+    books, outcomes = quotes.books.names, quotes.outcomes.names
+    event_home = quotes.event_home
+    index: Dict[LineKey, Dict[str, Dict[str, float]]] = {}
+    # Buckets and labels repeat across bookmakers, so each is resolved once
+    resolved: Dict[Tuple[int, int, int, Optional[float]], Tuple[Dict[str, Dict[str, float]], str]] = {}
+
+    for event, market, _, book, outcome, point, price in quotes.rows():
+        # NaN never equals itself, so missing points are keyed as None
+        row_key = (event, market, outcome, None if point != point else point)
+        cached = resolved.get(row_key)
+        if cached is None:
+            market_key = markets[market]
+            line = signed_line(market_key, point, outcome == event_home[event])
+            if line is None and market_key in LINE_MARKETS:
+                continue
+            bucket = index.setdefault(LineKey(events[event], market_key, line), {})
+            cached = resolved[row_key] = (bucket, format_outcome(market_key, outcomes[outcome], point))
+        bucket, label = cached
+        prices = bucket.get(books[book])
+        if prices is None:
+            prices = bucket[books[book]] = {}
+        prices[label] = price
+
+    return index
+
+
+def game_key(game: Dict) -> str:
+    """Stable identifier for an event (API id, else the matchup)"""
+    return event_key(game)
@@ -0,0 +1,241 @@
+"""
+Middle detection for game spreads/totals and player props
+
+A middle pairs an Over-style leg with an Under-style leg at a higher line
+from another bookmaker: every result wins at least one leg, and results
+between the two lines win both. Spreads are mapped onto the home margin
+(home score minus away score) so both markets share one sweep: home -3.5
+wins above 3.5, away +5.5 wins below 5.5.
+"""
+import bisect
+import math
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from utils.arbitrage import validate_odds
+from utils.matching import LINE_MARKETS, format_outcome, signed_line
+from utils.quotes import NO_ID, QuoteTable
+
+OVER = "over"
+UNDER = "under"
+
+
+class SideQuote(NamedTuple):
+    """A price for one side of one line"""
+    threshold: float
+    price: float
+    book: str
+    outcome: str
+
+
+class SideLadders(NamedTuple):
+    """Quotes for each side, ascending by threshold"""
+    overs: List[SideQuote]
+    unders: List[SideQuote]
+
+
+class MiddleHit(NamedTuple):
+    """An Over leg below an Under leg whose implied sum is under the limit"""
+    over: SideQuote
+    under: SideQuote
+    implied: float
+
+
+def side_threshold(market_key: str, name: str, point: float, is_home: bool) -> Optional[Tuple[str, float]]:
+    """
+    Express a spreads/totals outcome as a side and threshold on the settled number
+
+    Totals settle on the combined score, spreads on the home margin. An
+    Over-side outcome wins above its threshold, an Under-side outcome below.
+    A spread's threshold is its signed_line negated: home -3.5 (line -3.5)
+    wins a home margin above 3.5, away +5.5 (line -5.5) below 5.5.
+
+    Args:
+        market_key: "spreads" or "totals"
+        name: Outcome name
+        point: The outcome's point
+        is_home: Whether the outcome is the home team
+
+    Returns:
+        (side, threshold) or None if the outcome has no usable line
+    """
+    line = signed_line(market_key, point, is_home)
+    if line is None:
+        return None
+
+    if market_key == "totals":
+        side = name.lower()
+        if side not in (OVER, UNDER):
+            return None
+        return side, line
+
+    return (OVER if is_home else UNDER), -line + 0.0
+
+
+def build_side_ladders(quotes: QuoteTable) -> Dict[Tuple[str, str], SideLadders]:
+    """
+    Index the two best books per (threshold, side) for every event's spreads and totals
+
+    The runner-up (the best price from any other book) is kept so that when
+    one book has the best Over and the best Under, the pair against the
+    next book is still found; sweep with best_per_pair=True to report one
+    middle per pair of lines.
+
+    Args:
+        quotes: Game market quotes (QuoteTable.add_games); other markets are ignored
+
+    Returns:
+        {(event_key, market_key): SideLadders}, best price first within a
+        line; ties keep the earlier book
+    """
+    events, markets = quotes.events.names, quotes.markets.names
+    books, outcomes = quotes.books.names, quotes.outcomes.names
+    line_markets = {quotes.markets.get(key) for key in LINE_MARKETS} - {None}
+    best: Dict[Tuple[int, int], Dict[Tuple[str, float], List[SideQuote]]] = {}
+
+    for event, market, _, book, outcome, point, price in quotes.rows():
+        if market not in line_markets or not price or math.isnan(point):
+            continue
+
+        market_key = markets[market]
+        side = side_threshold(market_key, outcomes[outcome], point, outcome == quotes.event_home[event])
+        if side is None:
+            continue
+
+        # [best, runner-up], always from different books
+        top = best.setdefault((event, market), {}).setdefault(side, [])
+        same_book = next((i for i, quote in enumerate(top) if quote.book == books[book]), None)
+        if same_book is not None:
+            if price <= top[same_book].price:
+                continue
+            del top[same_book]
+        elif len(top) == 2 and price <= top[1].price:
+            continue
+
+        quote = SideQuote(side[1], price, books[book], format_outcome(market_key, outcomes[outcome], point))
+        top.insert(0 if not top or price > top[0].price else 1, quote)
+        del top[2:]
+
+    ladders = {}
+    for (event, market), line_quotes in best.items():
+        # Stable sort keeps the best price first within a line
+        overs = sorted(
+            (q for (side, _), top in line_quotes.items() if side == OVER for q in top),
+            key=lambda q: q.threshold
+        )
+        unders = sorted(
+            (q for (side, _), top in line_quotes.items() if side == UNDER for q in top),
+            key=lambda q: q.threshold
+        )
+        if overs and unders:
+            ladders[(events[event], markets[market])] = SideLadders(overs, unders)
+    return ladders
+
+
+def build_player_prop_ladders(quotes: QuoteTable) -> Dict[Tuple[str, str], SideLadders]:
+    """
+    Index every Over/Under player prop quote by (player, market) in one pass
+
+    Unlike build_side_ladders every bookmaker's quote is kept, so a sweep
+    with same_line=True reports each profitable book pair on a line.
+
+    Args:
+        quotes: Player prop quotes (QuoteTable.add_event_odds)
+
+    Returns:
+        {(player_name, market_key): SideLadders} with at least one quote per side
+    """
+    players, markets = quotes.players.names, quotes.markets.names
+    books, outcomes = quotes.books.names, quotes.outcomes.names
+    sides: Dict[Tuple[int, int], Tuple[List[SideQuote], List[SideQuote]]] = {}
+
+    for _, market, player, book, outcome, point, price in quotes.rows():
+        side = outcomes[outcome].lower()
+        if side not in (OVER, UNDER) or player == NO_ID or not price or math.isnan(point):
+            continue
+
+        quote = SideQuote(round(point, 4), price, books[book], f"{side.capitalize()} {point:g}")
+        overs, unders = sides.setdefault((player, market), ([], []))
+        (overs if side == OVER else unders).append(quote)
+
+    # Stable sort keeps bookmaker order within a line
+    return {
+        (players[player], markets[market]): SideLadders(
+            sorted(overs, key=lambda q: q.threshold),
+            sorted(unders, key=lambda q: q.threshold)
+        )
+        for (player, market), (overs, unders) in sides.items()
+        if overs and unders
+    }
+
+
+def find_middles(
+    ladders: SideLadders,
+    max_implied: float = 1.0,
+    validate: bool = True,
+    same_line: bool = False,
+    best_per_pair: bool = False
+) -> List[MiddleHit]:
+    """
+    Find every Over/Under pair with implied sum below max_implied
+
+    Unders are swept in ascending threshold while a second pointer admits
+    each Over with a lower threshold into a pool kept sorted by price. For
+    each Under, the Overs that clear the limit are a suffix of that pool
+    found by bisection, so only qualifying pairs are visited rather than
+    all pairs. Finding a slot is O(log Q) for Q quotes, but inserting into
+    the sorted list shifts the entries after it, so admitting every Over
+    is O(Q^2) element moves at worst (a memmove; Q is a few dozen lines
+    per market). Ladders may hold several quotes per line.
+
+    Args:
+        ladders: Quotes per side for one event (or player) and market
+        max_implied: Keep pairs with 1/over + 1/under below this (1.0 keeps
+            only pairs that are also guaranteed not to lose)
+        validate: Apply validate_odds sanity checks to each pair
+        same_line: Also pair Over and Under on the same line (plain
+            arbitrage); by default only true middles are returned
+        best_per_pair: Keep only the lowest-implied hit for each pair of
+            Over and Under lines (for ladders with several books per line)
+
+    Returns:
+        Hits sorted by implied probability, lowest first
+    """
+    overs, unders = ladders
+    pool_prices: List[float] = []
+    pool: List[SideQuote] = []
+    next_over = 0
+    hits: List[MiddleHit] = []
+
+    for under in unders:
+        while next_over < len(overs) and (
+            overs[next_over].threshold < under.threshold
+            or (same_line and overs[next_over].threshold == under.threshold)
+        ):
+            over = overs[next_over]
+            index = bisect.bisect_left(pool_prices, over.price)
+            pool_prices.insert(index, over.price)
+            pool.insert(index, over)
+            next_over += 1
+
+        headroom = max_implied - 1 / under.price
+        if headroom <= 0:
+            continue
+
+        for over in pool[bisect.bisect_right(pool_prices, 1 / headroom):]:
+            if over.book == under.book:
+                continue
+            if validate and not validate_odds(over.price, under.price)["valid"]:
+                continue
+            hits.append(MiddleHit(over, under, 1 / over.price + 1 / under.price))
+
+    hits.sort(key=lambda hit: hit.implied)
+    if best_per_pair:
+        seen = set()
+        unique = []
+        for hit in hits:
+            lines = (hit.over.threshold, hit.under.threshold)
+            if lines not in seen:
+                seen.add(lines)
+                unique.append(hit)
+        hits = unique
+    return hits
@@ -0,0 +1,160 @@
+"""
+Async HTTP client for The Odds API
+Shared connection pool with keep-alive, gzip, per-call timeouts and retry/backoff
+"""
+import asyncio
+import random
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+
+# Status codes worth retrying (rate limiting and transient upstream failures)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class OddsAPIClient:
+    """
+    Thin async wrapper around a pooled httpx.AsyncClient
+
+    One instance should be shared by the whole application so that TLS
+    connections are reused across requests. The underlying client is created
+    lazily on first use and released with `aclose()`.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str = "",
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.25,
+        backoff_max: float = 4.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        on_response: Optional[Callable[[httpx.Response], None]] = None
+    ):
+        """
+        Args:
+            base_url: API root (e.g. https://api.the-odds-api.com/v4)
+            api_key: Odds API key, sent as the `apiKey` query parameter
+            timeout: Default read/write/pool timeout in seconds
+            connect_timeout: TCP/TLS connect timeout in seconds
+            max_connections: Upper bound on open connections
+            max_keepalive_connections: Idle connections kept in the pool
+            keepalive_expiry: Seconds an idle connection stays in the pool
+            max_retries: Retries after the first attempt for transient errors
+            backoff_base: First backoff delay in seconds (doubles per retry)
+            backoff_max: Cap on a single backoff delay
+            transport: Optional custom transport (used by tests)
+            on_response: Called with every upstream response, including
+                retried and failed ones (e.g. to track quota headers)
+        """
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._transport = transport
+        self.on_response = on_response
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared pooled client, created on first access"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=self.limits,
+                headers={"Accept-Encoding": "gzip"},
+                transport=self._transport
+            )
+        return self._client
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        Exponential backoff with full jitter
+
+        Args:
+            attempt: Zero-based retry number
+
+        Returns:
+            Delay in seconds before the next attempt
+        """
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    async def get(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> httpx.Response:
+        """
+        GET an Odds API path, retrying transient failures
+
+        Args:
+            path: Path relative to the base URL (e.g. "/sports")
+            params: Query parameters (the API key is added automatically)
+            timeout: Per-call timeout overriding the client default
+
+        Returns:
+            Successful httpx.Response
+
+        Raises:
+            httpx.HTTPError: On non-retryable errors or when retries run out
+        """
+        query = {"apiKey": self.api_key}
+        if params:
+            query.update(params)
+
+        request_timeout = (
+            httpx.Timeout(timeout, connect=min(timeout, self.connect_timeout))
+            if timeout is not None else httpx.USE_CLIENT_DEFAULT
+        )
+
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.get(path, params=query, timeout=request_timeout)
+                if self.on_response is not None:
+                    self.on_response(response)
+                if response.status_code in RETRYABLE_STATUS_CODES and attempt < self.max_retries:
+                    await response.aclose()
+                    await asyncio.sleep(self._retry_after(response, attempt))
+                    attempt += 1
+                    continue
+                response.raise_for_status()
+                return response
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self.backoff_delay(attempt))
+                attempt += 1
+
+    def _retry_after(self, response: httpx.Response, attempt: int) -> float:
+        """Honour a numeric Retry-After header, otherwise use backoff"""
+        retry_after = response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(self.backoff_max, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        return self.backoff_delay(attempt)
+
+    async def aclose(self) -> None:
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
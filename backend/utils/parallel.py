@@ -0,0 +1,108 @@
+"""
+Shared worker pool for scanning independent shards of games in parallel
+
+Detection is pure Python and CPU-bound, so threads cannot run shards side
+by side; worker processes can. The pool is started once (at application
+startup, or on first use) and reused by every request, so process start-up
+is paid once.
+"""
+import asyncio
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Deque, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class ScanPool:
+    """
+    Lazily started ProcessPoolExecutor shared across requests
+
+    Shard functions and their arguments must be picklable (module-level
+    functions and plain data). Workers are started with an explicit
+    multiprocessing start method ("spawn" by default), not the platform's,
+    so they never fork a copy of a running event loop and its threads;
+    shard functions should live in modules that are cheap to import. With
+    one worker, shards run in the default thread pool instead: off the
+    event loop, without process start-up or pickling costs that a single
+    core could not win back.
+
+    Spawned and forkserver workers also re-run the script the process was
+    started with (as "__mp_main__"), so a script that uses a parallel pool
+    must keep its entry point under `if __name__ == "__main__"`. Started
+    through a module's entry point instead (`uvicorn app:app`,
+    `python -m pytest`), workers import only the shard function's module.
+    """
+
+    def __init__(self, workers: Optional[int] = None, start_method: str = "spawn"):
+        """
+        Args:
+            workers: Worker processes (default: one per CPU)
+            start_method: multiprocessing start method for the workers
+        """
+        self.workers = max(1, workers if workers is not None else os.cpu_count() or 1)
+        self.mp_context = multiprocessing.get_context(start_method)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def parallel(self) -> bool:
+        return self.workers > 1
+
+    def start(self) -> None:
+        """Create the worker pool now rather than on the first submit (no-op with one worker)"""
+        if self.parallel and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=self.mp_context)
+
+    def submit(self, fn: Callable[..., R], *args: Any) -> "asyncio.Future[R]":
+        """Run fn(*args) in a worker and return an awaitable for the result"""
+        self.start()
+        future = asyncio.get_running_loop().run_in_executor(self._executor, partial(fn, *args))
+        future.add_done_callback(self._check_broken)
+        return future
+
+    async def map(self, fn: Callable[..., R], shards: Iterable[T], *args: Any) -> List[R]:
+        """
+        fn(shard, *args) for every shard, all submitted at once
+
+        Returns:
+            Results in shard order
+        """
+        return list(await asyncio.gather(*(self.submit(fn, shard, *args) for shard in shards)))
+
+    async def imap(self, fn: Callable[..., R], shards: AsyncIterable[T], *args: Any) -> AsyncIterator[R]:
+        """
+        fn(shard, *args) for shards produced while earlier ones are scanned
+
+        At most two shards per worker are in flight, so a fast producer
+        (e.g. a file parser) cannot queue the whole input in memory.
+
+        Yields:
+            Results in shard order
+        """
+        pending: Deque[asyncio.Future] = deque()
+        try:
+            async for shard in shards:
+                pending.append(self.submit(fn, shard, *args))
+                if len(pending) >= 2 * self.workers:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self) -> None:
+        """Stop the worker processes (a later submit starts new ones)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _check_broken(self, future: asyncio.Future) -> None:
+        # A worker that died takes the executor with it; start afresh next time
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._executor = None
@@ -0,0 +1,371 @@
+"""
+Odds API quota tracking and quota-aware poll planning
+
+The Odds API bills every call by markets x regions and reports the
+account's usage in x-requests-* response headers. QuotaTracker keeps the
+latest values (persisted so a restart does not forget them) and
+QuotaPlanner turns what is left into a polling interval per target,
+favouring targets whose next game starts soonest and shedding markets
+before letting an interval grow without bound.
+"""
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional
+
+from utils.quotes import parse_timestamp
+from utils.snapshot import ScanKey
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400.0
+
+# Markets kept when a target has to shed markets, most valuable first
+PRIMARY_MARKETS = ("h2h", "spreads", "totals")
+
+
+def request_cost(markets: Iterable[str], regions: Iterable[str]) -> int:
+    """Credits one odds call costs: one per market per region (at least 1)"""
+    return max(1, len([m for m in markets if m]) * len([r for r in regions if r]))
+
+
+def scan_key_cost(key: ScanKey) -> int:
+    """Estimated credits for the game-market call of one scan of `key`"""
+    return request_cost(key.markets.split(","), key.regions.split(","))
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> Optional[int]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except ValueError:
+        return None
+
+
+@dataclass
+class CreditMeter:
+    """Credits billed to the responses recorded inside QuotaTracker.metered"""
+    credits: int = 0
+    responses: int = 0
+
+
+# Meter of the running task; copied into the tasks it starts, so a scan's
+# concurrent fetches are counted and other requests' are not
+_current_meter: ContextVar[Optional[CreditMeter]] = ContextVar("quota_meter", default=None)
+
+
+@dataclass
+class QuotaState:
+    """Latest x-requests-* values reported by the API"""
+    remaining: Optional[int] = None
+    used: Optional[int] = None
+    last_cost: Optional[int] = None
+    updated_at: Optional[float] = None
+
+
+class QuotaTracker:
+    """
+    Remaining/used credits from upstream response headers
+
+    With a path, the state is loaded on construction and written back at
+    most once per `persist_interval_seconds` (and on `flush`), so a restart
+    resumes from the last known quota instead of spending blind.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        persist_interval_seconds: float = 5.0,
+        clock: Callable[[], float] = time.time
+    ):
+        self.path = path
+        self.persist_interval_seconds = persist_interval_seconds
+        self._clock = clock
+        self.state = QuotaState()
+        self._dirty = False
+        self._persisted_at = 0.0
+        self._load()
+
+    @property
+    def remaining(self) -> Optional[int]:
+        return self.state.remaining
+
+    @property
+    def used(self) -> Optional[int]:
+        return self.state.used
+
+    def record(self, headers: Mapping[str, str]) -> None:
+        """
+        Update from one response's headers (responses without them are ignored)
+
+        Args:
+            headers: Response headers (case-insensitive mapping)
+        """
+        remaining = _header_int(headers, "x-requests-remaining")
+        used = _header_int(headers, "x-requests-used")
+        if remaining is None and used is None:
+            return
+
+        now = self._clock()
+        last_cost = _header_int(headers, "x-requests-last")
+        self.state = QuotaState(
+            remaining=remaining if remaining is not None else self.state.remaining,
+            used=used if used is not None else self.state.used,
+            last_cost=last_cost,
+            updated_at=now
+        )
+        meter = _current_meter.get()
+        if meter is not None and last_cost is not None:
+            meter.credits += last_cost
+            meter.responses += 1
+        self._dirty = True
+        if now - self._persisted_at >= self.persist_interval_seconds:
+            self.flush()
+
+    @contextmanager
+    def metered(self) -> Iterator[CreditMeter]:
+        """
+        Count the credits of responses recorded by this task inside the block
+
+        Each response's own x-requests-last is summed, rather than the change
+        in x-requests-used, which also includes whatever other requests spent
+        meanwhile.
+        """
+        meter = CreditMeter()
+        token = _current_meter.set(meter)
+        try:
+            yield meter
+        finally:
+            _current_meter.reset(token)
+
+    def flush(self) -> None:
+        """Write the state to disk if it changed (no-op without a path)"""
+        if not self.path or not self._dirty:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(asdict(self.state), f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not persist quota state to %s: %s", self.path, e)
+            return
+        self._dirty = False
+        self._persisted_at = self._clock()
+
+    def stats(self) -> Dict[str, Any]:
+        return asdict(self.state)
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+            self.state = QuotaState(**{name: saved.get(name) for name in QuotaState.__dataclass_fields__})
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("Ignoring unreadable quota state %s: %s", self.path, e)
+
+
+def month_start(now: float) -> float:
+    """Epoch of 00:00 UTC on the first of the current month (the last quota reset)"""
+    current = datetime.fromtimestamp(now, timezone.utc)
+    return datetime(current.year, current.month, 1, tzinfo=timezone.utc).timestamp()
+
+
+def days_until_monthly_reset(now: float) -> float:
+    """Days until 00:00 UTC on the first of next month (when quotas reset)"""
+    current = datetime.fromtimestamp(now, timezone.utc)
+    if current.month == 12:
+        reset = datetime(current.year + 1, 1, 1, tzinfo=timezone.utc)
+    else:
+        reset = datetime(current.year, current.month + 1, 1, tzinfo=timezone.utc)
+    return max((reset.timestamp() - now) / SECONDS_PER_DAY, 1 / 24)
+
+
+def degraded_keys(key: ScanKey) -> List[ScanKey]:
+    """
+    Progressively cheaper variants of a target, starting with the target itself
+
+    Player props go first, then all but the most valuable game market.
+    """
+    variants = [key]
+    if key.include_player_props:
+        variants.append(variants[-1]._replace(include_player_props=False))
+    markets = variants[-1].markets.split(",")
+    if len(markets) > 1:
+        keep = next((m for m in PRIMARY_MARKETS if m in markets), markets[0])
+        variants.append(variants[-1]._replace(markets=keep))
+    return variants
+
+
+@dataclass
+class PollPlan:
+    """How one target is polled under the current quota"""
+    key: ScanKey
+    # What is actually scanned; cheaper than `key` when degraded
+    scan_key: ScanKey
+    # None while polling is paused (quota at or below the reserve)
+    interval_seconds: Optional[float]
+    # Estimated credits per scan of scan_key
+    cost: int
+
+    @property
+    def degraded(self) -> bool:
+        return self.scan_key != self.key
+
+
+class QuotaPlanner:
+    """
+    Spread a daily credit budget over poll targets
+
+    The budget is what remains above `reserve`, divided evenly over the
+    days left until the monthly reset (optionally capped by
+    `daily_budget`). Targets get budget shares weighted by how soon their
+    next game starts; a share is turned into an interval from the target's
+    cost per scan. Intervals never go below `min_interval_seconds`; a
+    target whose interval would exceed `max_interval_seconds` is first
+    made cheaper (see degraded_keys); if even its cheapest variant would
+    exceed it, it is polled at `max_interval_seconds` anyway, spending
+    ahead of the daily budget rather than serving arbitrarily old odds
+    (the reserve still pauses polling once reached). Until the tracker has
+    seen quota headers every target is polled at the minimum interval.
+    """
+
+    def __init__(
+        self,
+        tracker: QuotaTracker,
+        min_interval_seconds: float = 60.0,
+        max_interval_seconds: float = 1800.0,
+        reserve: int = 50,
+        daily_budget: Optional[float] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        self.tracker = tracker
+        self.min_interval_seconds = min_interval_seconds
+        self.max_interval_seconds = max_interval_seconds
+        self.reserve = reserve
+        self.max_daily_budget = daily_budget
+        self._clock = clock
+        # Observed credits per scanned key; next game start (epoch) per target
+        self._costs: Dict[ScanKey, float] = {}
+        self._next_start: Dict[ScanKey, float] = {}
+
+    def daily_budget(self, now: Optional[float] = None) -> Optional[float]:
+        """Credits to spend per day, or None while the quota is unknown"""
+        now = self._clock() if now is None else now
+        remaining = self.tracker.remaining
+        updated_at = self.tracker.state.updated_at
+        # A count saved before the last monthly reset says nothing about now
+        if remaining is None or updated_at is None or updated_at < month_start(now):
+            return None
+        budget = max(0, remaining - self.reserve) / days_until_monthly_reset(now)
+        if self.max_daily_budget is not None:
+            budget = min(budget, self.max_daily_budget)
+        return budget
+
+    def estimate_cost(self, key: ScanKey) -> float:
+        """Credits per scan: observed if known, otherwise markets x regions"""
+        return self._costs.get(key) or scan_key_cost(key)
+
+    def observe_cost(self, key: ScanKey, credits: float) -> None:
+        """Record what one scan of `key` actually cost (smoothed)"""
+        if credits <= 0:
+            return
+        previous = self._costs.get(key)
+        self._costs[key] = credits if previous is None else 0.7 * previous + 0.3 * credits
+
+    def observe_start(self, key: ScanKey, commence_time: Optional[str]) -> None:
+        """Record the start of the soonest upcoming game seen for `key`"""
+        start = parse_timestamp(commence_time)
+        if start == start:
+            self._next_start[key] = start
+        else:
+            self._next_start.pop(key, None)
+
+    def urgency(self, key: ScanKey, now: float) -> float:
+        """Weight of a target: inverse hours to its next game (unknown counts as a day)"""
+        start = self._next_start.get(key)
+        hours = 24.0 if start is None else (start - now) / 3600
+        return 1 / max(hours, 0.5)
+
+    def plan(self, targets: Iterable[ScanKey]) -> Dict[ScanKey, PollPlan]:
+        """
+        Poll plan for every target under the current quota
+
+        Returns:
+            {target: PollPlan}
+        """
+        now = self._clock()
+        targets = list(dict.fromkeys(targets))
+        budget = self.daily_budget(now)
+
+        if budget is None:
+            return {
+                key: PollPlan(key, key, self.min_interval_seconds, round(self.estimate_cost(key)))
+                for key in targets
+            }
+        if budget <= 0:
+            return {key: PollPlan(key, key, None, round(self.estimate_cost(key))) for key in targets}
+
+        variants = {key: degraded_keys(key) for key in targets}
+        level = {key: 0 for key in targets}
+        weights = {key: self.urgency(key, now) for key in targets}
+
+        while True:
+            intervals = self._fill(budget, {key: self.estimate_cost(variants[key][level[key]]) for key in targets}, weights)
+            # Shed markets from the target that is furthest over the cap first
+            over = [
+                key for key in targets
+                if intervals[key] > self.max_interval_seconds and level[key] + 1 < len(variants[key])
+            ]
+            if not over:
+                break
+            worst = max(over, key=lambda key: intervals[key])
+            level[worst] += 1
+
+        return {
+            key: PollPlan(
+                key,
+                variants[key][level[key]],
+                min(intervals[key], self.max_interval_seconds),
+                round(self.estimate_cost(variants[key][level[key]]))
+            )
+            for key in targets
+        }
+
+    def _fill(self, budget: float, costs: Dict[ScanKey, float], weights: Dict[ScanKey, float]) -> Dict[ScanKey, float]:
+        """
+        Water-fill the budget by weight, clamping intervals at the minimum
+
+        A target whose share would let it poll faster than the minimum
+        interval is pinned there and its unused share goes to the rest.
+        """
+        intervals: Dict[ScanKey, float] = {}
+        free = dict(weights)
+        left = budget
+
+        while free:
+            total_weight = sum(free.values())
+            pinned = []
+            for key, weight in free.items():
+                share = left * weight / total_weight
+                interval = costs[key] * SECONDS_PER_DAY / share if share > 0 else float("inf")
+                if interval < self.min_interval_seconds:
+                    pinned.append(key)
+                intervals[key] = interval
+            if not pinned:
+                break
+            for key in pinned:
+                intervals[key] = self.min_interval_seconds
+                left -= costs[key] * SECONDS_PER_DAY / self.min_interval_seconds
+                del free[key]
+
+        return intervals
@@ -0,0 +1,219 @@
+"""
+Compact columnar quote table built once per Odds API payload
+
+Bookmakers, markets, outcomes, players and events are interned to small
+integer IDs and every quote becomes one row of typed arrays, so scanners
+iterate flat columns instead of walking nested bookmaker/market/outcome
+dicts with .get() chains and repeated string comparisons.
+"""
+import math
+from array import array
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Container, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+NO_ID = -1
+
+
+def event_key(game: Dict) -> str:
+    """Stable identifier for an event (API id, else the matchup)"""
+    return game.get("id") or f"{game.get('home_team', '')} vs {game.get('away_team', '')}"
+
+
+@lru_cache(maxsize=4096)
+def parse_timestamp(value: Optional[str]) -> float:
+    """ISO 8601 timestamp to epoch seconds (NaN if missing or malformed); bookmakers share a handful of values"""
+    if not value:
+        return math.nan
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except (ValueError, AttributeError):
+        return math.nan
+
+
+def parse_point(value: Any) -> float:
+    """Outcome point as a float (NaN if missing or malformed)"""
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return math.nan
+
+
+class Interner:
+    """Bidirectional string <-> dense integer ID mapping"""
+    __slots__ = ("_ids", "names")
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __call__(self, name: str) -> int:
+        """ID for name, assigning the next one on first sight"""
+        ident = self._ids.get(name)
+        if ident is None:
+            ident = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return ident
+
+    def get(self, name: str) -> Optional[int]:
+        return self._ids.get(name)
+
+
+class QuoteTable:
+    """
+    One row per quote: event, market, player, book, outcome, point, price, last_update
+
+    ID columns are array('i') and numeric columns array('d'); a missing
+    point or last_update is NaN and a missing player is NO_ID. Rows keep
+    payload order, so anything grouped from them keeps bookmaker order.
+    Per-event metadata (home team outcome ID) lives beside the columns.
+    """
+    __slots__ = (
+        "events", "markets", "players", "books", "outcomes", "event_home",
+        "event", "market", "player", "book", "outcome", "point", "price", "last_update"
+    )
+
+    def __init__(self):
+        self.events = Interner()
+        self.markets = Interner()
+        self.players = Interner()
+        self.books = Interner()
+        self.outcomes = Interner()
+        # Outcome ID of each event's home team (NO_ID if unknown)
+        self.event_home = array("i")
+
+        self.event = array("i")
+        self.market = array("i")
+        self.player = array("i")
+        self.book = array("i")
+        self.outcome = array("i")
+        self.point = array("d")
+        self.price = array("d")
+        self.last_update = array("d")
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    def nbytes(self) -> int:
+        """Approximate bytes held by the row columns"""
+        columns = (self.event, self.market, self.player, self.book, self.outcome, self.point, self.price, self.last_update)
+        return sum(column.itemsize * len(column) for column in columns)
+
+    def _event_id(self, key: str, home_team: Optional[str]) -> int:
+        event_id = self.events(key)
+        if event_id == len(self.event_home):
+            self.event_home.append(self.outcomes(home_team) if home_team else NO_ID)
+        return event_id
+
+    def _add_bookmakers(
+        self,
+        event_id: int,
+        bookmakers: Iterable[Dict],
+        wanted: Set[str],
+        allowed_books: Optional[Container[str]],
+        players: bool
+    ) -> None:
+        for bookmaker in bookmakers:
+            title = bookmaker.get("title")
+            if allowed_books is not None and title not in allowed_books:
+                continue
+            book_id = self.books(title)
+            updated = parse_timestamp(bookmaker.get("last_update"))
+
+            for market in bookmaker.get("markets", []):
+                market_key = market.get("key")
+                if market_key not in wanted:
+                    continue
+                market_id = self.markets(market_key)
+
+                for outcome in market.get("outcomes", []):
+                    price = outcome.get("price")
+                    if price is None:
+                        continue
+
+                    player_id = NO_ID
+                    if players:
+                        player_name = (outcome.get("description") or outcome.get("player_name") or "").strip()
+                        if not player_name:
+                            continue
+                        player_id = self.players(player_name)
+
+                    self.event.append(event_id)
+                    self.market.append(market_id)
+                    self.player.append(player_id)
+                    self.book.append(book_id)
+                    self.outcome.append(self.outcomes(outcome.get("name", "")))
+                    self.point.append(parse_point(outcome.get("point")))
+                    self.price.append(price)
+                    self.last_update.append(updated)
+
+    def add_games(
+        self,
+        games: Iterable[Dict],
+        market_keys: Iterable[str],
+        allowed_books: Optional[Container[str]] = None
+    ) -> "QuoteTable":
+        """
+        Append game market quotes from /sports/{sport}/odds events
+
+        Args:
+            games: Odds API events with 'bookmakers'
+            market_keys: Market keys to keep
+            allowed_books: Bookmaker titles to keep (None for all)
+
+        Returns:
+            self, for chaining
+        """
+        wanted = set(market_keys)
+        for game in games:
+            event_id = self._event_id(event_key(game), game.get("home_team"))
+            self._add_bookmakers(event_id, game.get("bookmakers", []), wanted, allowed_books, players=False)
+        return self
+
+    def add_event_odds(
+        self,
+        event_data: Dict,
+        market_keys: Iterable[str],
+        allowed_books: Optional[Container[str]] = None
+    ) -> "QuoteTable":
+        """
+        Append player prop quotes from one /events/{id}/odds response
+
+        Outcomes without a player name are skipped.
+
+        Returns:
+            self, for chaining
+        """
+        event_id = self._event_id(event_key(event_data), event_data.get("home_team"))
+        self._add_bookmakers(event_id, event_data.get("bookmakers", []), set(market_keys), allowed_books, players=True)
+        return self
+
+    def rows(self) -> Iterator[Tuple[int, int, int, int, int, float, float]]:
+        """(event, market, player, book, outcome, point, price) ID/value tuples in row order"""
+        return zip(self.event, self.market, self.player, self.book, self.outcome, self.point, self.price)
+
+    def prices(self) -> Dict[Tuple[str, str, str, str, Optional[float]], float]:
+        """
+        {(market, player, book, outcome, point): price} keyed by names
+
+        IDs are local to one table, so this is the form in which two fetches
+        of the same event can be compared. A missing player is "" and a
+        missing point None (NaN would never match itself).
+        """
+        markets, players = self.markets.names, self.players.names
+        books, outcomes = self.books.names, self.outcomes.names
+        return {
+            (
+                markets[market],
+                players[player] if player != NO_ID else "",
+                books[book],
+                outcomes[outcome],
+                None if point != point else point
+            ): price
+            for _, market, player, book, outcome, point, price in self.rows()
+        }
@@ -0,0 +1,408 @@
+"""
+Opportunity records built from scan results, and the shard scans behind them
+
+Used by the live endpoints in the app and by the ScanPool worker processes
+that scan shards of /arbitrage/all and /upload games. Workers import only
+this module, never the app, so they start under any multiprocessing start
+method and everything they use arrives as arguments or module constants.
+"""
+from collections import Counter
+from datetime import datetime
+from itertools import chain
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from utils.arbitrage import (
+    calculate_arbitrage_batch,
+    calculate_stakes,
+    calculate_stakes_batch,
+    calculate_stakes_n_way,
+    find_n_way_arbitrage
+)
+from utils.books import ALLOWED_SPORTSBOOKS
+from utils.deltas import stable_id
+from utils.incremental import Opportunity
+from utils.matching import LineKey, build_line_index, game_key
+from utils.middles import build_side_ladders, find_middles
+from utils.quotes import QuoteTable
+from utils.scanner import (
+    MarketOdds,
+    ThreeWayCandidate,
+    TwoWayCandidate,
+    evaluate_three_way,
+    evaluate_two_way,
+    three_way_candidates,
+    two_way_candidates
+)
+from utils.topk import GroupedTopK
+
+
+def build_game_info(game: Dict[str, Any], sport: str) -> Dict[str, Any]:
+    return {
+        "match_name": f"{game['home_team']} vs {game['away_team']}",
+        "sport_name": game.get("sport_title", sport),
+        "commence_time": game.get("commence_time", "")
+    }
+
+
+def build_game_record(
+    books: Sequence[str],
+    outcomes: Sequence[str],
+    odds: Sequence[float],
+    arb: Dict[str, Any],
+    stakes: Sequence[float],
+    profit: float,
+    market_key: str,
+    line: Optional[float],
+    game_info: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Build a two- or three-way game record; legs are lettered a, b, c
+    """
+    letters = "abc"[:len(books)]
+    record = {
+        "match": game_info["match_name"],
+        "sport": game_info["sport_name"],
+        "market": market_key,
+        "market_type": "game",
+        "line": line,
+        "commence_time": game_info["commence_time"]
+    }
+    for letter, book, outcome, price in zip(letters, books, outcomes, odds):
+        record[f"sportsbook_{letter}"] = book
+        record[f"odds_{letter}"] = price
+        record[f"outcome_{letter}"] = outcome
+    record["profit_percentage"] = round(arb["profit_percentage"], 2)
+    record["implied_probability"] = round(arb["implied_probability"], 4)
+    for letter, stake in zip(letters, stakes):
+        record[f"stake_{letter}"] = stake
+    record["guaranteed_profit"] = round(profit, 2)
+    record["timestamp"] = datetime.now().isoformat()
+    
+    # Add warning if present
+    if arb.get("warning"):
+        record["warning"] = arb["warning"]
+    
+    return record
+
+
+def build_multi_way_record(
+    arb: Dict[str, Any],
+    market_key: str,
+    line: Optional[float],
+    game_info: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Build a market_type "multi_way" record from find_n_way_arbitrage's result
+    """
+    stakes = calculate_stakes_n_way(arb["odds"], total_stake=1000)
+    return {
+        "match": game_info["match_name"],
+        "sport": game_info["sport_name"],
+        "market": market_key,
+        "market_type": "multi_way",
+        "line": line,
+        "commence_time": game_info["commence_time"],
+        "legs": [
+            {"sportsbook": book, "outcome": outcome, "odds": odds, "stake": stake}
+            for book, outcome, odds, stake in zip(
+                arb["books"], arb["outcomes"], arb["odds"], stakes["stakes"]
+            )
+        ],
+        "profit_percentage": round(arb["profit_percentage"], 2),
+        "implied_probability": round(arb["implied_probability"], 4),
+        "guaranteed_profit": round(stakes["profit"], 2),
+        "warning": arb["warning"],
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+def build_opportunity_record(opp: Opportunity, game_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the same record a full scan would for an incremental engine opportunity
+    """
+    _, market_key, line = opp.line
+    if len(opp.books) > 3:
+        return build_multi_way_record(opp.arb, market_key, line, game_info)
+
+    stakes = calculate_stakes(*opp.odds, total_stake=1000)
+    letters = "abc"[:len(opp.books)]
+    return build_game_record(
+        opp.books, opp.outcomes, opp.odds, opp.arb,
+        [stakes[f"stake_{letter}"] for letter in letters], stakes["profit"],
+        market_key, line, game_info
+    )
+
+
+def build_middle_record(hit, market_key: str, game_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a market_type "middle" record from a MiddleHit
+
+    Side A is the Over leg, side B the Under leg. profit_percentage is the
+    return when only one leg wins; middle_profit_percentage when both do.
+    middle_low/middle_high bound the winning window on the total (totals)
+    or the home margin (spreads).
+    """
+    over, under = hit.over, hit.under
+    stakes = calculate_stakes(over.price, under.price, total_stake=1000)
+
+    return {
+        "match": game_info["match_name"],
+        "sport": game_info["sport_name"],
+        "market": market_key,
+        "market_type": "middle",
+        "line": None,
+        "commence_time": game_info["commence_time"],
+        "sportsbook_a": over.book,
+        "odds_a": over.price,
+        "outcome_a": over.outcome,
+        "sportsbook_b": under.book,
+        "odds_b": under.price,
+        "outcome_b": under.outcome,
+        "middle_low": over.threshold,
+        "middle_high": under.threshold,
+        "profit_percentage": round((1 / hit.implied - 1) * 100, 2),
+        "middle_profit_percentage": round((2 / hit.implied - 1) * 100, 2),
+        "implied_probability": round(hit.implied, 4),
+        "stake_a": stakes["stake_a"],
+        "stake_b": stakes["stake_b"],
+        "guaranteed_profit": round(stakes["profit"], 2),
+        "middle_profit": round(stakes["return_a"] + stakes["return_b"] - 1000, 2),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+def record_book_mask(record: Dict[str, Any]) -> int:
+    """
+    Bitmask of the bookmakers a record's legs use
+    """
+    if "legs" in record:
+        return ALLOWED_SPORTSBOOKS.mask(leg["sportsbook"] for leg in record["legs"])
+    return ALLOWED_SPORTSBOOKS.mask(
+        record[field] for field in ("sportsbook_a", "sportsbook_b", "sportsbook_c") if record.get(field)
+    )
+
+
+def record_id(record: Dict[str, Any]) -> str:
+    """
+    Stable identifier for a record's opportunity
+
+    Depends on the event, market, line and legs (in any leg order) but not
+    on prices, so a repriced opportunity keeps its id across scans.
+    """
+    if "legs" in record:
+        legs = [(leg["sportsbook"], leg["outcome"]) for leg in record["legs"]]
+    else:
+        legs = [
+            (record[f"sportsbook_{letter}"], record[f"outcome_{letter}"])
+            for letter in "abc" if record.get(f"sportsbook_{letter}")
+        ]
+    return stable_id((
+        record["match"], record["commence_time"], record["market"], record["market_type"],
+        record.get("line"), record.get("player_name"), record.get("prop_line"),
+        record.get("middle_low"), record.get("middle_high"), sorted(legs)
+    ))
+
+
+def scan_line_index(
+    line_index: Dict[LineKey, MarketOdds],
+    game_info_by_key: Dict[str, Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Scan every line bucket from scratch and build game records
+    """
+    records: List[Dict[str, Any]] = []
+    
+    # Collect candidates from every bucket first, then evaluate all two-way
+    # and all three-way candidates with one call each
+    buckets: List[Tuple[LineKey, MarketOdds, int, int, int]] = []
+    two_way_pending: List[TwoWayCandidate] = []
+    three_way_pending: List[ThreeWayCandidate] = []
+    
+    for line_key, market_odds in line_index.items():
+        if len(market_odds) < 2:
+            continue
+        
+        outcome_names = list(dict.fromkeys(name for prices in market_odds.values() for name in prices))
+        
+        if len(outcome_names) == 2:
+            # Two-way (most common): best-price search, profitable pairs only
+            candidates = two_way_candidates(market_odds, outcome_names)
+            buckets.append((line_key, market_odds, 2, len(two_way_pending), len(candidates)))
+            two_way_pending.extend(candidates)
+        elif len(outcome_names) == 3:
+            # Three-way (e.g., soccer with draw): best price per outcome
+            candidates = three_way_candidates(market_odds, outcome_names)
+            buckets.append((line_key, market_odds, 3, len(three_way_pending), len(candidates)))
+            three_way_pending.extend(candidates)
+        elif len(outcome_names) > 3:
+            buckets.append((line_key, market_odds, len(outcome_names), 0, 0))
+    
+    two_way_hits = evaluate_two_way(two_way_pending, validate=True)
+    three_way_hits = evaluate_three_way(three_way_pending, validate=True)
+    two_way_stakes = calculate_stakes_batch([(c[2], c[5]) for c in two_way_pending]) if two_way_pending else None
+    three_way_stakes = calculate_stakes_batch([odds for _, _, odds in three_way_pending]) if three_way_pending else None
+    
+    for (event_key, market_key, line), market_odds, width, start, count in buckets:
+        game_info = game_info_by_key[event_key]
+        
+        if width == 2:
+            rows = [i for i in range(start, start + count) if two_way_hits[i]]
+            rows.sort(key=lambda i: two_way_hits[i].arb["profit_percentage"], reverse=True)
+            for i in rows:
+                hit = two_way_hits[i]
+                records.append(build_game_record(
+                    (hit.book_a, hit.book_b), (hit.outcome_a, hit.outcome_b), (hit.odds_a, hit.odds_b),
+                    hit.arb, two_way_stakes["stakes"][i].tolist(), float(two_way_stakes["profit"][i]),
+                    market_key, line, game_info
+                ))
+        
+        elif width == 3:
+            rows = [i for i in range(start, start + count) if three_way_hits[i]]
+            rows.sort(key=lambda i: three_way_hits[i].arb["profit_percentage"], reverse=True)
+            for i in rows:
+                hit = three_way_hits[i]
+                records.append(build_game_record(
+                    hit.books, hit.outcomes, hit.odds,
+                    hit.arb, three_way_stakes["stakes"][i].tolist(), float(three_way_stakes["profit"][i]),
+                    market_key, line, game_info
+                ))
+        
+        else:
+            # N-way markets (outrights, futures): best price per runner
+            arb = find_n_way_arbitrage(market_odds)
+            if arb:
+                records.append(build_multi_way_record(arb, market_key, line, game_info))
+    
+    return records
+
+
+def scan_middles(
+    quotes: QuoteTable,
+    markets: List[str],
+    game_info_by_key: Dict[str, Dict[str, Any]],
+    max_implied: float
+) -> Iterator[Dict[str, Any]]:
+    """
+    Middles across lines: per-event sorted Over/Under ladders, swept once
+    """
+    if not any(market in ("spreads", "totals") for market in markets):
+        return
+    for (event_key, market_key), ladders in build_side_ladders(quotes).items():
+        game_info = game_info_by_key[event_key]
+        for hit in find_middles(ladders, max_implied=max_implied, best_per_pair=True):
+            yield build_middle_record(hit, market_key, game_info)
+
+
+def scan_game_shard(
+    games: List[Dict[str, Any]],
+    markets: List[str],
+    k: Optional[int],
+    max_middle_implied: float
+) -> Tuple[List[Dict[str, Any]], Dict[int, int]]:
+    """
+    Scan one shard of games (from any sports) from scratch.
+    Runs in scan_pool workers, so it only touches its arguments and
+    module-level constants.
+    Returns the shard's best k records per bookmaker set (record_book_mask),
+    highest profit first and with ids, and how many were found per set;
+    per-request filters are applied to the merged result.
+    """
+    game_info_by_key = {game_key(game): build_game_info(game, game.get("sport_key", "")) for game in games}
+    quotes = QuoteTable().add_games(games, markets, ALLOWED_SPORTSBOOKS)
+
+    arbitrages: GroupedTopK[Dict[str, Any]] = GroupedTopK(
+        k, key=lambda arb: arb["profit_percentage"], group=record_book_mask
+    )
+    arbitrages.extend(chain(
+        scan_line_index(build_line_index(quotes), game_info_by_key),
+        scan_middles(quotes, markets, game_info_by_key, max_middle_implied)
+    ))
+
+    records = arbitrages.sorted()
+    for record in records:
+        record["id"] = record_id(record)
+    return records, arbitrages.counts()
+
+
+def merge_game_shards(
+    results: Sequence[Tuple[List[Dict[str, Any]], Dict[int, int]]],
+    k: Optional[int]
+) -> Tuple[List[Dict[str, Any]], Dict[int, int]]:
+    """
+    Combine scan_game_shard results as if all games were one shard
+
+    Each shard holds its top k per bookmaker set, so their union holds
+    every set's overall top k. Ties keep earlier shards first.
+    """
+    merged: GroupedTopK[Dict[str, Any]] = GroupedTopK(
+        k, key=lambda arb: arb["profit_percentage"], group=record_book_mask
+    )
+    counts: Counter = Counter()
+    for records, shard_counts in results:
+        merged.extend(records)
+        counts.update(shard_counts)
+    return merged.sorted(), dict(counts)
+
+
+def find_upload_arbitrages(games: List[Dict[str, Any]], book_mask: int) -> List[Dict[str, Any]]:
+    """
+    Two-way arbitrage across bookmaker pairs for a shard of uploaded games,
+    highest profit first. Every book pair is collected first, then
+    evaluated in one batch. Runs in scan_pool workers.
+    """
+    pairs = []
+    
+    for game in games:
+        match_name = game.get("match") or "Unknown Match"
+        sport_name = game.get("sport") or "Unknown Sport"
+        bookmakers = game.get("bookmakers", [])
+        
+        # Only include whitelisted sportsbooks the caller selected
+        bookmakers = [b for b in bookmakers if ALLOWED_SPORTSBOOKS.bit(b.get("name")) & book_mask]
+        
+        if len(bookmakers) < 2:
+            continue
+        
+        for i, book1 in enumerate(bookmakers):
+            for book2 in bookmakers[i+1:]:
+                odds_a = book1.get("home") or book1.get("odds1")
+                odds_b = book2.get("away") or book2.get("odds2")
+                
+                if odds_a and odds_b:
+                    pairs.append((match_name, sport_name, book1, book2, float(odds_a), float(odds_b)))
+    
+    arbitrages = []
+    
+    if pairs:
+        odds = [(pair[4], pair[5]) for pair in pairs]
+        arb = calculate_arbitrage_batch(odds)
+        stakes = calculate_stakes_batch(odds)
+        
+        for pair, exists, profit, pair_stakes, pair_profit in zip(
+            pairs,
+            arb["exists"].tolist(),
+            arb["profit_percentage"].tolist(),
+            stakes["stakes"].tolist(),
+            stakes["profit"].tolist()
+        ):
+            if not exists:
+                continue
+            match_name, sport_name, book1, book2, odds_a, odds_b = pair
+            arbitrages.append({
+                "match": match_name,
+                "sport": sport_name,
+                "market": "h2h",
+                "sportsbook_a": book1.get("name", "Unknown"),
+                "odds_a": odds_a,
+                "outcome_a": "Home/Team A",
+                "sportsbook_b": book2.get("name", "Unknown"),
+                "odds_b": odds_b,
+                "outcome_b": "Away/Team B",
+                "profit_percentage": round(profit, 2),
+                "stake_a": pair_stakes[0],
+                "stake_b": pair_stakes[1],
+                "guaranteed_profit": round(pair_profit, 2)
+            })
+    
+    arbitrages.sort(key=lambda x: x["profit_percentage"], reverse=True)
+    return arbitrages
@@ -0,0 +1,332 @@
+"""
+Market scan engines for arbitrage detection
+
+Each engine takes one market as {bookmaker: {outcome: decimal_odds}} and
+returns only the profitable book/outcome combinations, best first.
+Candidate search and evaluation are split so callers can collect
+candidates from many markets and evaluate them in one call.
+"""
+import heapq
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.arbitrage import calculate_arbitrage_batch, check_arbitrage_two_way, get_warning_level
+
+MarketOdds = Dict[str, Dict[str, float]]
+
+# (book_a, outcome_a, odds_a, book_b, outcome_b, odds_b)
+TwoWayCandidate = Tuple[str, str, float, str, str, float]
+# (books, outcomes, odds)
+ThreeWayCandidate = Tuple[Tuple[str, str, str], Tuple[str, str, str], Tuple[float, float, float]]
+
+
+class TwoWayHit(NamedTuple):
+    """A profitable two-way combination; side A is the earlier bookmaker"""
+    book_a: str
+    outcome_a: str
+    odds_a: float
+    book_b: str
+    outcome_b: str
+    odds_b: float
+    arb: Dict
+
+
+class ThreeWayHit(NamedTuple):
+    """A profitable three-way assignment; books[i] is used for outcomes[i]"""
+    books: Tuple[str, str, str]
+    outcomes: Tuple[str, str, str]
+    odds: Tuple[float, float, float]
+    arb: Dict
+
+
+def best_prices(market_odds: MarketOdds, outcome_names: Sequence[str]) -> Dict[str, Tuple[float, Optional[str]]]:
+    """
+    Best price and bookmaker per outcome in a single pass
+
+    Args:
+        market_odds: {bookmaker: {outcome: decimal_odds}}
+        outcome_names: Outcomes to look up
+
+    Returns:
+        {outcome: (best_odds, bookmaker)}; (0.0, None) if nobody prices it
+    """
+    best = {name: (0.0, None) for name in outcome_names}
+    for book, prices in market_odds.items():
+        for name in outcome_names:
+            price = prices.get(name)
+            if price and price > best[name][0]:
+                best[name] = (price, book)
+    return best
+
+
+# Quotes for one outcome as (-price, book rank, book): plain tuple order puts
+# the highest price first, ties in bookmaker order
+Ladder = List[Tuple[float, int, str]]
+
+
+def _ranked_quotes(market_odds: MarketOdds, outcome: str, order: Dict[str, int]) -> Ladder:
+    """Ladder of one outcome's quotes, ranked by `order`"""
+    quotes = [(-prices[outcome], order[book], book) for book, prices in market_odds.items() if prices.get(outcome)]
+    quotes.sort()
+    return quotes
+
+
+def two_way_candidates(market_odds: MarketOdds, outcome_names: Sequence[str]) -> List[TwoWayCandidate]:
+    """
+    Cross-book pairs of a two-way market with implied probability below 1
+
+    The best price per outcome decides in O(B) whether any arbitrage can
+    exist. Only then are the two price ladders built and walked (see
+    ladder_two_way_candidates). No validation is applied here.
+
+    Args:
+        market_odds: {bookmaker: {outcome: decimal_odds}} in bookmaker order
+        outcome_names: The market's two outcome names
+
+    Returns:
+        Pairs oriented by bookmaker order, lowest implied probability first
+    """
+    outcome_0, outcome_1 = outcome_names
+    best = best_prices(market_odds, outcome_names)
+    best_0, best_1 = best[outcome_0][0], best[outcome_1][0]
+    if not best_0 or not best_1 or (1 / best_0 + 1 / best_1) >= 1.0:
+        return []
+
+    order = {book: i for i, book in enumerate(market_odds)}
+    return ladder_two_way_candidates(
+        outcome_names,
+        (_ranked_quotes(market_odds, outcome_0, order), _ranked_quotes(market_odds, outcome_1, order))
+    )
+
+
+def ladder_two_way_candidates(outcome_names: Sequence[str], ladders: Sequence[Ladder]) -> List[TwoWayCandidate]:
+    """
+    Cross-book pairs with implied probability below 1, from ranked ladders
+
+    The ladders are walked best-first with a heap, so combinations come out
+    in ascending implied probability and the walk stops at the first
+    non-arb: the cost is O(hits log hits), independent of how many books
+    quote the market. No validation is applied here.
+
+    Args:
+        outcome_names: The market's two outcome names
+        ladders: Non-empty Ladder per outcome, in outcome_names order
+
+    Returns:
+        Pairs oriented by book rank, lowest implied probability first
+    """
+    outcome_0, outcome_1 = outcome_names
+    ladder_0, ladder_1 = ladders
+
+    candidates: List[TwoWayCandidate] = []
+    heap = [(1 / -ladder_0[0][0] + 1 / -ladder_1[0][0], 0, 0)]
+    seen = {(0, 0)}
+
+    while heap:
+        implied, i, j = heapq.heappop(heap)
+        if implied >= 1.0:
+            break
+
+        neg_0, rank_0, book_0 = ladder_0[i]
+        neg_1, rank_1, book_1 = ladder_1[j]
+        if book_0 != book_1:
+            # Orient the pair like the bookmaker order
+            if rank_0 < rank_1:
+                candidates.append((book_0, outcome_0, -neg_0, book_1, outcome_1, -neg_1))
+            else:
+                candidates.append((book_1, outcome_1, -neg_1, book_0, outcome_0, -neg_0))
+
+        for next_i, next_j in ((i + 1, j), (i, j + 1)):
+            if next_i < len(ladder_0) and next_j < len(ladder_1) and (next_i, next_j) not in seen:
+                seen.add((next_i, next_j))
+                heapq.heappush(heap, (1 / -ladder_0[next_i][0] + 1 / -ladder_1[next_j][0], next_i, next_j))
+
+    return candidates
+
+
+def _arb_summary(implied: float, profit: float) -> Dict[str, Any]:
+    """Per-hit dict shaped like calculate_arbitrage_two_way's result"""
+    return {
+        "exists": True,
+        "implied_probability": round(implied, 6),
+        "profit_percentage": profit,
+        "validation": {"valid": True},
+        # Warning thresholds apply to the unrounded profit, as in the scalar path
+        "warning": get_warning_level((1 / implied - 1) * 100)
+    }
+
+
+def evaluate_two_way(candidates: Sequence[TwoWayCandidate], validate: bool = True) -> List[Optional[TwoWayHit]]:
+    """
+    Evaluate two-way candidates with the check_arbitrage_two_way predicate
+
+    The ladder walk only yields pairs below an implied sum of 1, so there
+    are a handful per market at most: a scalar check per pair is several
+    times cheaper than a numpy batch round trip at that size.
+
+    Args:
+        candidates: Pairs from two_way_candidates (any number of markets)
+        validate: Apply validate_odds rules
+
+    Returns:
+        Hits aligned with the input, None where validation or the
+        arbitrage condition fails
+    """
+    hits: List[Optional[TwoWayHit]] = []
+    for candidate in candidates:
+        check = check_arbitrage_two_way(candidate[2], candidate[5], validate)
+        # Profit rounded to 4 decimals like calculate_arbitrage_two_way
+        hits.append(TwoWayHit(*candidate, _arb_summary(check[0], round(check[1], 4))) if check else None)
+    return hits
+
+
+def scan_two_way_market(
+    market_odds: MarketOdds,
+    outcome_names: Sequence[str],
+    validate: bool = True
+) -> List[TwoWayHit]:
+    """
+    Find every cross-book arbitrage in a two-way market
+
+    Args:
+        market_odds: {bookmaker: {outcome: decimal_odds}} in bookmaker order
+        outcome_names: The market's two outcome names
+        validate: Apply validate_odds sanity checks to each hit
+
+    Returns:
+        Hits sorted by profit, highest first
+    """
+    hits = [hit for hit in evaluate_two_way(two_way_candidates(market_odds, outcome_names), validate) if hit]
+    hits.sort(key=lambda hit: hit.arb["profit_percentage"], reverse=True)
+    return hits
+
+
+def _best_first_assignments(ladders: Sequence[Ladder]) -> Iterator[Tuple[float, Tuple[int, ...]]]:
+    """
+    Yield (implied, indices) over price ladders in ascending implied sum
+
+    `indices[k]` picks a quote from `ladders[k]`. Ladders are best price
+    first, so bumping any index can only raise the implied sum; a heap over
+    that lattice enumerates assignments best-first while touching only the
+    ones the caller actually consumes.
+    """
+    start = tuple(0 for _ in ladders)
+    heap = [(sum(1 / -ladder[0][0] for ladder in ladders), start)]
+    seen = {start}
+
+    while heap:
+        implied, indices = heapq.heappop(heap)
+        yield implied, indices
+
+        for k, index in enumerate(indices):
+            if index + 1 < len(ladders[k]):
+                bumped = indices[:k] + (index + 1,) + indices[k + 1:]
+                if bumped not in seen:
+                    seen.add(bumped)
+                    heapq.heappush(heap, (sum(1 / -ladders[m][i][0] for m, i in enumerate(bumped)), bumped))
+
+
+def three_way_candidates(market_odds: MarketOdds, outcome_names: Sequence[str]) -> List[ThreeWayCandidate]:
+    """
+    Bookmaker assignments of a 1X2 market with implied probability below 1
+
+    The best price per outcome decides in O(B * outcomes) whether anything
+    exists; only then are the ladders built and walked (see
+    ladder_three_way_candidates).
+
+    Args:
+        market_odds: {bookmaker: {outcome: decimal_odds}} in bookmaker order
+        outcome_names: The market's three outcome names (e.g. home, draw, away)
+
+    Returns:
+        Assignments, lowest implied probability first
+    """
+    best = best_prices(market_odds, outcome_names)
+    if any(not best[name][0] for name in outcome_names):
+        return []
+    if sum(1 / best[name][0] for name in outcome_names) >= 1.0:
+        return []
+
+    order = {book: i for i, book in enumerate(market_odds)}
+    ladders = [_ranked_quotes(market_odds, name, order) for name in outcome_names]
+    return ladder_three_way_candidates(outcome_names, ladders)
+
+
+def ladder_three_way_candidates(outcome_names: Sequence[str], ladders: Sequence[Ladder]) -> List[ThreeWayCandidate]:
+    """
+    Profitable bookmaker assignments of a 1X2 market, from ranked ladders
+
+    Each outcome can be taken from any bookmaker, including two outcomes
+    from the same one; only all three from a single book is skipped since
+    that is one book's own (mispriced) market rather than an arbitrage.
+    Assignments are enumerated best-first and the walk stops at the first
+    non-arb.
+
+    Args:
+        outcome_names: The market's three outcome names
+        ladders: Non-empty Ladder per outcome, in outcome_names order
+
+    Returns:
+        Assignments, lowest implied probability first
+    """
+    candidates: List[ThreeWayCandidate] = []
+    for implied, indices in _best_first_assignments(ladders):
+        if implied >= 1.0:
+            break
+
+        quotes = [ladders[k][index] for k, index in enumerate(indices)]
+        books = tuple(book for _, _, book in quotes)
+        if len(set(books)) == 1:
+            continue
+        candidates.append((books, tuple(outcome_names), tuple(-neg for neg, _, _ in quotes)))
+
+    return candidates
+
+
+def evaluate_three_way(candidates: Sequence[ThreeWayCandidate], validate: bool = True) -> List[Optional[ThreeWayHit]]:
+    """
+    Evaluate three-way candidates in one vectorized call
+
+    Args:
+        candidates: Assignments from three_way_candidates (any number of markets)
+        validate: Apply validate_odds rules
+
+    Returns:
+        Hits aligned with the input, None where validation or the
+        arbitrage condition fails
+    """
+    if not candidates:
+        return []
+
+    arb = calculate_arbitrage_batch(np.array([odds for _, _, odds in candidates], dtype=float), validate=validate)
+    return [
+        ThreeWayHit(*candidate, _arb_summary(implied, profit)) if exists else None
+        for candidate, exists, implied, profit in zip(
+            candidates,
+            arb["exists"].tolist(),
+            arb["implied_probability"].tolist(),
+            arb["profit_percentage"].tolist()
+        )
+    ]
+
+
+def scan_three_way_market(
+    market_odds: MarketOdds,
+    outcome_names: Sequence[str],
+    validate: bool = True
+) -> List[ThreeWayHit]:
+    """
+    Find every profitable assignment of bookmakers to a 1X2 market
+
+    Args:
+        market_odds: {bookmaker: {outcome: decimal_odds}} in bookmaker order
+        outcome_names: The market's three outcome names (e.g. home, draw, away)
+        validate: Apply validate_odds sanity checks to each hit
+
+    Returns:
+        Hits sorted by profit, highest first
+    """
+    hits = [hit for hit in evaluate_three_way(three_way_candidates(market_odds, outcome_names), validate) if hit]
+    hits.sort(key=lambda hit: hit.arb["profit_percentage"], reverse=True)
+    return hits
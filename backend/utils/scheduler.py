@@ -0,0 +1,156 @@
+"""
+Per-event refresh priorities from time to start and observed price movement
+
+Events starting soon, and events whose prices have been moving, are
+refreshed often; events days away with quiet prices rarely. The scheduler
+only ranks and remembers; callers decide what to fetch with the result.
+"""
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Hashable, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from utils.filters import get_time_until_game
+
+# (hours to start below, interval multiplier); later events use FAR_MULTIPLIER
+TIME_TIERS: Tuple[Tuple[float, float], ...] = ((1, 1.0), (6, 2.0), (24, 5.0), (72, 15.0))
+FAR_MULTIPLIER = 30.0
+
+
+class EventStats:
+    """What the scheduler remembers about one event"""
+    __slots__ = ("fetched_at", "prices", "volatility")
+
+    def __init__(self, fetched_at: float, prices: Dict[Hashable, float]):
+        self.fetched_at = fetched_at
+        self.prices = prices
+        # Smoothed mean implied-probability change per minute (None until two fetches)
+        self.volatility: Optional[float] = None
+
+
+class ScheduledEvent(NamedTuple):
+    """One event's refresh state, as ranked by EventScheduler.rank"""
+    event_id: str
+    interval_seconds: float
+    # Seconds since the last fetch (None if never fetched)
+    age_seconds: Optional[float]
+
+    @property
+    def due(self) -> bool:
+        return self.age_seconds is None or self.age_seconds >= self.interval_seconds
+
+
+class EventScheduler:
+    """
+    Refresh interval per event, shortened near start time and under movement
+
+    The interval is `base_interval_seconds` times a multiplier from
+    TIME_TIERS, divided by (1 + volatility / volatility_reference), and
+    clamped to [base_interval_seconds, max_interval_seconds]. Volatility
+    is the mean change in implied probability per minute across the quotes
+    two consecutive fetches share, smoothed exponentially.
+    """
+
+    def __init__(
+        self,
+        base_interval_seconds: float = 60.0,
+        max_interval_seconds: float = 1800.0,
+        volatility_reference: float = 0.002,
+        smoothing: float = 0.5,
+        max_events: int = 2048,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.base_interval_seconds = base_interval_seconds
+        self.max_interval_seconds = max_interval_seconds
+        self.volatility_reference = volatility_reference
+        self.smoothing = smoothing
+        self.max_events = max_events
+        self._clock = clock
+        self._events: "OrderedDict[str, EventStats]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def observe(self, event_id: str, prices: Mapping[Hashable, float]) -> None:
+        """
+        Record a fresh fetch of an event
+
+        Args:
+            event_id: Event (or cache) key
+            prices: {quote identity: decimal odds} from the fetched payload
+        """
+        now = self._clock()
+        stats = self._events.get(event_id)
+        if stats is None:
+            self._events[event_id] = EventStats(now, dict(prices))
+            while len(self._events) > self.max_events:
+                self._events.popitem(last=False)
+            return
+
+        common = [key for key in prices if key in stats.prices]
+        if common:
+            move = sum(abs(1 / prices[key] - 1 / stats.prices[key]) for key in common) / len(common)
+            rate = move / max((now - stats.fetched_at) / 60, 1 / 60)
+            stats.volatility = rate if stats.volatility is None else (
+                self.smoothing * rate + (1 - self.smoothing) * stats.volatility
+            )
+        stats.fetched_at = now
+        stats.prices = dict(prices)
+        self._events.move_to_end(event_id)
+
+    def volatility(self, event_id: str) -> Optional[float]:
+        stats = self._events.get(event_id)
+        return stats.volatility if stats is not None else None
+
+    def age(self, event_id: str) -> Optional[float]:
+        """Seconds since the event was last observed"""
+        stats = self._events.get(event_id)
+        return self._clock() - stats.fetched_at if stats is not None else None
+
+    def interval(self, event_id: str, commence_time: str, now: Optional[datetime] = None) -> float:
+        """
+        Refresh interval for an event
+
+        Args:
+            event_id: Event (or cache) key
+            commence_time: ISO start time ("" if unknown, treated as far off)
+            now: Current time for the start-time calculation
+
+        Returns:
+            Seconds between refreshes
+        """
+        multiplier = FAR_MULTIPLIER
+        if commence_time:
+            hours = get_time_until_game(commence_time, now) / 3600
+            multiplier = next((m for limit, m in TIME_TIERS if hours < limit), FAR_MULTIPLIER)
+
+        interval = self.base_interval_seconds * multiplier
+        volatility = self.volatility(event_id)
+        if volatility:
+            interval /= 1 + volatility / self.volatility_reference
+        return min(max(interval, self.base_interval_seconds), self.max_interval_seconds)
+
+    def rank(self, events: Iterable[Tuple[str, str]], now: Optional[datetime] = None) -> List[ScheduledEvent]:
+        """
+        Order events by how overdue they are for a refresh
+
+        Never-fetched events come first (soonest start first), then events by
+        age / interval descending.
+
+        Args:
+            events: (event_id, commence_time) pairs
+            now: Current time for the start-time calculation
+
+        Returns:
+            ScheduledEvent per event, most urgent first
+        """
+        ranked = []
+        for event_id, commence_time in events:
+            scheduled = ScheduledEvent(event_id, self.interval(event_id, commence_time, now), self.age(event_id))
+            overdue = (
+                float("inf") if scheduled.age_seconds is None
+                else scheduled.age_seconds / scheduled.interval_seconds
+            )
+            ranked.append((-overdue, commence_time or "~", scheduled))
+        ranked.sort(key=lambda item: item[:2])
+        return [scheduled for _, _, scheduled in ranked]
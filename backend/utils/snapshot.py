@@ -0,0 +1,438 @@
+"""
+Versioned in-memory snapshots of scanned odds and the background poller that fills them
+"""
+import asyncio
+import base64
+import binascii
+import logging
+import time
+from collections import deque, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ScanKey(NamedTuple):
+    """Normalized parameters that fully determine a live scan"""
+    sport: str
+    regions: str
+    markets: str
+    include_live: bool = False
+    grace_minutes: int = 0
+    include_player_props: bool = False
+
+
+def _normalize_csv(value: str) -> str:
+    """Lowercase, de-duplicate and sort a comma-separated list"""
+    items = {item.strip().lower() for item in (value or "").split(",") if item.strip()}
+    return ",".join(sorted(items))
+
+
+def normalize_scan_key(
+    sport: str,
+    regions: str = "us",
+    markets: str = "h2h",
+    include_live: bool = False,
+    grace_minutes: int = 0,
+    include_player_props: bool = False
+) -> ScanKey:
+    """
+    Build a canonical key for a live scan request
+
+    Regions and markets are order-insensitive, so "h2h,spreads" and
+    "spreads, h2h" map to the same key.
+
+    Returns:
+        ScanKey usable as a dictionary key
+    """
+    return ScanKey(
+        sport=(sport or "").strip().lower(),
+        regions=_normalize_csv(regions),
+        markets=_normalize_csv(markets) or "h2h",
+        include_live=bool(include_live),
+        grace_minutes=int(grace_minutes or 0),
+        include_player_props=bool(include_player_props)
+    )
+
+
+def parse_poll_targets(spec: str) -> List[ScanKey]:
+    """
+    Parse poll targets from configuration
+
+    Format: semicolon-separated "sport:markets:regions[:props]" entries, e.g.
+    "basketball_nba:h2h,spreads,totals:us;soccer_epl:h2h:uk,eu"
+
+    Args:
+        spec: Target specification string
+
+    Returns:
+        List of normalized scan keys (malformed entries are skipped)
+    """
+    targets = []
+    for entry in (spec or "").split(";"):
+        parts = [part.strip() for part in entry.split(":")]
+        if not parts[0]:
+            continue
+        markets = parts[1] if len(parts) > 1 and parts[1] else "h2h"
+        regions = parts[2] if len(parts) > 2 and parts[2] else "us"
+        include_props = len(parts) > 3 and parts[3].lower() in ("props", "true", "1")
+        targets.append(normalize_scan_key(parts[0], regions, markets, include_player_props=include_props))
+    return targets
+
+
+@dataclass
+class Snapshot:
+    """Immutable result of one scan, tagged with a store-wide version"""
+    version: int
+    key: ScanKey
+    data: Dict[str, Any]
+    created_at: float = field(default_factory=time.time)
+
+    def age_seconds(self, now: Optional[float] = None) -> float:
+        """Seconds since the snapshot was taken"""
+        return max(0.0, (now if now is not None else time.time()) - self.created_at)
+
+
+class SnapshotStore:
+    """
+    Latest snapshot per scan key, plus recent snapshots by version
+
+    Readers get the current Snapshot object; writers replace it wholesale, so
+    a reader never sees a half-updated result. The version history lets a
+    paginated client keep reading the exact result its first page came
+    from even after a newer snapshot is published. History is kept per
+    key, so busy keys cannot evict another key's pages: a snapshot stays
+    readable while it is its key's current one and for `history_seconds`
+    after it is replaced (on-demand snapshots from publish(current=False)
+    count as replaced when published), and at most `history_size` versions
+    are kept per key. Streaming readers can `wait` for the next snapshot of
+    a key instead of polling.
+    """
+
+    def __init__(self, history_size: int = 32, history_seconds: Optional[float] = None):
+        """
+        Args:
+            history_size: Versions kept per key, the current one included
+            history_seconds: How long a replaced snapshot stays readable
+                by version (None: until pushed out by history_size)
+        """
+        self._snapshots: Dict[ScanKey, Snapshot] = {}
+        self._history: Dict[int, Snapshot] = {}
+        self._key_versions: Dict[ScanKey, Deque[int]] = {}
+        # Replaced versions in the order they were replaced, with when
+        self._retired: "OrderedDict[int, float]" = OrderedDict()
+        self._history_size = max(1, history_size)
+        self._history_seconds = history_seconds
+        self._version = 0
+        self._waiters: Dict[ScanKey, List[asyncio.Future]] = {}
+
+    @property
+    def version(self) -> int:
+        """Version of the most recently published snapshot"""
+        return self._version
+
+    def publish(self, key: ScanKey, data: Dict[str, Any], current: bool = True) -> Snapshot:
+        """
+        Store a new snapshot for `key` and return it
+
+        Args:
+            key: Normalized scan key
+            data: Scan result
+            current: Also make it the snapshot `get` returns for key; False
+                only records it in the version history (e.g. on-demand
+                scans kept for pagination)
+        """
+        self._version += 1
+        snapshot = Snapshot(version=self._version, key=key, data=data)
+        now = time.time()
+        if current:
+            previous = self._snapshots.get(key)
+            if previous is not None:
+                self._retired[previous.version] = now
+            self._snapshots[key] = snapshot
+            for waiter in self._waiters.pop(key, []):
+                if not waiter.done():
+                    waiter.set_result(snapshot)
+        else:
+            self._retired[snapshot.version] = now
+
+        self._history[snapshot.version] = snapshot
+        versions = self._key_versions.setdefault(key, deque())
+        versions.append(snapshot.version)
+        while len(versions) > self._history_size:
+            # The oldest retained version that is not the current one
+            oldest = next(version for version in versions if version in self._retired)
+            self._drop(oldest)
+        self._expire(now)
+        return snapshot
+
+    def _drop(self, version: int) -> None:
+        snapshot = self._history.pop(version)
+        self._retired.pop(version, None)
+        versions = self._key_versions[snapshot.key]
+        versions.remove(version)
+        if not versions:
+            del self._key_versions[snapshot.key]
+
+    def _expire(self, now: float) -> None:
+        """Drop replaced snapshots older than history_seconds"""
+        if self._history_seconds is None:
+            return
+        while self._retired:
+            version, retired_at = next(iter(self._retired.items()))
+            if now - retired_at <= self._history_seconds:
+                break
+            self._drop(version)
+
+    def get_version(self, version: int, max_age_seconds: Optional[float] = None) -> Optional[Snapshot]:
+        """
+        Get a recent snapshot by version
+
+        Args:
+            version: Snapshot version (e.g. from a cursor)
+            max_age_seconds: Also ignore snapshots taken longer ago than this
+
+        Returns:
+            Snapshot or None if it fell out of the history or is too old
+        """
+        self._expire(time.time())
+        snapshot = self._history.get(version)
+        if snapshot is None:
+            return None
+        if max_age_seconds is not None and snapshot.age_seconds() > max_age_seconds:
+            return None
+        return snapshot
+
+    def readable_for(self, version: int) -> Optional[float]:
+        """
+        Seconds a retained version is certain to stay readable by version
+
+        Returns:
+            None while it is its key's current snapshot (it stays readable
+            until replaced) or without an age bound; 0.0 if not retained
+        """
+        if version not in self._history:
+            return 0.0
+        retired_at = self._retired.get(version)
+        if retired_at is None or self._history_seconds is None:
+            return None
+        return max(0.0, self._history_seconds - (time.time() - retired_at))
+
+    def get(self, key: ScanKey, max_age_seconds: Optional[float] = None) -> Optional[Snapshot]:
+        """
+        Get the snapshot for `key`
+
+        Args:
+            key: Normalized scan key
+            max_age_seconds: Ignore snapshots older than this
+
+        Returns:
+            Snapshot or None if missing/too old
+        """
+        snapshot = self._snapshots.get(key)
+        if snapshot is None:
+            return None
+        if max_age_seconds is not None and snapshot.age_seconds() > max_age_seconds:
+            return None
+        return snapshot
+
+    def latest(self, key: ScanKey, max_age_seconds: Optional[float] = None) -> Optional[Snapshot]:
+        """
+        Get the newest retained snapshot for `key`, current or not
+
+        Lets on-demand scans published with current=False be reused while
+        they are fresh, without keeping them past history_seconds.
+
+        Args:
+            key: Normalized scan key
+            max_age_seconds: Ignore snapshots older than this
+
+        Returns:
+            Snapshot or None if none is retained or it is too old
+        """
+        self._expire(time.time())
+        versions = self._key_versions.get(key)
+        if not versions:
+            return None
+        snapshot = self._history[versions[-1]]
+        if max_age_seconds is not None and snapshot.age_seconds() > max_age_seconds:
+            return None
+        return snapshot
+
+    async def wait(self, key: ScanKey, after_version: int, timeout: Optional[float] = None) -> Optional[Snapshot]:
+        """
+        Wait for a snapshot of `key` newer than `after_version`
+
+        Args:
+            key: Normalized scan key
+            after_version: Version the caller already has (0 for none)
+            timeout: Give up after this many seconds
+
+        Returns:
+            The key's current snapshot, or None on timeout
+        """
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and snapshot.version > after_version:
+            return snapshot
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, []).append(waiter)
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters = self._waiters.get(key)
+            if waiters and waiter in waiters:
+                waiters.remove(waiter)
+
+    def keys(self) -> List[ScanKey]:
+        return list(self._snapshots.keys())
+
+
+def encode_cursor(version: int, offset: int) -> str:
+    """Opaque pagination cursor for a position within a snapshot"""
+    return base64.urlsafe_b64encode(f"{version}:{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """
+    Decode a cursor from encode_cursor
+
+    Returns:
+        (snapshot_version, offset)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        version, offset = (int(part) for part in raw.split(":"))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if version < 1 or offset < 0:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return version, offset
+
+
+class OddsPoller:
+    """
+    Background task that rescans configured targets
+
+    The scan coroutine does the upstream fetch and detection; the poller only
+    schedules it and publishes results, so user requests never hit the
+    upstream API for polled targets. Without a planner every target is
+    rescanned every `interval_seconds`. With one (see utils.quota), each
+    target follows its own PollPlan, which may pause it or scan a cheaper
+    variant of it; results are always published under the target's key.
+    Scan results may carry "next_commence_time" so the planner knows how
+    soon each target's next game starts.
+    """
+
+    def __init__(
+        self,
+        targets: List[ScanKey],
+        scan: Callable[[ScanKey], Awaitable[Dict[str, Any]]],
+        store: SnapshotStore,
+        interval_seconds: float = 60.0,
+        planner: Optional[Any] = None
+    ):
+        self.targets = targets
+        self.scan = scan
+        self.store = store
+        self.interval_seconds = interval_seconds
+        self.planner = planner
+        self.plans: Dict[ScanKey, Any] = {}
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def poll_target(self, key: ScanKey, scan_key: Optional[ScanKey] = None) -> bool:
+        """
+        Scan one target and publish the result under `key`
+
+        Args:
+            key: Target to publish for
+            scan_key: What to scan instead (a degraded variant of key)
+
+        Returns:
+            True if the scan succeeded
+        """
+        scan_key = scan_key or key
+        try:
+            if self.planner is not None:
+                # Only this scan's own responses count towards its cost
+                with self.planner.tracker.metered() as meter:
+                    data = await self.scan(scan_key)
+            else:
+                data = await self.scan(scan_key)
+        except Exception as e:
+            self.last_error = f"{key.sport}: {e}"
+            logger.warning("Odds poll failed for %s: %s", key, e)
+            return False
+        if scan_key != key:
+            # Tell readers of key's snapshot what was actually scanned
+            data = {**data, "scanned_markets": scan_key.markets, "scanned_player_props": scan_key.include_player_props}
+        self.store.publish(key, data)
+
+        if self.planner is not None:
+            if meter.responses:
+                self.planner.observe_cost(scan_key, meter.credits)
+            self.planner.observe_start(key, data.get("next_commence_time"))
+        return True
+
+    async def poll_once(self) -> None:
+        """Scan every target once, publishing successful results"""
+        for key in self.targets:
+            await self.poll_target(key)
+
+    async def run(self) -> None:
+        """Poll forever"""
+        if self.planner is not None:
+            await self._run_planned()
+            return
+        while True:
+            started = time.monotonic()
+            await self.poll_once()
+            elapsed = time.monotonic() - started
+            await asyncio.sleep(max(0.0, self.interval_seconds - elapsed))
+
+    async def _run_planned(self) -> None:
+        """Poll each target when its plan says it is due, re-planning every pass"""
+        last_polled: Dict[ScanKey, float] = {}
+        while True:
+            self.plans = self.planner.plan(self.targets)
+            next_due = time.monotonic() + self.planner.max_interval_seconds
+
+            for key in self.targets:
+                plan = self.plans[key]
+                if plan.interval_seconds is None:
+                    # Paused; re-planned as other traffic updates the quota
+                    continue
+                due = last_polled.get(key, float("-inf")) + plan.interval_seconds
+                if due <= time.monotonic():
+                    await self.poll_target(key, plan.scan_key)
+                    last_polled[key] = time.monotonic()
+                    due = last_polled[key] + plan.interval_seconds
+                next_due = min(next_due, due)
+
+            await asyncio.sleep(max(0.0, next_due - time.monotonic()))
+
+    def start(self) -> None:
+        """Start polling in the background (no-op without targets)"""
+        if self.targets and not self.running:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Cancel the polling task and wait for it to finish"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,140 @@
+"""
+Bounded top-K selection
+"""
+import heapq
+from itertools import islice
+from typing import Callable, Dict, Generic, Hashable, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class TopK(Generic[T]):
+    """
+    Keep the K highest-scoring items pushed so far
+
+    Memory is O(K) and each push is O(log K), so a scan that produces N
+    records never holds or sorts more than K of them. Ties keep the items
+    pushed first, so `sorted()` matches a stable descending sort of
+    everything pushed, truncated to K.
+    """
+
+    def __init__(self, k: Optional[int], key: Callable[[T], float]):
+        """
+        Args:
+            k: Items to keep (None or 0 keeps everything)
+            key: Score to rank items by, highest first
+        """
+        self.k = k
+        self.key = key
+        self._heap: List[Tuple[float, int, T]] = []
+        self._pushed = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def pushed(self) -> int:
+        """Items offered so far, including those dropped"""
+        return self._pushed
+
+    @property
+    def truncated(self) -> bool:
+        return self._pushed > len(self._heap)
+
+    def push(self, item: T) -> None:
+        # Negated sequence: among equal scores the earliest item ranks highest
+        entry = (self.key(item), -self._pushed, item)
+        self._pushed += 1
+
+        if not self.k:
+            self._heap.append(entry)
+        elif len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def extend(self, items: Iterable[T]) -> None:
+        for item in items:
+            self.push(item)
+
+    def sorted(self) -> List[T]:
+        """Kept items, highest score first"""
+        return [item for _, _, item in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+
+
+class GroupedTopK(Generic[T]):
+    """
+    Keep the K highest-scoring items of every group
+
+    For any set of groups, the top K of their items combined is among the
+    union of their per-group top K, so a filter that selects whole groups
+    (e.g. records whose bookmakers fall in a subset) can run after
+    truncation and still match filtering before it. Memory is O(K) per
+    group. Ties keep the items pushed first, across groups too.
+    """
+
+    def __init__(self, k: Optional[int], key: Callable[[T], float], group: Callable[[T], Hashable]):
+        """
+        Args:
+            k: Items to keep per group (None or 0 keeps everything)
+            key: Score to rank items by, highest first
+            group: Group of an item
+        """
+        self.k = k
+        self.key = key
+        self.group = group
+        self._heaps: Dict[Hashable, List[Tuple[float, int, T]]] = {}
+        self._counts: Dict[Hashable, int] = {}
+        self._pushed = 0
+
+    def __len__(self) -> int:
+        return sum(len(heap) for heap in self._heaps.values())
+
+    @property
+    def pushed(self) -> int:
+        """Items offered so far, including those dropped"""
+        return self._pushed
+
+    def counts(self) -> Dict[Hashable, int]:
+        """Items offered per group, including those dropped"""
+        return dict(self._counts)
+
+    def push(self, item: T) -> None:
+        group = self.group(item)
+        heap = self._heaps.setdefault(group, [])
+        entry = (self.key(item), -self._pushed, item)
+        self._pushed += 1
+        self._counts[group] = self._counts.get(group, 0) + 1
+
+        if not self.k:
+            heap.append(entry)
+        elif len(heap) < self.k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+
+    def extend(self, items: Iterable[T]) -> None:
+        for item in items:
+            self.push(item)
+
+    def sorted(self) -> List[T]:
+        """Kept items of every group, highest score first"""
+        entries = [entry for heap in self._heaps.values() for entry in heap]
+        entries.sort(key=lambda entry: entry[:2], reverse=True)
+        return [item for _, _, item in entries]
+
+
+def merge_top_k(runs: Iterable[Iterable[T]], k: Optional[int], key: Callable[[T], float]) -> List[T]:
+    """
+    K-way merge of runs that are each sorted highest score first
+
+    Costs O(k log R) for R runs and stops after k items, so per-shard top
+    lists merge without re-sorting. Among equal scores, items from earlier
+    runs come first, matching a stable sort of the runs concatenated.
+
+    Args:
+        runs: Sorted runs, e.g. TopK.sorted() of each shard
+        k: Items to keep (None or 0 keeps everything)
+        key: Score the runs are sorted by
+    """
+    return list(islice(heapq.merge(*runs, key=key, reverse=True), k or None))
@@ -0,0 +1,179 @@
+"""
+Incremental parsing of uploaded odds files, one game at a time
+
+Both readers pull the file in chunks, so memory stays flat however large
+the upload is: only the game being parsed (and one read chunk) is held.
+"""
+import csv
+import json
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, TypeVar
+
+T = TypeVar("T")
+
+# Column names accepted for each bookmaker field in CSV uploads
+CSV_BOOK_COLUMNS = ("bookmaker", "sportsbook", "name")
+CSV_HOME_COLUMNS = ("home", "odds1")
+CSV_AWAY_COLUMNS = ("away", "odds2")
+
+# Longest tail the decoder can reject only because it is cut off (e.g.
+# "-Infinit" or "\\u12"); an error further back is malformed input
+_PARTIAL_TOKEN_CHARS = 10
+
+
+class _JSONStream:
+    """Chunked text buffer that decodes one JSON value at a time"""
+
+    def __init__(self, stream: TextIO, chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Read another chunk, dropping what has been consumed"""
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return bool(chunk)
+
+    def peek(self) -> str:
+        """Next non-whitespace character ("" at end of input)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, *chars: str) -> str:
+        char = self.peek()
+        if char not in chars:
+            raise ValueError(f"Invalid JSON: expected one of {''.join(chars)!r}, found {char or 'end of file'!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the value at the current position, reading more input as needed"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # More input can only complete a value cut off at the end of
+                # the buffer; anything else fails now rather than buffering
+                # and re-decoding the rest of the file first
+                truncated = e.msg.startswith("Unterminated string") or e.pos >= len(self.buffer) - _PARTIAL_TOKEN_CHARS
+                if self.eof or not truncated:
+                    raise
+                self.fill()
+                continue
+            # A number at the very end of the buffer may continue in the next chunk
+            if end < len(self.buffer) or self.eof:
+                self.pos = end
+                return value
+            self.fill()
+
+
+def iter_json_games(stream: TextIO, key: str = "games", chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Yield the items of the `key` array of a JSON upload as they are parsed
+
+    Accepts {"games": [...], ...} (other keys are skipped) or a bare array.
+    Reading stops at the end of the array.
+
+    Raises:
+        ValueError: On malformed JSON
+    """
+    reader = _JSONStream(stream, chunk_size)
+    if reader.expect("{", "[") == "{":
+        while True:
+            if reader.peek() == "}":
+                return
+            name = reader.value()
+            reader.expect(":")
+            if name == key and reader.peek() == "[":
+                reader.expect("[")
+                break
+            reader.value()
+            if reader.expect(",", "}") == "}":
+                return
+
+    if reader.peek() == "]":
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(",", "]") == "]":
+            return
+
+
+def check_game(game: Any, index: int) -> Dict[str, Any]:
+    """
+    Check that an uploaded game has the shape the upload scan reads
+
+    Args:
+        game: One parsed game
+        index: Its position in the upload (0-based), for the message
+
+    Returns:
+        The game, unchanged
+
+    Raises:
+        ValueError: If the game or one of its bookmakers is malformed
+    """
+    if not isinstance(game, dict):
+        raise ValueError(f"Game {index}: expected an object, found {type(game).__name__}")
+    bookmakers = game.get("bookmakers", [])
+    if not isinstance(bookmakers, list):
+        raise ValueError(f"Game {index}: bookmakers must be a list")
+    for book in bookmakers:
+        if not isinstance(book, dict):
+            raise ValueError(f"Game {index}: expected bookmaker objects, found {type(book).__name__}")
+        if not isinstance(book.get("name"), (str, type(None))):
+            raise ValueError(f"Game {index}: bookmaker name must be a string")
+        for column in CSV_HOME_COLUMNS + CSV_AWAY_COLUMNS:
+            price = book.get(column)
+            if isinstance(price, bool) or not isinstance(price, (int, float, str, type(None))):
+                raise ValueError(f"Game {index}: {column} must be a number")
+    return game
+
+
+def _first(row: Dict[str, Optional[str]], columns: Iterable[str]) -> Optional[str]:
+    return next((row[column] for column in columns if row.get(column)), None)
+
+
+def iter_csv_games(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """
+    Yield games from a CSV upload with one row per (game, bookmaker)
+
+    Columns: match, sport, date, bookmaker (or sportsbook/name), home (or
+    odds1), away (or odds2). Consecutive rows with the same match, sport
+    and date form one game, in the upload JSON's game shape.
+    """
+    game: Optional[Dict[str, Any]] = None
+    for row in csv.DictReader(stream):
+        identity = (row.get("match"), row.get("sport"), row.get("date"))
+        if game is None or identity != (game["match"], game["sport"], game["date"]):
+            if game is not None:
+                yield game
+            game = {"match": identity[0], "sport": identity[1], "date": identity[2], "bookmakers": []}
+        game["bookmakers"].append({
+            "name": _first(row, CSV_BOOK_COLUMNS),
+            "home": _first(row, CSV_HOME_COLUMNS),
+            "away": _first(row, CSV_AWAY_COLUMNS)
+        })
+    if game is not None:
+        yield game
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Consecutive lists of up to `size` items"""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
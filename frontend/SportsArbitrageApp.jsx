@@ -66,7 +66,8 @@ const SportsArbitrageApp = () => {
     regions: 'us,us2',  // Use both US regions by default
     autoRefresh: false,
     includeLive: false,  // Exclude live/started games by default
-    includePlayerProps: false  // Include player prop markets
+    includePlayerProps: false,  // Include player prop markets
+    books: []  // Sportsbooks the user has accounts at (empty = all)
   });
 
   // View mode
@@ -90,6 +91,22 @@ const SportsArbitrageApp = () => {
     }
   };
 
+  // Query string shared by /arbitrage/live and /arbitrage/stream
+  const buildLiveParams = (filters) => {
+    const params = new URLSearchParams({
+      sport: filters.sport,
+      markets: filters.markets,
+      regions: filters.regions,
+      min_profit: filters.minProfit,
+      include_live: filters.includeLive,
+      include_player_props: filters.includePlayerProps || false
+    });
+    if (filters.books && filters.books.length > 0) {
+      params.set('books', filters.books.join(','));
+    }
+    return params;
+  };
+
   // Fetch live arbitrages
   const fetchLiveArbitrages = useCallback(async () => {
     setLoadingLive(true);
@@ -97,15 +114,7 @@ const SportsArbitrageApp = () => {
     setPlayerPropsNote(null);
 
     try {
-      const params = new URLSearchParams({
-        sport: filters.sport,
-        markets: filters.markets,
-        regions: filters.regions,
-        min_profit: filters.minProfit,
-        include_live: filters.includeLive,
-        include_player_props: filters.includePlayerProps || false
-      });
-
+      const params = buildLiveParams(filters);
       const response = await fetch(`http://localhost:8000/arbitrage/live?${params}`);
       
       if (!response.ok) {
@@ -136,16 +145,47 @@ const SportsArbitrageApp = () => {
     }
   }, [filters]);
 
-  // Auto-refresh effect
+  // Auto-refresh effect: stream changes for polled targets, otherwise poll
   useEffect(() => {
     if (filters.autoRefresh && apiKeyConfigured && viewMode === 'live') {
-      const interval = setInterval(() => {
-        fetchLiveArbitrages();
-      }, 60000); // 60 seconds
+      let interval = null;
+      const stream = new EventSource(`http://localhost:8000/arbitrage/stream?${buildLiveParams(filters)}`);
+
+      stream.addEventListener('snapshot', (event) => {
+        const data = JSON.parse(event.data);
+        setLiveArbitrages(data.arbitrages);
+        setApiRequestsRemaining(data.api_requests_remaining);
+      });
+
+      stream.addEventListener('delta', (event) => {
+        const { added, changed, removed } = JSON.parse(event.data);
+        const replaced = new Set([...removed, ...changed.map((arb) => arb.id)]);
+        setLiveArbitrages((current) =>
+          current
+            .filter((arb) => !replaced.has(arb.id))
+            .concat(added, changed)
+            .sort((a, b) => b.profit_percentage - a.profit_percentage)
+        );
+      });
 
-      return () => clearInterval(interval);
+      // Not a polled target (or streaming unavailable): poll every 60 seconds.
+      // Dropped connections reconnect by themselves and resume from the last event.
+      stream.onerror = () => {
+        if (stream.readyState === EventSource.CLOSED && interval === null) {
+          interval = setInterval(() => {
+            fetchLiveArbitrages();
+          }, 60000);
+        }
+      };
+
+      return () => {
+        stream.close();
+        if (interval !== null) {
+          clearInterval(interval);
+        }
+      };
     }
-  }, [filters.autoRefresh, apiKeyConfigured, viewMode, fetchLiveArbitrages]);
+  }, [filters, apiKeyConfigured, viewMode, fetchLiveArbitrages]);
 
   // Reset market type view when player props are disabled
   useEffect(() => {
@@ -360,7 +400,7 @@ const SportsArbitrageApp = () => {
               {/* Filter and display arbitrages based on market type view */}
               {(() => {
                 const gameArbitrages = liveArbitrages.filter(arb => 
-                  !arb.market_type || arb.market_type === 'game'
+                  !arb.market_type || ['game', 'middle', 'multi_way'].includes(arb.market_type)
                 );
                 const playerPropArbitrages = liveArbitrages.filter(arb => 
                   arb.market_type === 'player_prop'
@@ -99,58 +99,86 @@ const ArbitrageTable = ({ arbitrages, loading, error }) => {
               </div>
             </div>
 
-            <div className="grid grid-cols-1 md:grid-cols-2 gap-4 mb-4">
-              <div className="bg-slate-800/70 rounded-lg p-4">
-                <p className="text-slate-400 text-sm mb-2">
-                  Bet on <span className="font-semibold text-white">{arb.outcome_a}</span>
-                </p>
-                <p className="text-xl font-bold text-white mb-1">{arb.sportsbook_a}</p>
-                <div className="flex items-baseline gap-3">
-                  <span className="text-3xl font-bold text-green-400">{decimalToAmerican(arb.odds_a)}</span>
-                  <span className="text-slate-400 text-sm">({arb.odds_a.toFixed(2)})</span>
-                </div>
-                <div className="mt-3 pt-3 border-t border-slate-700">
-                  <p className="text-slate-400 text-sm">Stake (of $1,000 total)</p>
-                  <p className="text-lg font-bold text-green-400">${arb.stake_a}</p>
-                </div>
+            {arb.legs ? (
+              <div className="bg-slate-800/70 rounded-lg p-4 mb-4 overflow-x-auto">
+                <table className="w-full text-sm">
+                  <thead>
+                    <tr className="text-slate-400 text-left border-b border-slate-700">
+                      <th className="py-2 pr-4 font-normal">Bet on</th>
+                      <th className="py-2 pr-4 font-normal">Sportsbook</th>
+                      <th className="py-2 pr-4 font-normal text-right">Odds</th>
+                      <th className="py-2 font-normal text-right">Stake (of $1,000 total)</th>
+                    </tr>
+                  </thead>
+                  <tbody>
+                    {arb.legs.map((leg, legIndex) => (
+                      <tr key={legIndex} className="border-b border-slate-700/50 last:border-0">
+                        <td className="py-2 pr-4 font-semibold text-white">{leg.outcome}</td>
+                        <td className="py-2 pr-4 text-white">{leg.sportsbook}</td>
+                        <td className="py-2 pr-4 text-right">
+                          <span className="font-bold text-green-400">{decimalToAmerican(leg.odds)}</span>
+                          <span className="text-slate-400 ml-2">({leg.odds.toFixed(2)})</span>
+                        </td>
+                        <td className="py-2 text-right font-bold text-green-400">${leg.stake}</td>
+                      </tr>
+                    ))}
+                  </tbody>
+                </table>
               </div>
-
-              <div className="bg-slate-800/70 rounded-lg p-4">
-                <p className="text-slate-400 text-sm mb-2">
-                  Bet on <span className="font-semibold text-white">{arb.outcome_b}</span>
-                </p>
-                <p className="text-xl font-bold text-white mb-1">{arb.sportsbook_b}</p>
-                <div className="flex items-baseline gap-3">
-                  <span className="text-3xl font-bold text-green-400">{decimalToAmerican(arb.odds_b)}</span>
-                  <span className="text-slate-400 text-sm">({arb.odds_b.toFixed(2)})</span>
-                </div>
-                <div className="mt-3 pt-3 border-t border-slate-700">
-                  <p className="text-slate-400 text-sm">Stake (of $1,000 total)</p>
-                  <p className="text-lg font-bold text-green-400">${arb.stake_b}</p>
+            ) : (
+              <div className="grid grid-cols-1 md:grid-cols-2 gap-4 mb-4">
+                <div className="bg-slate-800/70 rounded-lg p-4">
+                  <p className="text-slate-400 text-sm mb-2">
+                    Bet on <span className="font-semibold text-white">{arb.outcome_a}</span>
+                  </p>
+                  <p className="text-xl font-bold text-white mb-1">{arb.sportsbook_a}</p>
+                  <div className="flex items-baseline gap-3">
+                    <span className="text-3xl font-bold text-green-400">{decimalToAmerican(arb.odds_a)}</span>
+                    <span className="text-slate-400 text-sm">({arb.odds_a.toFixed(2)})</span>
+                  </div>
+                  <div className="mt-3 pt-3 border-t border-slate-700">
+                    <p className="text-slate-400 text-sm">Stake (of $1,000 total)</p>
+                    <p className="text-lg font-bold text-green-400">${arb.stake_a}</p>
+                  </div>
                 </div>
-              </div>
 
-              {arb.sportsbook_c && (
-                <div className="bg-slate-800/70 rounded-lg p-4 md:col-span-2">
+                <div className="bg-slate-800/70 rounded-lg p-4">
                   <p className="text-slate-400 text-sm mb-2">
-                    Bet on <span className="font-semibold text-white">{arb.outcome_c}</span>
+                    Bet on <span className="font-semibold text-white">{arb.outcome_b}</span>
                   </p>
-                  <div className="flex items-center justify-between">
-                    <div>
-                      <p className="text-xl font-bold text-white mb-1">{arb.sportsbook_c}</p>
-                      <div className="flex items-baseline gap-3">
-                        <span className="text-3xl font-bold text-green-400">{decimalToAmerican(arb.odds_c)}</span>
-                        <span className="text-slate-400 text-sm">({arb.odds_c.toFixed(2)})</span>
+                  <p className="text-xl font-bold text-white mb-1">{arb.sportsbook_b}</p>
+                  <div className="flex items-baseline gap-3">
+                    <span className="text-3xl font-bold text-green-400">{decimalToAmerican(arb.odds_b)}</span>
+                    <span className="text-slate-400 text-sm">({arb.odds_b.toFixed(2)})</span>
+                  </div>
+                  <div className="mt-3 pt-3 border-t border-slate-700">
+                    <p className="text-slate-400 text-sm">Stake (of $1,000 total)</p>
+                    <p className="text-lg font-bold text-green-400">${arb.stake_b}</p>
+                  </div>
+                </div>
+
+                {arb.sportsbook_c && (
+                  <div className="bg-slate-800/70 rounded-lg p-4 md:col-span-2">
+                    <p className="text-slate-400 text-sm mb-2">
+                      Bet on <span className="font-semibold text-white">{arb.outcome_c}</span>
+                    </p>
+                    <div className="flex items-center justify-between">
+                      <div>
+                        <p className="text-xl font-bold text-white mb-1">{arb.sportsbook_c}</p>
+                        <div className="flex items-baseline gap-3">
+                          <span className="text-3xl font-bold text-green-400">{decimalToAmerican(arb.odds_c)}</span>
+                          <span className="text-slate-400 text-sm">({arb.odds_c.toFixed(2)})</span>
+                        </div>
+                      </div>
+                      <div className="text-right">
+                        <p className="text-slate-400 text-sm">Stake (of $1,000 total)</p>
+                        <p className="text-lg font-bold text-green-400">${arb.stake_c}</p>
                       </div>
-                    </div>
-                    <div className="text-right">
-                      <p className="text-slate-400 text-sm">Stake (of $1,000 total)</p>
-                      <p className="text-lg font-bold text-green-400">${arb.stake_c}</p>
                     </div>
                   </div>
-                </div>
-              )}
-            </div>
+                )}
+              </div>
+            )}
 
             <div className="bg-slate-900/50 rounded-lg p-4 border border-green-400/30">
               <div className="flex items-center justify-between">
@@ -27,6 +27,28 @@ const FilterPanel = ({
     { value: 'h2h,spreads,totals', label: 'All Markets' }
   ];
 
+  // Must match ALLOWED_SPORTSBOOKS in the backend
+  const sportsbooks = [
+    'DraftKings',
+    'FanDuel',
+    'ESPN BET',
+    'Bally Bet',
+    'BetMGM',
+    'Caesars Sportsbook',
+    'Fanatics Sportsbook'
+  ];
+
+  const selectedBooks = filters.books || [];
+
+  const toggleBook = (book) => {
+    onFilterChange(
+      'books',
+      selectedBooks.includes(book)
+        ? selectedBooks.filter(b => b !== book)
+        : [...selectedBooks, book]
+    );
+  };
+
   return (
     <div className="bg-slate-800 rounded-lg p-6 border border-slate-700">
       <div className="flex items-center justify-between mb-4">
@@ -136,6 +158,26 @@ const FilterPanel = ({
         </div>
       </div>
 
+      <div className="mt-4">
+        <label className="block text-sm font-medium text-slate-300 mb-2">
+          My Sportsbooks
+          <span className="ml-2 text-xs text-slate-400">(none selected = all)</span>
+        </label>
+        <div className="flex flex-wrap gap-x-4 gap-y-2">
+          {sportsbooks.map(book => (
+            <label key={book} className="flex items-center gap-2 cursor-pointer">
+              <input
+                type="checkbox"
+                checked={selectedBooks.includes(book)}
+                onChange={() => toggleBook(book)}
+                className="w-4 h-4 rounded border-slate-600 bg-slate-700 text-green-600 focus:ring-green-500"
+              />
+              <span className="text-sm text-slate-300">{book}</span>
+            </label>
+          ))}
+        </div>
+      </div>
+
       <div className="mt-4 flex flex-col gap-2">
         <label className="flex items-center gap-2 cursor-pointer">
           <input
@@ -8,7 +8,7 @@
  * @property {string} match - Game/match identifier
  * @property {string} sport - Sport name
  * @property {string} market - Market type (h2h, spreads, totals, player_points, etc.)
- * @property {('game'|'player_prop')} market_type - Type of market
+ * @property {('game'|'middle'|'multi_way'|'player_prop')} market_type - Type of market
  * @property {string} [player_name] - Player name (for player props)
  * @property {string} [prop_type] - Prop type (points, assists, rebounds, etc.)
  * @property {number} [prop_line] - Prop line value (e.g., 25.5 for points)
@@ -21,6 +21,8 @@
  * @property {string} outcome_b - Outcome at second sportsbook
  * @property {string} [sportsbook_c] - Third sportsbook (for 3-way markets)
  * @property {number} [odds_c] - Odds at third sportsbook
+ * @property {number} [middle_low] - Lower bound of a middle's winning window (total or home margin)
+ * @property {number} [middle_high] - Upper bound of a middle's winning window
  * @property {string} [outcome_c] - Outcome at third sportsbook
  * @property {number} profit_percentage - Profit percentage
  * @property {number} implied_probability - Implied probability
@@ -29,6 +31,7 @@
  * @property {number} [stake_c] - Recommended stake at third sportsbook
  * @property {number} guaranteed_profit - Guaranteed profit amount
  * @property {string} timestamp - Timestamp of data fetch
+ * @property {Array<{sportsbook: string, outcome: string, odds: number, stake: number}>} [legs] - Every leg of a multi_way record (replaces the _a/_b/_c fields)
  * @property {Object} [warning] - Warning information if applicable
  */
 
@@ -38,15 +41,18 @@
  * @property {string} sport - Sport name
  * @property {string} player_name - Player name
  * @property {string} prop_type - Type of prop (points, assists, rebounds, etc.)
- * @property {number} prop_line - Prop line value
+ * @property {number} prop_line - Prop line value (the Over line)
  * @property {string} sportsbook_a - First sportsbook
  * @property {number} odds_a - Odds at first sportsbook
- * @property {string} outcome_a - Outcome (Over/Under)
+ * @property {string} outcome_a - Outcome (Over)
  * @property {string} sportsbook_b - Second sportsbook
  * @property {number} odds_b - Odds at second sportsbook
- * @property {string} outcome_b - Outcome (Over/Under)
+ * @property {string} outcome_b - Outcome (Under)
  * @property {number} profit_percentage - Profit percentage
  * @property {number} guaranteed_profit - Guaranteed profit
+ * @property {number} [middle_low] - Over line when the Under line is higher (middle)
+ * @property {number} [middle_high] - Under line of a middle
+ * @property {number} [middle_profit] - Profit if both legs of a middle win
  */
 
 export {};